@@ -0,0 +1,24 @@
+"""Prints synth metrics for a few app sizes without pytest: `python -m benchmarks [buckets tags grants ...]`."""
+
+import sys
+
+from benchmarks.harness import synth_data_lake_app
+
+DEFAULT_SIZES: list[tuple[int, int, int]] = [(10, 5, 1), (50, 15, 3), (200, 15, 3)]
+
+
+def main(argv: list[str]) -> None:
+    """Synthesizes one app per size triple and prints one line of metrics per app."""
+    values = [int(value) for value in argv]
+    sizes = [tuple(values[index : index + 3]) for index in range(0, len(values) - 2, 3)] or DEFAULT_SIZES
+
+    columns = ["buckets", "tags", "grants", "wall_seconds", "synth_seconds", "construct_count", "template_bytes",
+               "peak_rss_kb"]
+    print("\t".join(columns))
+    for buckets, tags, grants in sizes:
+        metrics = synth_data_lake_app(buckets, tags, grants).as_dict()
+        print("\t".join(str(metrics[column]) for column in columns))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
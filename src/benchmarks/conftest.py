@@ -0,0 +1,11 @@
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def warm_jsii_runtime():
+    """Starts the jsii runtime once, so its startup is not charged to the first synth benchmark."""
+    import aws_cdk as cdk
+
+    app = cdk.App()
+    cdk.Stack(app, "Warmup")
+    app.synth()
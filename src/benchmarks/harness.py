@@ -0,0 +1,259 @@
+"""Helpers to build data lake apps of parameterized size and measure their synthesis."""
+
+from __future__ import annotations
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+BENCHMARK_ENVIRONMENT: dict[str, str] = {
+    "BENCH_ACCOUNT_ID": "123456789012",
+    "BENCH_REGION_ID": "us-east-1",
+    "BENCH_ENVIRONMENT_NAME": "bench",
+}
+
+
+def benchmark_configs(tag_count: int = 4) -> dict[str, dict[str, str]]:
+    """Builds a ConfigLoader configuration whose `Tags.default` holds `tag_count` entries.
+
+    :param tag_count: Total number of default tags. The first four come from company, account and project.
+    :return: A configuration dictionary as consumed by ConfigLoader.
+    """
+    for key, value in BENCHMARK_ENVIRONMENT.items():
+        os.environ.setdefault(key, value)
+
+    return {
+        "account": {
+            "id": "BENCH_ACCOUNT_ID",
+            "region": "BENCH_REGION_ID",
+            "environment": "BENCH_ENVIRONMENT_NAME",
+        },
+        "data-lake-storage": {
+            "first_layer": "raw",
+            "second_layer": "stage",
+            "third_layer": "analytics",
+            "landing_zone": "landing",
+            "assets": "data-lake-assets",
+        },
+        "company": {"name": "Amazon Web Services", "short_name": "aws"},
+        "project": {"name": "Data Lakehouse", "short_name": "dlh"},
+        "additional-tags": {f"bench-tag-{index}": f"value-{index}" for index in range(max(tag_count - 4, 0))},
+    }
+
+
+@dataclass
+class SynthMetrics:
+    """Numbers collected for one synthesized app.
+
+    Attributes:
+        buckets (int): Number of buckets created through `S3.create_bucket`.
+        tags (int): Number of default tags applied to each bucket.
+        grants (int): Number of principals granted on each bucket through `S3.apply_permissions`.
+        build_seconds (float): Wall time spent creating the constructs.
+        synth_seconds (float): Wall time spent in `app.synth()`.
+        construct_count (int): Number of constructs in the app tree.
+        template_bytes (int): Size of the synthesized CloudFormation template.
+        peak_rss_kb (int): Peak resident set size of this process and of the jsii runtime, in KiB.
+    """
+
+    buckets: int
+    tags: int
+    grants: int
+    build_seconds: float = 0.0
+    synth_seconds: float = 0.0
+    construct_count: int = 0
+    template_bytes: int = 0
+    peak_rss_kb: int = 0
+
+    @property
+    def wall_seconds(self) -> float:
+        """Total wall time of build and synth."""
+        return self.build_seconds + self.synth_seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        """Returns the metrics as a flat dictionary, suitable for `benchmark.extra_info`."""
+        return {
+            "buckets": self.buckets,
+            "tags": self.tags,
+            "grants": self.grants,
+            "build_seconds": round(self.build_seconds, 4),
+            "synth_seconds": round(self.synth_seconds, 4),
+            "wall_seconds": round(self.wall_seconds, 4),
+            "construct_count": self.construct_count,
+            "template_bytes": self.template_bytes,
+            "peak_rss_kb": self.peak_rss_kb,
+        }
+
+
+def peak_rss_kb() -> int:
+    """Returns the peak RSS of this process plus its live child processes (the jsii node runtime).
+
+    The children are read from `/proc`, so on platforms without it only the Python process is reported.
+    """
+    total: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    proc = Path("/proc")
+    if not proc.exists():
+        return total
+
+    pid = str(os.getpid())
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            status = (entry / "status").read_text()
+        except OSError:
+            continue
+        fields = dict(line.split(":", 1) for line in status.splitlines() if ":" in line)
+        if fields.get("PPid", "").strip() == pid and "VmHWM" in fields:
+            total += int(fields["VmHWM"].split()[0])
+    return total
+
+
+def synth_data_lake_app(
+    buckets: int, tags: int, grants: int, tagging: str = "per-key", grant_planner: bool = False
+) -> SynthMetrics:
+    """Builds and synthesizes an app with `buckets` buckets, `tags` default tags and `grants` principals per bucket.
+
+    :param buckets: Number of buckets to create through `S3.create_bucket`.
+    :param tags: Number of entries in `Tags.default` applied to every bucket.
+    :param grants: Number of roles granted read/write on every bucket through `S3.apply_permissions`.
+    :param tagging: `per-key` tags each bucket key by key, `engine` uses a stack-level `TagEngine`.
+    :param grant_planner: Merge the grants with a `GrantPlanner` instead of one `grant_*` call per bucket and role.
+    :return: The collected metrics.
+    """
+    import aws_cdk as cdk
+
+    from commons.constructs import S3, GrantPlanner, TagEngine
+    from commons.utils import ConfigLoader
+
+    metrics = SynthMetrics(buckets=buckets, tags=tags, grants=grants)
+    config = ConfigLoader.__wrapped__(benchmark_configs(tag_count=tags))
+
+    start = time.perf_counter()
+    app = cdk.App()
+    stack = cdk.Stack(app, "BenchmarkDataLake")
+    tag_engine = TagEngine(scope=stack, shared_tags=config.tags.default) if tagging == "engine" else None
+    planner = GrantPlanner() if grant_planner else None
+    roles = [
+        cdk.aws_iam.Role(stack, f"AnalyticsRole{index}", assumed_by=cdk.aws_iam.AccountRootPrincipal())
+        for index in range(grants)
+    ]
+    actions = ("read", "write", "read_write")
+    for index in range(buckets):
+        bucket = S3.create_bucket(
+            scope=stack,
+            bucket_id=f"Bucket{index}",
+            bucket_name=f"bench-{config.account.environment}-bucket-{index}",
+            tags=config.tags.default,
+            tag_engine=tag_engine,
+        )
+        S3.apply_permissions(
+            bucket=bucket,
+            permissions=[
+                {"action": actions[(index + offset) % len(actions)], "principal": role}
+                for offset, role in enumerate(roles)
+            ],
+            planner=planner,
+        )
+    if planner is not None:
+        planner.apply()
+    metrics.build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assembly = app.synth()
+    metrics.synth_seconds = time.perf_counter() - start
+
+    metrics.construct_count = len(app.node.find_all())
+    metrics.template_bytes = len(json.dumps(assembly.get_stack_by_name(stack.stack_name).template))
+    metrics.peak_rss_kb = peak_rss_kb()
+    return metrics
+
+
+def load_config(tags: int) -> Any:
+    """Creates a fresh (non-singleton) ConfigLoader for a configuration with `tags` default tags."""
+    from commons.utils import ConfigLoader
+
+    return ConfigLoader.__wrapped__(benchmark_configs(tag_count=tags))
+
+
+IMPORT_PROBE: str = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+seconds = time.perf_counter() - start
+from benchmarks.harness import peak_rss_kb
+print(json.dumps({{"seconds": seconds, "peak_rss_kb": peak_rss_kb(), "aws_cdk_loaded": "aws_cdk" in sys.modules}}))
+"""
+
+
+def measure_import(statement: str) -> dict[str, Any]:
+    """Runs `statement` in a fresh interpreter and measures its import time and peak RSS.
+
+    :param statement: Python source to execute, e.g. `import commons.utils`.
+    :return: A dictionary with `seconds` (import wall time), `peak_rss_kb` (peak RSS of the interpreter plus
+        the jsii runtime, if started) and `aws_cdk_loaded`.
+    """
+    src_dir = str(Path(__file__).resolve().parent.parent)
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [src_dir, os.environ.get("PYTHONPATH")]))}
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", IMPORT_PROBE.format(statement=statement)],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def write_landing_files(root: str | Path, files: int, rows_per_file: int, partitions: int = 4) -> int:
+    """Writes `files` small JSON Lines objects of one dataset, spread over `partitions` dates, in a local store.
+
+    :param root: The root directory of the store.
+    :param files: The number of objects.
+    :param rows_per_file: The rows of each object.
+    :param partitions: The number of `dt=` partitions.
+    :return: The total size of the objects, in bytes.
+    """
+    from commons.service.object_store import LocalObjectStore
+
+    store = LocalObjectStore(root)
+    total = 0
+    for index in range(files):
+        rows = (
+            json.dumps({"event_id": f"{index}-{row}", "user_id": row % 97, "amount": row * 0.25, "kind": "click"})
+            for row in range(rows_per_file)
+        )
+        body = "\n".join(rows).encode()
+        store.put(f"landing/events/dt=2024-01-{index % partitions + 1:02d}/{index:06d}.json", body)
+        total += len(body)
+    return total
+
+
+def compact_landing(root: str | Path, **compactor_kwargs: Any) -> dict[str, Any]:
+    """Compacts `<root>/landing` into `<root>/raw` and returns the throughput of the run.
+
+    :param root: The directory holding the landing store written by `write_landing_files`.
+    :param compactor_kwargs: Passed to `Compactor`.
+    :return: The `CompactionResult` fields plus `mb_per_second` and `files_per_second`.
+    """
+    from commons.service.compaction import Compactor
+    from commons.service.object_store import LocalObjectStore
+
+    result = Compactor(
+        LocalObjectStore(Path(root) / "landing"),
+        LocalObjectStore(Path(root) / "raw"),
+        source_prefix="landing/",
+        target_prefix="raw/",
+        **compactor_kwargs,
+    ).run()
+    return {
+        **result.model_dump(),
+        "mb_per_second": round(result.mb_per_second, 2),
+        "files_per_second": round(result.files_per_second, 1),
+    }
@@ -0,0 +1,28 @@
+"""Throughput of the landing zone compaction (MB/s and files/s) for a few file counts and reader pool sizes."""
+
+import shutil
+
+import pytest
+
+from benchmarks.harness import compact_landing, write_landing_files
+
+pytest.importorskip("pytest_benchmark")
+pytest.importorskip("pyarrow")
+
+
+@pytest.mark.parametrize("max_workers", [1, 8])
+@pytest.mark.parametrize(
+    ("files", "rows_per_file"), [pytest.param(500, 50, id="500x50"), pytest.param(2000, 50, id="2000x50")]
+)
+def test_compaction(benchmark, tmp_path, files, rows_per_file, max_workers):
+    write_landing_files(tmp_path / "landing", files, rows_per_file)
+
+    def setup():
+        # every round compacts the whole landing zone again
+        shutil.rmtree(tmp_path / "raw", ignore_errors=True)
+
+    metrics = benchmark.pedantic(
+        compact_landing, args=(tmp_path,), kwargs={"max_workers": max_workers}, setup=setup, rounds=3, iterations=1
+    )
+    assert metrics["files_read"] == files
+    benchmark.extra_info.update(metrics)
@@ -0,0 +1,17 @@
+"""Synth benchmarks comparing one grant per bucket and role with the merged GrantPlanner statements."""
+
+import pytest
+
+from benchmarks.harness import synth_data_lake_app
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.parametrize("grant_planner", [False, True], ids=["per-grant", "planner"])
+@pytest.mark.parametrize(("buckets", "grants"), [pytest.param(50, 5, id="50x5"), pytest.param(150, 10, id="150x10")])
+def test_grants(benchmark, buckets, grants, grant_planner):
+    metrics = benchmark.pedantic(
+        synth_data_lake_app, args=(buckets, 4, grants, "engine", grant_planner), rounds=1, iterations=1
+    )
+    benchmark.extra_info.update(metrics.as_dict())
+    benchmark.extra_info["grant_planner"] = grant_planner
@@ -0,0 +1,28 @@
+"""Key layout throughput: one key at a time against the batch API, which renders the shared folders once."""
+
+import pytest
+
+from commons.model import KeyLayout
+
+pytest.importorskip("pytest_benchmark")
+
+NAMES: list[str] = [f"{index:07d}.json" for index in range(100_000)]
+PARTITIONS: dict[str, str] = {"dt": "2024-01-01", "hour": "03"}
+
+
+@pytest.mark.parametrize("shards", [0, 64])
+def test_build_one_by_one(benchmark, shards):
+    layout = KeyLayout(prefix="landing", shards=shards)
+    benchmark(lambda: [layout.build("clicks", name, PARTITIONS) for name in NAMES])
+
+
+@pytest.mark.parametrize("shards", [0, 64])
+def test_build_many(benchmark, shards):
+    layout = KeyLayout(prefix="landing", shards=shards)
+    benchmark(layout.build_many, "clicks", NAMES, PARTITIONS)
+
+
+def test_parse_many(benchmark):
+    layout = KeyLayout(prefix="landing", shards=64)
+    keys = layout.build_many("clicks", NAMES, PARTITIONS)
+    benchmark(layout.parse_many, keys)
@@ -0,0 +1,21 @@
+"""Startup benchmarks: import time and memory of the commons packages with and without `aws_cdk` loaded."""
+
+import pytest
+
+from benchmarks.harness import measure_import
+
+pytest.importorskip("pytest_benchmark")
+
+IMPORTS = [
+    pytest.param("import commons.utils", False, id="utils"),
+    pytest.param("import commons.model", False, id="model"),
+    pytest.param("from commons.constructs import S3 as _", True, id="constructs"),
+    pytest.param("import commons.utils, commons.model, aws_cdk", True, id="utils-model-with-cdk"),
+]
+
+
+@pytest.mark.parametrize(("statement", "loads_cdk"), IMPORTS)
+def test_import(benchmark, statement, loads_cdk):
+    result = benchmark.pedantic(measure_import, args=(statement,), rounds=3, iterations=1)
+    benchmark.extra_info.update(result)
+    assert result["aws_cdk_loaded"] is loads_cdk
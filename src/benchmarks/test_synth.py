@@ -0,0 +1,33 @@
+"""Synth-time benchmarks for commons constructs and ConfigLoader.
+
+Run with `make bench` (or `python -m pytest src/benchmarks`). Each case stores its wall time, construct count,
+peak RSS and template size in the pytest-benchmark `extra_info`, so they appear in `--benchmark-json` output.
+"""
+
+import pytest
+
+from benchmarks.harness import load_config, synth_data_lake_app
+
+pytest.importorskip("pytest_benchmark")
+
+# (buckets, tags, grants per bucket)
+APP_SIZES = [
+    pytest.param(10, 5, 1, id="small"),
+    pytest.param(50, 15, 3, id="medium"),
+    pytest.param(200, 15, 3, id="large"),
+]
+
+
+@pytest.mark.parametrize(("buckets", "tags", "grants"), APP_SIZES)
+def test_synth_data_lake_app(benchmark, buckets, tags, grants):
+    metrics = benchmark.pedantic(synth_data_lake_app, args=(buckets, tags, grants), rounds=1, iterations=1)
+    benchmark.extra_info.update(metrics.as_dict())
+    assert metrics.template_bytes > 0
+    assert metrics.construct_count >= buckets
+
+
+@pytest.mark.parametrize("tags", [5, 15, 50])
+def test_config_loader(benchmark, tags):
+    config = benchmark(load_config, tags)
+    benchmark.extra_info["tags"] = tags
+    assert len(config.tags.default) == tags
@@ -0,0 +1,15 @@
+"""Synth benchmarks comparing per-key bucket tagging with the stack-level TagEngine."""
+
+import pytest
+
+from benchmarks.harness import synth_data_lake_app
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.mark.parametrize("tagging", ["per-key", "engine"])
+@pytest.mark.parametrize(("buckets", "tags"), [pytest.param(50, 15, id="50x15"), pytest.param(200, 15, id="200x15")])
+def test_tagging(benchmark, buckets, tags, tagging):
+    metrics = benchmark.pedantic(synth_data_lake_app, args=(buckets, tags, 0, tagging), rounds=1, iterations=1)
+    benchmark.extra_info.update(metrics.as_dict())
+    benchmark.extra_info["tagging"] = tagging
@@ -1,5 +1,63 @@
-"""This is for aws constructors."""
+"""This is for aws constructors.
 
-from commons.constructs.aws.s3 import S3
+The construct modules import `aws_cdk`, which starts the jsii runtime, so they are loaded on first attribute access.
+"""
 
-__all__ = ["S3"]
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from commons.constructs.aws.athena import Athena
+    from commons.constructs.aws.compaction import Compaction
+    from commons.constructs.aws.data_lake import DataLakeBuckets
+    from commons.constructs.aws.glue import Glue
+    from commons.constructs.aws.grants import GrantPlanner
+    from commons.constructs.aws.iceberg import Iceberg
+    from commons.constructs.aws.lake_formation import LakeFormation
+    from commons.constructs.aws.s3 import S3
+    from commons.constructs.aws.sharding import LayerShards
+    from commons.constructs.aws.tagging import TagEngine
+
+# public name -> module that defines it
+_LAZY_IMPORTS: dict[str, str] = {
+    "S3": "commons.constructs.aws.s3",
+    "Athena": "commons.constructs.aws.athena",
+    "Compaction": "commons.constructs.aws.compaction",
+    "DataLakeBuckets": "commons.constructs.aws.data_lake",
+    "Glue": "commons.constructs.aws.glue",
+    "GrantPlanner": "commons.constructs.aws.grants",
+    "Iceberg": "commons.constructs.aws.iceberg",
+    "LakeFormation": "commons.constructs.aws.lake_formation",
+    "LayerShards": "commons.constructs.aws.sharding",
+    "TagEngine": "commons.constructs.aws.tagging",
+}
+
+__all__ = [
+    "S3",
+    "TagEngine",
+    "LayerShards",
+    "GrantPlanner",
+    "DataLakeBuckets",
+    "Athena",
+    "Glue",
+    "Compaction",
+    "LakeFormation",
+    "Iceberg",
+]
+
+
+def __getattr__(name: str) -> Any:
+    """Imports the construct module that defines `name` on first use."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
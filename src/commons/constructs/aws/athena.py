@@ -0,0 +1,222 @@
+"""Athena workgroups and query results bucket."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict
+
+import aws_cdk as cdk
+from constructs import Construct
+
+from commons.constructs.aws.s3 import S3
+from commons.constructs.aws.tagging import TagEngine
+from commons.utils import ConfigLoader, NamingEngine
+
+ATHENA_ENGINE_VERSION: str = "Athena engine version 3"
+# `Storage` attributes that are queried through Athena
+QUERYABLE_LAYERS: tuple[str, ...] = ("first_layer", "second_layer", "third_layer")
+DEFAULT_BYTES_SCANNED_CUTOFF_PER_QUERY: int = 100 * 1024**3
+DEFAULT_RESULT_REUSE_MAX_AGE_MINUTES: int = 60
+# tag through which clients discover how long they may reuse query results in the workgroup
+RESULT_REUSE_TAG: str = "athena:result-reuse-max-age-minutes"
+
+
+class Athena:
+    """
+    Athena class provides utilities for managing Athena workgroups within AWS CDK stacks.
+
+    Query result reuse is a per-query setting of `StartQueryExecution` and cannot be enforced by a workgroup, so each
+    workgroup carries its reuse window in the `RESULT_REUSE_TAG` tag and `result_reuse_configuration` builds the
+    matching request parameter for clients.
+
+    useful links:
+        API Reference aws_cdk.aws_athena - CfnWorkGroup: https://docs.aws.amazon.com/cdk/api/v2/python/aws_cdk.aws_athena/CfnWorkGroup.html
+        Query result reuse: https://docs.aws.amazon.com/athena/latest/ug/reusing-query-results.html
+    """
+
+    @staticmethod
+    def create_results_bucket(
+        scope: Construct,
+        bucket_name: str,
+        tags: Dict[str, str],
+        expiration_days: int = 7,
+        tag_engine: TagEngine | None = None,
+        **kwargs: Any,
+    ) -> cdk.aws_s3.Bucket:
+        """
+        Creates the bucket holding Athena query results, which are short-lived.
+
+        Arguments:
+            scope (Construct): The CDK stack in which the bucket is created.
+            bucket_name (str): The name of the bucket.
+            tags (Dict[str, str]): A dictionary of tags to add to the bucket.
+            expiration_days (int): Days after which query results expire.
+            tag_engine (TagEngine | None): Passed to `S3.create_bucket`.
+            **kwargs: Additional keyword arguments that are passed to the S3 bucket constructor.
+
+        Returns:
+            cdk.aws_s3.Bucket: The created bucket.
+        """
+        return S3.create_bucket(
+            scope=scope,
+            bucket_id=None,
+            bucket_name=bucket_name,
+            tags=tags,
+            tag_engine=tag_engine,
+            encryption=kwargs.pop("encryption", cdk.aws_s3.BucketEncryption.S3_MANAGED),
+            lifecycle_rules=kwargs.pop(
+                "lifecycle_rules",
+                [
+                    cdk.aws_s3.LifecycleRule(
+                        id="query-results",
+                        expiration=cdk.Duration.days(expiration_days),
+                        abort_incomplete_multipart_upload_after=cdk.Duration.days(1),
+                    )
+                ],
+            ),
+            **kwargs,
+        )
+
+    @staticmethod
+    def create_workgroup(
+        scope: Construct,
+        name: str,
+        results_bucket: cdk.aws_s3.IBucket,
+        tags: Dict[str, str],
+        output_prefix: str | None = None,
+        bytes_scanned_cutoff_per_query: int = DEFAULT_BYTES_SCANNED_CUTOFF_PER_QUERY,
+        result_reuse_max_age_minutes: int | None = DEFAULT_RESULT_REUSE_MAX_AGE_MINUTES,
+        tag_engine: TagEngine | None = None,
+    ) -> cdk.aws_athena.CfnWorkGroup:
+        """
+        Creates a workgroup on engine v3 with an enforced result location, a per-query scan cutoff and CloudWatch
+        metrics.
+
+        Arguments:
+            scope (Construct): The CDK stack in which the workgroup is created.
+            name (str): The name of the workgroup.
+            results_bucket (cdk.aws_s3.IBucket): The bucket receiving the query results.
+            tags (Dict[str, str]): A dictionary of tags to add to the workgroup.
+            output_prefix (str | None): The prefix of the results in the bucket. Defaults to the workgroup name.
+            bytes_scanned_cutoff_per_query (int): Queries scanning more bytes are cancelled (minimum 10 MB).
+            result_reuse_max_age_minutes (int | None): How long clients may reuse query results, or None to disable.
+            tag_engine (TagEngine | None): When provided, the tags are applied through the engine.
+
+        Returns:
+            cdk.aws_athena.CfnWorkGroup: The created workgroup.
+
+        Raises:
+            ValueError: If the workgroup name is empty or blank.
+        """
+        if not name or not name.strip():
+            raise ValueError("Workgroup name cannot be empty")
+
+        workgroup = cdk.aws_athena.CfnWorkGroup(
+            scope,
+            f"WorkGroup{name}",
+            name=name,
+            description=f"Athena workgroup {name}",
+            recursive_delete_option=True,
+            work_group_configuration=cdk.aws_athena.CfnWorkGroup.WorkGroupConfigurationProperty(
+                engine_version=cdk.aws_athena.CfnWorkGroup.EngineVersionProperty(
+                    selected_engine_version=ATHENA_ENGINE_VERSION
+                ),
+                enforce_work_group_configuration=True,
+                publish_cloud_watch_metrics_enabled=True,
+                bytes_scanned_cutoff_per_query=bytes_scanned_cutoff_per_query,
+                result_configuration=cdk.aws_athena.CfnWorkGroup.ResultConfigurationProperty(
+                    output_location=results_bucket.s3_url_for_object(f"{output_prefix or name}/"),
+                    encryption_configuration=cdk.aws_athena.CfnWorkGroup.EncryptionConfigurationProperty(
+                        encryption_option="SSE_S3"
+                    ),
+                ),
+            ),
+        )
+
+        workgroup_tags = dict(tags)
+        if result_reuse_max_age_minutes:
+            workgroup_tags[RESULT_REUSE_TAG] = str(result_reuse_max_age_minutes)
+
+        if tag_engine is not None:
+            tag_engine.tag_resource_type(
+                resource_type="AWS::Athena::WorkGroup", key="resource", value="athena workgroup"
+            )
+            tag_engine.tag(workgroup, workgroup_tags)
+            return workgroup
+
+        cdk.Tags.of(workgroup).add(key="resource", value="athena workgroup")
+        for key in workgroup_tags:
+            cdk.Tags.of(workgroup).add(key=key, value=workgroup_tags[key])
+
+        return workgroup
+
+    @staticmethod
+    def create_layer_workgroups(
+        scope: Construct,
+        config: ConfigLoader,
+        results_bucket: cdk.aws_s3.IBucket,
+        workgroup_name: Callable[[str], str] | None = None,
+        bytes_scanned_cutoff_per_query: Dict[str, int] | None = None,
+        tag_engine: TagEngine | None = None,
+        naming: NamingEngine | None = None,
+    ) -> Dict[str, cdk.aws_athena.CfnWorkGroup]:
+        """
+        Creates one workgroup per queryable `Storage` layer, writing results under `<layer name>/` in the bucket.
+
+        Arguments:
+            scope (Construct): The CDK stack in which the workgroups are created.
+            config (ConfigLoader): The loaded configuration.
+            results_bucket (cdk.aws_s3.IBucket): The bucket receiving the query results.
+            workgroup_name (Callable[[str], str] | None): Returns the workgroup name of a layer name. Defaults to
+                `<project>-<environment>-<layer>`.
+            bytes_scanned_cutoff_per_query (Dict[str, int] | None): Scan cutoffs per `Storage` attribute, overriding
+                `DEFAULT_BYTES_SCANNED_CUTOFF_PER_QUERY`.
+            tag_engine (TagEngine | None): When provided, the tags are applied through the engine.
+            naming (NamingEngine | None): When provided, every workgroup name is checked against the Athena workgroup
+                naming rules and claimed in the engine, so a name used twice in the app fails before synthesis.
+
+        Returns:
+            Dict[str, cdk.aws_athena.CfnWorkGroup]: The workgroups, keyed by `Storage` attribute.
+        """
+        cutoffs = bytes_scanned_cutoff_per_query or {}
+        workgroup_name = workgroup_name or (
+            lambda layer_name: "-".join(
+                part for part in (config.project.short_name, config.account.environment, layer_name) if part
+            )
+        )
+
+        workgroups: Dict[str, cdk.aws_athena.CfnWorkGroup] = {}
+        for layer in QUERYABLE_LAYERS:
+            layer_name = getattr(config.storage, layer)
+            if not layer_name or not layer_name.strip():
+                continue
+
+            name = workgroup_name(layer_name)
+            if naming is not None:
+                naming.claim(naming.check(name, "athena_workgroup"), "athena_workgroup", f"{scope.node.path}/{layer}")
+
+            workgroups[layer] = Athena.create_workgroup(
+                scope=scope,
+                name=name,
+                results_bucket=results_bucket,
+                tags={**config.tags.default, "Layer": layer_name},
+                output_prefix=layer_name,
+                bytes_scanned_cutoff_per_query=cutoffs.get(layer, DEFAULT_BYTES_SCANNED_CUTOFF_PER_QUERY),
+                tag_engine=tag_engine,
+            )
+
+        return workgroups
+
+    @staticmethod
+    def result_reuse_configuration(max_age_minutes: int = DEFAULT_RESULT_REUSE_MAX_AGE_MINUTES) -> Dict[str, Any]:
+        """
+        Returns the `ResultReuseConfiguration` parameter of `StartQueryExecution` for a reuse window.
+
+        Arguments:
+            max_age_minutes (int): How long previous results may be reused, in minutes.
+
+        Returns:
+            Dict[str, Any]: The request parameter.
+        """
+        return {
+            "ResultReuseByAgeConfiguration": {"Enabled": max_age_minutes > 0, "MaxAgeInMinutes": max_age_minutes}
+        }
@@ -0,0 +1,272 @@
+"""Scheduled deployment of the landing zone compaction service (`commons.service.compaction`)."""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+import aws_cdk as cdk
+from constructs import Construct
+
+from commons.constructs.aws.tagging import TagEngine
+
+COMPACTION_HANDLER: str = "commons.service.compaction.handler"
+DEFAULT_LAMBDA_SCHEDULE_MINUTES: int = 15
+DEFAULT_GLUE_SCHEDULE: str = "cron(0/15 * * * ? *)"
+# Glue 5.0 runs Python 3.11, the version `commons` requires, and ships pyarrow; Python shell jobs stop at 3.9
+GLUE_VERSION: str = "5.0"
+GLUE_WORKER_TYPE: str = "G.1X"
+
+
+class Compaction:
+    """
+    Compaction class deploys the compaction service as a scheduled Lambda function or Glue job.
+
+    Runs never overlap (reserved concurrency of 1, or one concurrent job run): the compaction ledger expects a single
+    writer. The function or job reads the source prefix, writes Parquet files and the ledger to the target bucket and,
+    with `delete_sources`, deletes the compacted objects.
+
+    useful links:
+        Lambda schedules: https://docs.aws.amazon.com/eventbridge/latest/userguide/eb-create-rule-schedule.html
+        Glue Python jobs: https://docs.aws.amazon.com/glue/latest/dg/aws-glue-programming-python.html
+    """
+
+    @staticmethod
+    def arguments(
+        source_bucket: cdk.aws_s3.IBucket,
+        target_bucket: cdk.aws_s3.IBucket,
+        source_prefix: str,
+        target_prefix: str,
+        target_file_bytes: int | None = None,
+        delete_sources: bool = False,
+    ) -> Dict[str, str]:
+        """
+        Returns the arguments of the compaction service, without the leading `--`.
+
+        Arguments:
+            source_bucket (cdk.aws_s3.IBucket): The bucket of the small objects, e.g. the landing zone bucket.
+            target_bucket (cdk.aws_s3.IBucket): The bucket receiving the Parquet files, e.g. the first layer bucket.
+            source_prefix (str): The prefix of the compacted objects, e.g. `landing/`.
+            target_prefix (str): The prefix of the Parquet files, e.g. `raw/`.
+            target_file_bytes (int | None): The size at which Parquet files are rolled, or None for the default.
+            delete_sources (bool): Whether the compacted objects are deleted.
+
+        Returns:
+            Dict[str, str]: The arguments, keyed by option name.
+        """
+        arguments = {
+            "source": f"s3://{source_bucket.bucket_name}",
+            "source-prefix": source_prefix,
+            "target": f"s3://{target_bucket.bucket_name}",
+            "target-prefix": target_prefix,
+            "delete-sources": str(delete_sources).lower(),
+        }
+        if target_file_bytes:
+            arguments["target-file-bytes"] = str(target_file_bytes)
+        return arguments
+
+    @staticmethod
+    def _grant(
+        grantee: cdk.aws_iam.IGrantable,
+        source_bucket: cdk.aws_s3.IBucket,
+        target_bucket: cdk.aws_s3.IBucket,
+        source_prefix: str,
+        delete_sources: bool,
+    ) -> None:
+        source_objects = f"{source_prefix}*"
+        source_bucket.grant_read(grantee, source_objects)
+        if delete_sources:
+            source_bucket.grant_delete(grantee, source_objects)
+        # Parquet files and ledger
+        target_bucket.grant_read_write(grantee)
+        target_bucket.grant_delete(grantee)
+
+    @staticmethod
+    def _object_arns(*urls: str | None) -> List[str]:
+        arns = []
+        for url in filter(None, urls):
+            for location in url.split(","):
+                if not location.startswith("s3://"):
+                    raise ValueError(f"Expected an S3 URL, got {location!r}")
+                arns.append(f"arn:{cdk.Aws.PARTITION}:s3:::{location.removeprefix('s3://')}")
+        return arns
+
+    @staticmethod
+    def _tag(constructs: List[Construct], tags: Dict[str, str], tag_engine: TagEngine | None) -> None:
+        if tag_engine is not None:
+            for construct in constructs:
+                tag_engine.tag(construct, tags)
+            return
+
+        for construct in constructs:
+            for key in tags:
+                cdk.Tags.of(construct).add(key=key, value=tags[key])
+
+    @staticmethod
+    def create_lambda(
+        scope: Construct,
+        name: str,
+        source_bucket: cdk.aws_s3.IBucket,
+        target_bucket: cdk.aws_s3.IBucket,
+        code: cdk.aws_lambda.Code,
+        tags: Dict[str, str],
+        source_prefix: str = "",
+        target_prefix: str = "",
+        schedule: cdk.aws_events.Schedule | None = None,
+        layers: List[cdk.aws_lambda.ILayerVersion] | None = None,
+        memory_size: int = 3008,
+        timeout: cdk.Duration | None = None,
+        target_file_bytes: int | None = None,
+        delete_sources: bool = False,
+        tag_engine: TagEngine | None = None,
+    ) -> cdk.aws_lambda.Function:
+        """
+        Creates the compaction function and the EventBridge rule invoking it.
+
+        Arguments:
+            scope (Construct): The CDK stack in which the function is created.
+            name (str): The name of the function.
+            source_bucket (cdk.aws_s3.IBucket): The bucket of the small objects, e.g. the landing zone bucket.
+            target_bucket (cdk.aws_s3.IBucket): The bucket receiving the Parquet files, e.g. the first layer bucket.
+            code (cdk.aws_lambda.Code): The package holding `commons`.
+            tags (Dict[str, str]): A dictionary of tags to add to the function and the rule.
+            source_prefix (str): The prefix of the compacted objects, e.g. `landing/`.
+            target_prefix (str): The prefix of the Parquet files, e.g. `raw/`.
+            schedule (cdk.aws_events.Schedule | None): The schedule. Defaults to every
+                `DEFAULT_LAMBDA_SCHEDULE_MINUTES` minutes.
+            layers (List[cdk.aws_lambda.ILayerVersion] | None): Layers providing pyarrow, e.g. AWS SDK for pandas.
+            memory_size (int): The memory of the function, in MB; CPU grows with it.
+            timeout (cdk.Duration | None): The timeout. Defaults to the 15 minutes maximum.
+            target_file_bytes (int | None): The size at which Parquet files are rolled, or None for the default.
+            delete_sources (bool): Whether the compacted objects are deleted.
+            tag_engine (TagEngine | None): When provided, the tags are applied through the engine.
+
+        Returns:
+            cdk.aws_lambda.Function: The created function.
+        """
+        arguments = Compaction.arguments(
+            source_bucket, target_bucket, source_prefix, target_prefix, target_file_bytes, delete_sources
+        )
+        function = cdk.aws_lambda.Function(
+            scope,
+            f"CompactionFunction{name}",
+            function_name=name,
+            runtime=cdk.aws_lambda.Runtime.PYTHON_3_11,
+            handler=COMPACTION_HANDLER,
+            code=code,
+            layers=layers,
+            memory_size=memory_size,
+            timeout=timeout or cdk.Duration.minutes(15),
+            reserved_concurrent_executions=1,
+            environment={f"COMPACTION_{key.upper().replace('-', '_')}": value for key, value in arguments.items()},
+        )
+        Compaction._grant(function, source_bucket, target_bucket, source_prefix, delete_sources)
+
+        rule = cdk.aws_events.Rule(
+            scope,
+            f"CompactionSchedule{name}",
+            schedule=schedule or cdk.aws_events.Schedule.rate(cdk.Duration.minutes(DEFAULT_LAMBDA_SCHEDULE_MINUTES)),
+            targets=[cdk.aws_events_targets.LambdaFunction(function, retry_attempts=0)],
+        )
+        Compaction._tag([function, rule], {"resource": "lambda function", **tags}, tag_engine)
+        return function
+
+    @staticmethod
+    def create_glue_job(
+        scope: Construct,
+        name: str,
+        source_bucket: cdk.aws_s3.IBucket,
+        target_bucket: cdk.aws_s3.IBucket,
+        script_location: str,
+        tags: Dict[str, str],
+        source_prefix: str = "",
+        target_prefix: str = "",
+        extra_py_files: str | None = None,
+        python_modules: str | None = None,
+        schedule: str = DEFAULT_GLUE_SCHEDULE,
+        number_of_workers: int = 2,
+        target_file_bytes: int | None = None,
+        delete_sources: bool = False,
+        tag_engine: TagEngine | None = None,
+    ) -> cdk.aws_glue.CfnJob:
+        """
+        Creates the compaction Glue job and the scheduled trigger starting it.
+
+        The job runs the script as a Glue 5.0 Python job, on Python 3.11. Its role can read the script and the files
+        listed in `extra_py_files` and `python_modules`, wherever they are stored.
+
+        Arguments:
+            scope (Construct): The CDK stack in which the job is created.
+            name (str): The name of the job.
+            source_bucket (cdk.aws_s3.IBucket): The bucket of the small objects, e.g. the landing zone bucket.
+            target_bucket (cdk.aws_s3.IBucket): The bucket receiving the Parquet files, e.g. the first layer bucket.
+            script_location (str): The S3 URL of a script calling `commons.service.compaction.main()`.
+            tags (Dict[str, str]): A dictionary of tags to add to the job and the trigger.
+            source_prefix (str): The prefix of the compacted objects, e.g. `landing/`.
+            target_prefix (str): The prefix of the Parquet files, e.g. `raw/`.
+            extra_py_files (str | None): Comma-separated S3 URLs of Python files or zip archives added to the path.
+            python_modules (str | None): Comma-separated S3 URLs of wheels installed before the run, e.g. the wheel
+                holding `commons`; pip also installs their dependencies.
+            schedule (str): The cron expression of the trigger.
+            number_of_workers (int): The `G.1X` workers of the job, at least 2.
+            target_file_bytes (int | None): The size at which Parquet files are rolled, or None for the default.
+            delete_sources (bool): Whether the compacted objects are deleted.
+            tag_engine (TagEngine | None): When provided, the tags are applied through the engine.
+
+        Returns:
+            cdk.aws_glue.CfnJob: The created job.
+
+        Raises:
+            ValueError: If the script or a file is not an S3 URL.
+        """
+        role = cdk.aws_iam.Role(
+            scope,
+            f"CompactionJobRole{name}",
+            assumed_by=cdk.aws_iam.ServicePrincipal("glue.amazonaws.com"),
+            managed_policies=[
+                cdk.aws_iam.ManagedPolicy.from_aws_managed_policy_name("service-role/AWSGlueServiceRole")
+            ],
+        )
+        Compaction._grant(role, source_bucket, target_bucket, source_prefix, delete_sources)
+        # AWSGlueServiceRole only reads the aws-glue-* buckets
+        role.add_to_policy(
+            cdk.aws_iam.PolicyStatement(
+                actions=["s3:GetObject"],
+                resources=Compaction._object_arns(script_location, extra_py_files, python_modules),
+            )
+        )
+
+        arguments = Compaction.arguments(
+            source_bucket, target_bucket, source_prefix, target_prefix, target_file_bytes, delete_sources
+        )
+        default_arguments = {f"--{key}": value for key, value in arguments.items()}
+        if extra_py_files:
+            default_arguments["--extra-py-files"] = extra_py_files
+        if python_modules:
+            default_arguments["--additional-python-modules"] = python_modules
+
+        job = cdk.aws_glue.CfnJob(
+            scope,
+            f"CompactionJob{name}",
+            name=name,
+            role=role.role_arn,
+            command=cdk.aws_glue.CfnJob.JobCommandProperty(
+                name="glueetl", python_version="3", script_location=script_location
+            ),
+            glue_version=GLUE_VERSION,
+            worker_type=GLUE_WORKER_TYPE,
+            number_of_workers=number_of_workers,
+            default_arguments=default_arguments,
+            execution_property=cdk.aws_glue.CfnJob.ExecutionPropertyProperty(max_concurrent_runs=1),
+            max_retries=0,
+        )
+        trigger = cdk.aws_glue.CfnTrigger(
+            scope,
+            f"CompactionTrigger{name}",
+            name=f"{name}-schedule",
+            type="SCHEDULED",
+            schedule=schedule,
+            start_on_creation=True,
+            actions=[cdk.aws_glue.CfnTrigger.ActionProperty(job_name=job.ref)],
+        )
+        Compaction._tag([job, trigger], {"resource": "glue job", **tags}, tag_engine)
+        return job
@@ -0,0 +1,172 @@
+"""Factory that creates the buckets of all storage layers with their storage profiles."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict
+
+import aws_cdk as cdk
+from constructs import Construct
+
+from commons.constructs.aws.s3 import S3
+from commons.constructs.aws.tagging import TagEngine
+from commons.model import Storage, StorageProfile
+from commons.model.storage_profile import DEFAULT_STORAGE_PROFILES
+from commons.utils import ConfigLoader, NamingEngine
+
+# `Storage` attributes, in the order the buckets are created
+STORAGE_LAYERS: tuple[str, ...] = ("landing_zone", "first_layer", "second_layer", "third_layer", "assets")
+
+
+class DataLakeBuckets:
+    """
+    DataLakeBuckets creates the bucket of every configured `Storage` layer in one call.
+
+    Each layer gets the settings of its `StorageProfile` (see `DEFAULT_STORAGE_PROFILES`): lifecycle transitions,
+    Intelligent-Tiering archive configurations, expiration of current and noncurrent versions, abort of incomplete
+    multipart uploads and SSE-KMS with S3 Bucket Keys, on top of the SSL/TLS settings of `S3.create_bucket`.
+
+    useful links:
+        Intelligent-Tiering: https://docs.aws.amazon.com/AmazonS3/latest/userguide/intelligent-tiering-overview.html
+        S3 Bucket Keys: https://docs.aws.amazon.com/AmazonS3/latest/userguide/bucket-key.html
+    """
+
+    @staticmethod
+    def default_bucket_name(config: ConfigLoader, layer_name: str) -> str:
+        """
+        Returns the default bucket name of a layer: `<company>-<project>-<environment>-<layer>`, lowercased.
+
+        Arguments:
+            config (ConfigLoader): The loaded configuration.
+            layer_name (str): The name of the layer in `Storage`, e.g. `raw`.
+
+        Returns:
+            str: The bucket name.
+        """
+        parts = [config.company.short_name, config.project.short_name, config.account.environment, layer_name]
+        return "-".join(part.strip() for part in parts if part and part.strip()).lower().replace(" ", "-")
+
+    @staticmethod
+    def bucket_properties(profile: StorageProfile, encryption_key: cdk.aws_kms.IKey | None) -> Dict[str, Any]:
+        """
+        Converts a storage profile into `cdk.aws_s3.Bucket` keyword arguments.
+
+        Arguments:
+            profile (StorageProfile): The storage profile.
+            encryption_key (cdk.aws_kms.IKey | None): The KMS key used when the profile enables KMS encryption.
+
+        Returns:
+            Dict[str, Any]: The keyword arguments.
+        """
+        properties: Dict[str, Any] = {"versioned": profile.versioned}
+
+        if profile.kms_encryption:
+            properties["encryption"] = cdk.aws_s3.BucketEncryption.KMS
+            properties["encryption_key"] = encryption_key
+            properties["bucket_key_enabled"] = True
+        else:
+            properties["encryption"] = cdk.aws_s3.BucketEncryption.S3_MANAGED
+
+        rule: Dict[str, Any] = {}
+        if profile.transitions:
+            rule["transitions"] = [
+                cdk.aws_s3.Transition(
+                    storage_class=cdk.aws_s3.StorageClass(storage_class),
+                    transition_after=cdk.Duration.days(days),
+                )
+                for storage_class, days in profile.transitions.items()
+            ]
+        if profile.expiration_days:
+            rule["expiration"] = cdk.Duration.days(profile.expiration_days)
+        if profile.noncurrent_version_expiration_days and profile.versioned:
+            rule["noncurrent_version_expiration"] = cdk.Duration.days(profile.noncurrent_version_expiration_days)
+        if profile.abort_incomplete_multipart_upload_days:
+            rule["abort_incomplete_multipart_upload_after"] = cdk.Duration.days(
+                profile.abort_incomplete_multipart_upload_days
+            )
+        if rule:
+            properties["lifecycle_rules"] = [cdk.aws_s3.LifecycleRule(id="storage-profile", **rule)]
+
+        if profile.intelligent_tiering_archive:
+            properties["intelligent_tiering_configurations"] = [
+                cdk.aws_s3.IntelligentTieringConfiguration(
+                    name="archive",
+                    archive_access_tier_time=(
+                        cdk.Duration.days(profile.archive_access_days) if profile.archive_access_days else None
+                    ),
+                    deep_archive_access_tier_time=(
+                        cdk.Duration.days(profile.deep_archive_access_days)
+                        if profile.deep_archive_access_days
+                        else None
+                    ),
+                )
+            ]
+
+        return properties
+
+    @staticmethod
+    def create(
+        scope: Construct,
+        config: ConfigLoader,
+        profiles: Dict[str, StorageProfile] | None = None,
+        bucket_name: Callable[[str], str] | None = None,
+        encryption_key: cdk.aws_kms.IKey | None = None,
+        tag_engine: TagEngine | None = None,
+        scopes: Dict[str, Construct] | None = None,
+        naming: NamingEngine | None = None,
+    ) -> Dict[str, cdk.aws_s3.Bucket]:
+        """
+        Creates the bucket of every layer configured in `config.storage`. Layers left blank are skipped.
+
+        Arguments:
+            scope (Construct): The stack in which the buckets (and the KMS key, if needed) are created.
+            config (ConfigLoader): The loaded configuration.
+            profiles (Dict[str, StorageProfile] | None): Profiles per `Storage` attribute, overriding the defaults.
+            bucket_name (Callable[[str], str] | None): Returns the bucket name of a layer name. Defaults to
+                `default_bucket_name`.
+            encryption_key (cdk.aws_kms.IKey | None): The KMS key for SSE-KMS. When not provided and a profile needs
+                one, a key with rotation enabled is created in `scope`.
+            tag_engine (TagEngine | None): Passed to `S3.create_bucket`.
+            scopes (Dict[str, Construct] | None): Per-layer scopes (e.g. from `LayerShards`) overriding `scope`.
+            naming (NamingEngine | None): When provided, every bucket name is checked against the S3 naming rules
+                and claimed in the engine, so a name used twice in the app fails before synthesis. Without
+                `bucket_name`, the names are also rendered by the engine (`<pattern>` with `s3` and the layer name).
+
+        Returns:
+            Dict[str, cdk.aws_s3.Bucket]: The buckets, keyed by `Storage` attribute.
+        """
+        storage: Storage = config.storage
+        profiles = {**DEFAULT_STORAGE_PROFILES, **(profiles or {})}
+        scopes = scopes or {}
+        if bucket_name is None:
+            bucket_name = (
+                (lambda layer_name: naming.render("s3", layer_name, service="s3"))
+                if naming is not None
+                else (lambda layer_name: DataLakeBuckets.default_bucket_name(config, layer_name))
+            )
+
+        buckets: Dict[str, cdk.aws_s3.Bucket] = {}
+        for layer in STORAGE_LAYERS:
+            layer_name = getattr(storage, layer)
+            if not layer_name or not layer_name.strip():
+                continue
+
+            profile = profiles.get(layer, StorageProfile())
+            if profile.kms_encryption and encryption_key is None:
+                encryption_key = cdk.aws_kms.Key(
+                    scope, "DataLakeKey", description="Data lake buckets encryption key", enable_key_rotation=True
+                )
+
+            name = bucket_name(layer_name)
+            if naming is not None:
+                naming.claim(naming.check(name, "s3"), "s3", f"{scopes.get(layer, scope).node.path}/{layer}")
+
+            buckets[layer] = S3.create_bucket(
+                scope=scopes.get(layer, scope),
+                bucket_id=None,
+                bucket_name=name,
+                tags={**config.tags.default, "Layer": layer_name},
+                tag_engine=tag_engine,
+                **DataLakeBuckets.bucket_properties(profile, encryption_key),
+            )
+
+        return buckets
@@ -0,0 +1,360 @@
+"""Glue databases and tables."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Dict
+
+import aws_cdk as cdk
+from constructs import Construct
+
+from commons.constructs.aws.tagging import TagEngine
+from commons.model import Storage, TableDefinition
+from commons.utils import ConfigLoader
+
+# input format, output format, serde and serde parameters per `TableDefinition.data_format`
+DATA_FORMATS: Dict[str, Dict[str, str | Dict[str, str]]] = {
+    "parquet": {
+        "input_format": "org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat",
+        "output_format": "org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat",
+        "serde": "org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe",
+        "serde_parameters": {"serialization.format": "1"},
+    },
+    "json": {
+        "input_format": "org.apache.hadoop.mapred.TextInputFormat",
+        "output_format": "org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat",
+        "serde": "org.openx.data.jsonserde.JsonSerDe",
+        "serde_parameters": {},
+    },
+    "csv": {
+        "input_format": "org.apache.hadoop.mapred.TextInputFormat",
+        "output_format": "org.apache.hadoop.hive.ql.io.HiveIgnoreKeyTextOutputFormat",
+        "serde": "org.apache.hadoop.hive.serde2.lazy.LazySimpleSerDe",
+        "serde_parameters": {"field.delim": ",", "skip.header.line.count": "1"},
+    },
+}
+
+
+# crawls only the folders added since the last run; requires the LOG schema change policy
+CRAWL_NEW_FOLDERS_ONLY: str = "CRAWL_NEW_FOLDERS_ONLY"
+# crawls only the objects reported by S3 event notifications through an SQS queue
+CRAWL_EVENT_MODE: str = "CRAWL_EVENT_MODE"
+TABLE_GROUPING_POLICIES: tuple[str, ...] = ("CombineCompatibleSchemas",)
+# bounds of the number of files sampled per leaf folder
+MIN_SAMPLE_SIZE: int = 1
+MAX_SAMPLE_SIZE: int = 249
+# permissions the crawler needs on its event queue
+EVENT_QUEUE_ACTIONS: tuple[str, ...] = (
+    "sqs:DeleteMessage",
+    "sqs:GetQueueUrl",
+    "sqs:ListDeadLetterSourceQueues",
+    "sqs:ReceiveMessage",
+    "sqs:GetQueueAttributes",
+    "sqs:ListQueueTags",
+    "sqs:SetQueueAttributes",
+    "sqs:PurgeQueue",
+)
+
+
+class Glue:
+    """
+    Glue class provides utilities for managing Glue Data Catalog databases and tables within AWS CDK stacks.
+
+    Tables are declared from a `TableDefinition`. Partitioned tables use Athena partition projection: the partition
+    values are computed from the projection parameters instead of being listed from the catalog, so no crawler is
+    needed to register partitions and query planning does not fetch partition metadata.
+
+    useful links:
+        Partition projection: https://docs.aws.amazon.com/athena/latest/ug/partition-projection.html
+        Naming rules: https://docs.aws.amazon.com/athena/latest/ug/tables-databases-columns-names.html
+        Incremental crawls: https://docs.aws.amazon.com/glue/latest/dg/incremental-crawls.html
+        Event mode crawls: https://docs.aws.amazon.com/glue/latest/dg/crawler-s3-event-notifications.html
+    """
+
+    @staticmethod
+    def create_database(
+        scope: Construct,
+        database_name: str,
+        description: str | None = None,
+        location_uri: str | None = None,
+    ) -> cdk.aws_glue.CfnDatabase:
+        """
+        Creates a Glue database in the stack's account catalog.
+
+        Arguments:
+            scope (Construct): The CDK stack in which the database is created.
+            database_name (str): The name of the database (lowercase, underscores).
+            description (str | None): An optional description.
+            location_uri (str | None): An optional default location, e.g. `s3://bucket/raw/`.
+
+        Returns:
+            cdk.aws_glue.CfnDatabase: The created database.
+
+        Raises:
+            ValueError: If the database name is empty or blank.
+        """
+        if not database_name or not database_name.strip():
+            raise ValueError("Database name cannot be empty")
+
+        return cdk.aws_glue.CfnDatabase(
+            scope,
+            f"Database{database_name}",
+            catalog_id=cdk.Stack.of(scope).account,
+            database_input=cdk.aws_glue.CfnDatabase.DatabaseInputProperty(
+                name=database_name,
+                description=description,
+                location_uri=location_uri,
+            ),
+        )
+
+    @staticmethod
+    def create_table(
+        scope: Construct,
+        database: cdk.aws_glue.CfnDatabase,
+        definition: TableDefinition,
+        bucket: cdk.aws_s3.IBucket,
+        storage: Storage,
+    ) -> cdk.aws_glue.CfnTable:
+        """
+        Creates an external table from its definition, with partition projection when it is partitioned.
+
+        Arguments:
+            scope (Construct): The CDK stack in which the table is created.
+            database (cdk.aws_glue.CfnDatabase): The database of the table.
+            definition (TableDefinition): The table definition.
+            bucket (cdk.aws_s3.IBucket): The bucket of the definition's layer.
+            storage (Storage): The storage layers, used for the layer prefix of the location.
+
+        Returns:
+            cdk.aws_glue.CfnTable: The created table.
+        """
+        data_format = DATA_FORMATS[definition.data_format]
+        parameters = {
+            "EXTERNAL": "TRUE",
+            "classification": definition.data_format,
+            **definition.projection_parameters(bucket.bucket_name, storage),
+        }
+
+        table = cdk.aws_glue.CfnTable(
+            scope,
+            f"Table{definition.name}",
+            catalog_id=database.catalog_id,
+            database_name=database.ref,
+            table_input=cdk.aws_glue.CfnTable.TableInputProperty(
+                name=definition.name,
+                description=definition.description,
+                table_type="EXTERNAL_TABLE",
+                parameters=parameters,
+                partition_keys=[
+                    cdk.aws_glue.CfnTable.ColumnProperty(name=key.name, type=key.type)
+                    for key in definition.partition_keys
+                ],
+                storage_descriptor=cdk.aws_glue.CfnTable.StorageDescriptorProperty(
+                    columns=[
+                        cdk.aws_glue.CfnTable.ColumnProperty(name=column.name, type=column.type, comment=column.comment)
+                        for column in definition.columns
+                    ],
+                    location=definition.location(bucket.bucket_name, storage),
+                    input_format=data_format["input_format"],
+                    output_format=data_format["output_format"],
+                    serde_info=cdk.aws_glue.CfnTable.SerdeInfoProperty(
+                        serialization_library=data_format["serde"],
+                        parameters=data_format["serde_parameters"] or None,
+                    ),
+                ),
+            ),
+        )
+        return table
+
+    @staticmethod
+    def create_crawler(
+        scope: Construct,
+        name: str,
+        database_name: str,
+        bucket: cdk.aws_s3.IBucket,
+        tags: Dict[str, str],
+        path_prefix: str = "",
+        event_mode: bool = False,
+        sample_size: int | None = None,
+        table_grouping_policy: str | None = None,
+        table_level: int | None = None,
+        exclusions: list[str] | None = None,
+        schedule: str | None = None,
+        role: cdk.aws_iam.IRole | None = None,
+        tag_engine: TagEngine | None = None,
+    ) -> cdk.aws_glue.CfnCrawler:
+        """
+        Creates a crawler over a bucket prefix that only crawls new data after its first run.
+
+        By default the crawler recrawls new folders only (`CRAWL_NEW_FOLDERS_ONLY`). With `event_mode`, object created
+        and removed notifications of the prefix are sent to an SQS queue (with a dead-letter queue) and the crawler
+        only visits the objects they report (`CRAWL_EVENT_MODE`), so a run costs in proportion to the new data instead
+        of the size of the prefix.
+
+        Arguments:
+            scope (Construct): The CDK stack in which the crawler is created.
+            name (str): The name of the crawler.
+            database_name (str): The database receiving the tables.
+            bucket (cdk.aws_s3.IBucket): The crawled bucket, e.g. from `S3.create_bucket`.
+            tags (Dict[str, str]): A dictionary of tags to add to the crawler and its queues.
+            path_prefix (str): The crawled prefix of the bucket, e.g. `raw/`. Defaults to the whole bucket.
+            event_mode (bool): Whether the crawler consumes S3 event notifications.
+            sample_size (int | None): The number of files crawled per leaf folder (1 to 249), or None for all.
+            table_grouping_policy (str | None): One of `TABLE_GROUPING_POLICIES`, or None.
+            table_level (int | None): The folder depth at which tables are created, counted from the bucket.
+            exclusions (list[str] | None): Glob patterns of excluded keys.
+            schedule (str | None): A cron expression, e.g. `cron(0 * * * ? *)`, or None to run on demand.
+            role (cdk.aws_iam.IRole | None): The crawler role. Defaults to a role with `AWSGlueServiceRole` and read
+                access to the prefix.
+            tag_engine (TagEngine | None): When provided, the tags are applied through the engine.
+
+        Returns:
+            cdk.aws_glue.CfnCrawler: The created crawler.
+
+        Raises:
+            ValueError: If the name is blank, the sample size is out of range or the grouping policy is unknown.
+        """
+        if not name or not name.strip():
+            raise ValueError("Crawler name cannot be empty")
+        if sample_size is not None and not MIN_SAMPLE_SIZE <= sample_size <= MAX_SAMPLE_SIZE:
+            raise ValueError(f"Sample size must be between {MIN_SAMPLE_SIZE} and {MAX_SAMPLE_SIZE}")
+        if table_grouping_policy is not None and table_grouping_policy not in TABLE_GROUPING_POLICIES:
+            raise ValueError(f"Unsupported table grouping policy: {table_grouping_policy}")
+
+        path_prefix = path_prefix.strip("/")
+        if role is None:
+            role = cdk.aws_iam.Role(
+                scope,
+                f"CrawlerRole{name}",
+                assumed_by=cdk.aws_iam.ServicePrincipal("glue.amazonaws.com"),
+                managed_policies=[
+                    cdk.aws_iam.ManagedPolicy.from_aws_managed_policy_name("service-role/AWSGlueServiceRole")
+                ],
+            )
+            bucket.grant_read(role, f"{path_prefix}/*" if path_prefix else "*")
+
+        event_queue = dead_letter_queue = None
+        if event_mode:
+            dead_letter_queue = cdk.aws_sqs.Queue(
+                scope,
+                f"CrawlerDeadLetterQueue{name}",
+                encryption=cdk.aws_sqs.QueueEncryption.SQS_MANAGED,
+                enforce_ssl=True,
+                retention_period=cdk.Duration.days(14),
+            )
+            event_queue = cdk.aws_sqs.Queue(
+                scope,
+                f"CrawlerEventQueue{name}",
+                encryption=cdk.aws_sqs.QueueEncryption.SQS_MANAGED,
+                enforce_ssl=True,
+                retention_period=cdk.Duration.days(14),
+                dead_letter_queue=cdk.aws_sqs.DeadLetterQueue(max_receive_count=3, queue=dead_letter_queue),
+            )
+            key_filter = cdk.aws_s3.NotificationKeyFilter(prefix=f"{path_prefix}/" if path_prefix else None)
+            for event_type in (cdk.aws_s3.EventType.OBJECT_CREATED, cdk.aws_s3.EventType.OBJECT_REMOVED):
+                bucket.add_event_notification(
+                    event_type, cdk.aws_s3_notifications.SqsDestination(event_queue), key_filter
+                )
+            for queue in (event_queue, dead_letter_queue):
+                queue.grant(role, *EVENT_QUEUE_ACTIONS)
+
+        configuration: Dict[str, object] = {"Version": 1.0}
+        grouping: Dict[str, object] = {}
+        if table_grouping_policy:
+            grouping["TableGroupingPolicy"] = table_grouping_policy
+        if table_level:
+            grouping["TableLevelConfiguration"] = table_level
+        if grouping:
+            configuration["Grouping"] = grouping
+
+        crawler = cdk.aws_glue.CfnCrawler(
+            scope,
+            f"Crawler{name}",
+            name=name,
+            role=role.role_arn,
+            database_name=database_name,
+            targets=cdk.aws_glue.CfnCrawler.TargetsProperty(
+                s3_targets=[
+                    cdk.aws_glue.CfnCrawler.S3TargetProperty(
+                        path=f"s3://{bucket.bucket_name}/{path_prefix}",
+                        exclusions=exclusions,
+                        sample_size=sample_size,
+                        event_queue_arn=event_queue.queue_arn if event_queue else None,
+                        dlq_event_queue_arn=dead_letter_queue.queue_arn if dead_letter_queue else None,
+                    )
+                ]
+            ),
+            recrawl_policy=cdk.aws_glue.CfnCrawler.RecrawlPolicyProperty(
+                recrawl_behavior=CRAWL_EVENT_MODE if event_mode else CRAWL_NEW_FOLDERS_ONLY
+            ),
+            # incremental crawls cannot update or delete existing tables
+            schema_change_policy=cdk.aws_glue.CfnCrawler.SchemaChangePolicyProperty(
+                update_behavior="LOG", delete_behavior="LOG"
+            ),
+            configuration=json.dumps(configuration),
+            schedule=cdk.aws_glue.CfnCrawler.ScheduleProperty(schedule_expression=schedule) if schedule else None,
+        )
+
+        tagged = [crawler] + [queue for queue in (event_queue, dead_letter_queue) if queue is not None]
+        if tag_engine is not None:
+            tag_engine.tag_resource_type(resource_type="AWS::Glue::Crawler", key="resource", value="glue crawler")
+            tag_engine.tag_resource_type(resource_type="AWS::SQS::Queue", key="resource", value="sqs queue")
+            for construct in tagged:
+                tag_engine.tag(construct, tags)
+            return crawler
+
+        cdk.Tags.of(crawler).add(key="resource", value="glue crawler")
+        for queue in tagged[1:]:
+            cdk.Tags.of(queue).add(key="resource", value="sqs queue")
+        for construct in tagged:
+            for key in tags:
+                cdk.Tags.of(construct).add(key=key, value=tags[key])
+
+        return crawler
+
+    @staticmethod
+    def create_layer_crawler(
+        scope: Construct,
+        config: ConfigLoader,
+        bucket: cdk.aws_s3.IBucket,
+        database_name: str | None = None,
+        crawler_name: str | None = None,
+        event_mode: bool = True,
+        tag_engine: TagEngine | None = None,
+        **kwargs: Any,
+    ) -> cdk.aws_glue.CfnCrawler:
+        """
+        Creates the crawler of the first layer, over the `<first layer>/` prefix of its bucket.
+
+        Arguments:
+            scope (Construct): The CDK stack in which the crawler is created.
+            config (ConfigLoader): The loaded configuration.
+            bucket (cdk.aws_s3.IBucket): The first layer bucket, e.g. `DataLakeBuckets.create(...)["first_layer"]`.
+            database_name (str | None): The database receiving the tables. Defaults to the layer name.
+            crawler_name (str | None): The crawler name. Defaults to `<project>-<environment>-<layer>`.
+            event_mode (bool): Whether the crawler consumes S3 event notifications.
+            tag_engine (TagEngine | None): When provided, the tags are applied through the engine.
+            **kwargs: Additional keyword arguments that are passed to `create_crawler`.
+
+        Returns:
+            cdk.aws_glue.CfnCrawler: The created crawler.
+
+        Raises:
+            ValueError: If the first layer is not configured.
+        """
+        layer_name = config.storage.first_layer
+        if not layer_name or not layer_name.strip():
+            raise ValueError("First layer is not configured")
+
+        return Glue.create_crawler(
+            scope=scope,
+            name=crawler_name
+            or "-".join(part for part in (config.project.short_name, config.account.environment, layer_name) if part),
+            database_name=database_name or layer_name.lower().replace("-", "_"),
+            bucket=bucket,
+            tags={**config.tags.default, "Layer": layer_name},
+            path_prefix=layer_name,
+            event_mode=event_mode,
+            tag_engine=tag_engine,
+            **kwargs,
+        )
@@ -0,0 +1,145 @@
+"""Stack-wide planner that merges S3 bucket grants into a minimal set of IAM statements."""
+
+from __future__ import annotations
+
+import json
+from typing import Dict, FrozenSet, List, Tuple
+
+import aws_cdk as cdk
+
+# same actions as `Bucket.grant_read` / `Bucket.grant_write` (with `@aws-cdk/aws-s3:grantWriteWithoutAcl`)
+BUCKET_READ_ACTIONS: Tuple[str, ...] = ("s3:GetObject*", "s3:GetBucket*", "s3:List*")
+BUCKET_WRITE_ACTIONS: Tuple[str, ...] = (
+    "s3:DeleteObject*",
+    "s3:PutObject",
+    "s3:PutObjectLegalHold",
+    "s3:PutObjectRetention",
+    "s3:PutObjectTagging",
+    "s3:PutObjectVersionTagging",
+    "s3:Abort*",
+)
+GRANT_ACTIONS: Dict[str, FrozenSet[str]] = {
+    "read": frozenset({"read"}),
+    "write": frozenset({"write"}),
+    "read_write": frozenset({"read", "write"}),
+}
+
+
+class GrantPlanner:
+    """
+    GrantPlanner collects the S3 grants requested for a whole stack and applies them as few IAM statements.
+
+    `Bucket.grant_read`/`grant_write` add one statement per (bucket, principal) pair. The planner instead groups, per
+    principal, the buckets that share the same set of actions into a single statement listing all their ARNs, so the
+    statement count scales with the distinct action sets rather than with the buckets.
+
+    Usage:
+    ```python
+    planner = GrantPlanner()
+    S3.apply_permissions(bucket=raw, permissions=[{"action": "read", "principal": role}], planner=planner)
+    S3.add_bucket_permission(bucket=stage, action="read_write", principal=role, planner=planner)
+    report = planner.apply()
+    ```
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty plan."""
+        # principal id -> (principal, bucket id -> (bucket, requested grants)). The objects are kept in the plan, so
+        # their ids stay valid; keying by id avoids a jsii round trip per recorded grant.
+        self._plan: Dict[int, Tuple[cdk.aws_iam.IGrantable, Dict[int, Tuple[cdk.aws_s3.IBucket, set[str]]]]] = {}
+        self._arns: Dict[int, Tuple[str, str]] = {}
+        self.requested: int = 0
+
+    def add(self, bucket: cdk.aws_s3.IBucket, action: str, principal: cdk.aws_iam.IGrantable) -> None:
+        """
+        Records a grant. Nothing is added to the stack until `apply` is called.
+
+        Arguments:
+            bucket (cdk.aws_s3.IBucket): The bucket to grant access to.
+            action (str): The type of permission. Valid values are 'read', 'write', and 'read_write'.
+            principal (cdk.aws_iam.IGrantable): The principal receiving the permission.
+
+        Raises:
+            ValueError: If an unsupported action is provided in the 'action' parameter.
+        """
+        if action not in GRANT_ACTIONS:
+            raise ValueError(f"Unsupported action '{action}', expected one of {', '.join(GRANT_ACTIONS)}")
+
+        _, buckets = self._plan.setdefault(id(principal), (principal, {}))
+        _, grants = buckets.setdefault(id(bucket), (bucket, set()))
+        grants.update(GRANT_ACTIONS[action])
+        self.requested += 1
+
+    def _statement(self, actions: FrozenSet[str], buckets: List[cdk.aws_s3.IBucket]) -> cdk.aws_iam.PolicyStatement:
+        statement_actions: List[str] = []
+        if "read" in actions:
+            statement_actions.extend(BUCKET_READ_ACTIONS)
+        if "write" in actions:
+            statement_actions.extend(BUCKET_WRITE_ACTIONS)
+
+        resources: List[str] = []
+        for bucket in buckets:
+            if id(bucket) not in self._arns:
+                self._arns[id(bucket)] = (bucket.bucket_arn, bucket.arn_for_objects("*"))
+            resources.extend(self._arns[id(bucket)])
+        return cdk.aws_iam.PolicyStatement(actions=statement_actions, resources=resources)
+
+    def apply(self) -> Dict[str, int]:
+        """
+        Adds the merged statements to the principals' policies and clears the plan.
+
+        Principals without an identity policy (e.g. service or account principals) get the statements on the
+        buckets' resource policies instead. KMS-encrypted buckets also grant the matching key permissions.
+
+        Returns:
+            Dict[str, int]: The number of requested grants, of statements and of policy bytes, before (one statement
+            per bucket and principal, as `grant_*` does) and after merging.
+        """
+        report = {
+            "requested_grants": self.requested,
+            "statements_before": 0,
+            "statements_after": 0,
+            "policy_bytes_before": 0,
+            "policy_bytes_after": 0,
+        }
+
+        encryption_keys: Dict[int, cdk.aws_kms.IKey | None] = {}
+        for principal, buckets in self._plan.values():
+            groups: Dict[FrozenSet[str], List[cdk.aws_s3.IBucket]] = {}
+            for bucket, grants in buckets.values():
+                groups.setdefault(frozenset(grants), []).append(bucket)
+                if id(bucket) not in encryption_keys:
+                    encryption_keys[id(bucket)] = bucket.encryption_key
+                self._grant_key(encryption_keys[id(bucket)], frozenset(grants), principal)
+
+            for actions, grouped in groups.items():
+                statement = self._statement(actions, grouped)
+                resolved = cdk.Stack.of(grouped[0]).resolve(statement.to_statement_json())
+                report["statements_after"] += 1
+                report["policy_bytes_after"] += len(json.dumps(resolved, separators=(",", ":")))
+                # each bucket contributes its two ARNs; one statement per bucket is what `grant_*` would emit
+                for index in range(len(grouped)):
+                    single = {**resolved, "Resource": resolved["Resource"][index * 2 : index * 2 + 2]}
+                    report["statements_before"] += 1
+                    report["policy_bytes_before"] += len(json.dumps(single, separators=(",", ":")))
+
+                result = principal.grant_principal.add_to_principal_policy(statement)
+                if not result.statement_added:
+                    for bucket in grouped:
+                        bucket_statement = self._statement(actions, [bucket])
+                        bucket_statement.add_principals(principal.grant_principal)
+                        bucket.add_to_resource_policy(bucket_statement)
+
+        self._plan.clear()
+        self._arns.clear()
+        self.requested = 0
+        return report
+
+    @staticmethod
+    def _grant_key(key: cdk.aws_kms.IKey | None, actions: FrozenSet[str], principal: cdk.aws_iam.IGrantable) -> None:
+        if key is None:
+            return
+        if "write" in actions:
+            key.grant_encrypt_decrypt(principal)
+        else:
+            key.grant_decrypt(principal)
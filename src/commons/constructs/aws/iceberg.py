@@ -0,0 +1,190 @@
+"""Iceberg tables of the curated and analytics layers and their scheduled maintenance through Athena."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Dict, List, Sequence
+
+import aws_cdk as cdk
+from constructs import Construct
+
+from commons.constructs.aws.tagging import TagEngine
+from commons.model import IcebergTable, Storage
+from commons.service.iceberg import MAINTENANCE_ACTIONS, IcebergMaintenance
+
+DEFAULT_MAINTENANCE_SCHEDULE: str = "cron(0 3 * * ? *)"
+DEFAULT_MAINTENANCE_TIMEOUT_HOURS: int = 6
+# Iceberg commit conflicts with concurrent writers fail the query; a later attempt usually succeeds
+RETRIED_ERRORS: tuple[str, ...] = ("States.TaskFailed", "Athena.TooManyRequestsException")
+
+
+class Iceberg:
+    """
+    Iceberg class declares the Iceberg tables of the `second_layer` and `third_layer` and keeps them compacted.
+
+    CloudFormation can only create unpartitioned Iceberg tables in Glue, without transforms or table properties, so
+    the tables are created with Athena DDL (`IcebergTable.create_statement`) by a Step Functions state machine that
+    then applies the table properties and runs `OPTIMIZE ... REWRITE DATA` and `VACUUM` on each table, through the
+    project's Athena workgroup. The state machine runs on a schedule and, with `run_on_deploy`, after each deployment
+    that changes the statements, so new tables exist once the stack is deployed. The statements are those of
+    `commons.service.iceberg`, which runs the same maintenance outside Step Functions.
+
+    As in `commons.service.iceberg`, a statement failing after its retries skips the rest of its table only: its
+    error is recorded under `$.failures.<table>` and the next table starts. The execution fails at the end if any
+    table failed.
+
+    `OPTIMIZE` reads the rewritten files: the `BytesScannedCutoffPerQuery` of the workgroup must allow it, or set
+    `IcebergTable.optimize_where` to compact recent partitions only.
+
+    useful links:
+        Iceberg tables in Athena: https://docs.aws.amazon.com/athena/latest/ug/querying-iceberg.html
+        OPTIMIZE and VACUUM: https://docs.aws.amazon.com/athena/latest/ug/querying-iceberg-data-optimization.html
+    """
+
+    @staticmethod
+    def _tag(constructs: List[Construct], tags: Dict[str, str], tag_engine: TagEngine | None) -> None:
+        if tag_engine is not None:
+            for construct in constructs:
+                tag_engine.tag(construct, tags)
+            return
+
+        for construct in constructs:
+            for key in tags:
+                cdk.Tags.of(construct).add(key=key, value=tags[key])
+
+    @staticmethod
+    def create_maintenance(
+        scope: Construct,
+        name: str,
+        database_name: str,
+        tables: Sequence[IcebergTable],
+        buckets: Dict[str, cdk.aws_s3.IBucket],
+        storage: Storage,
+        workgroup: cdk.aws_athena.CfnWorkGroup | str,
+        tags: Dict[str, str],
+        schedule: cdk.aws_events.Schedule | None = None,
+        run_on_deploy: bool = True,
+        actions: Sequence[str] = MAINTENANCE_ACTIONS,
+        tag_engine: TagEngine | None = None,
+    ) -> cdk.aws_stepfunctions.StateMachine:
+        """
+        Creates the state machine creating and maintaining the tables, and the EventBridge rule starting it.
+
+        Arguments:
+            scope (Construct): The CDK stack in which the state machine is created.
+            name (str): The name of the state machine.
+            database_name (str): The Glue database of the tables.
+            tables (Sequence[IcebergTable]): The tables.
+            buckets (Dict[str, cdk.aws_s3.IBucket]): The bucket per `Storage` attribute, e.g. from
+                `DataLakeBuckets.create`.
+            storage (Storage): The storage layers.
+            workgroup (cdk.aws_athena.CfnWorkGroup | str): The Athena workgroup, or its name.
+            tags (Dict[str, str]): A dictionary of tags to add to the state machine and the rule.
+            schedule (cdk.aws_events.Schedule | None): The schedule. Defaults to `DEFAULT_MAINTENANCE_SCHEDULE`.
+            run_on_deploy (bool): Whether a deployment changing the statements starts the state machine.
+            actions (Sequence[str]): The maintenance actions, in order. Defaults to `MAINTENANCE_ACTIONS`.
+            tag_engine (TagEngine | None): When provided, the tags are applied through the engine.
+
+        Returns:
+            cdk.aws_stepfunctions.StateMachine: The created state machine.
+
+        Raises:
+            ValueError: If there is no table, or no bucket for the layer of a table.
+        """
+        if not tables:
+            raise ValueError("At least one Iceberg table is required")
+        bucket_names = {layer: bucket.bucket_name for layer, bucket in buckets.items()}
+        steps = IcebergMaintenance(None, database_name, tables, bucket_names, storage, actions).steps()
+        workgroup_name = workgroup if isinstance(workgroup, str) else workgroup.name
+
+        tasks: Dict[str, List[cdk.aws_stepfunctions_tasks.AthenaStartQueryExecution]] = {}
+        for step in steps:
+            task = cdk.aws_stepfunctions_tasks.AthenaStartQueryExecution(
+                scope,
+                f"Iceberg{step.action.title()}{re.sub(r'[^A-Za-z0-9]', '', step.table.title())}{name}",
+                query_string=step.statement,
+                work_group=workgroup_name,
+                query_execution_context=cdk.aws_stepfunctions_tasks.QueryExecutionContext(
+                    database_name=database_name
+                ),
+                integration_pattern=cdk.aws_stepfunctions.IntegrationPattern.RUN_JOB,
+                result_path=cdk.aws_stepfunctions.JsonPath.DISCARD,
+            )
+            if step.action != "create":
+                task.add_retry(
+                    errors=list(RETRIED_ERRORS),
+                    interval=cdk.Duration.minutes(1),
+                    max_attempts=3,
+                    backoff_rate=2,
+                )
+            tasks.setdefault(step.table, []).append(task)
+
+        # a failing table jumps to the first task of the next table; the last one to the final check
+        failed = cdk.aws_stepfunctions.Fail(
+            scope, f"IcebergMaintenanceFailed{name}", error="IcebergMaintenanceFailed", cause="A table failed"
+        )
+        check = (
+            cdk.aws_stepfunctions.Choice(scope, f"IcebergMaintenanceCheck{name}")
+            .when(
+                cdk.aws_stepfunctions.Condition.or_(
+                    *(cdk.aws_stepfunctions.Condition.is_present(f"$.failures.{table}") for table in tasks)
+                ),
+                failed,
+            )
+            .otherwise(cdk.aws_stepfunctions.Succeed(scope, f"IcebergMaintenanceSucceeded{name}"))
+        )
+        table_tasks = list(tasks.items())
+        for index, (table, chain) in enumerate(table_tasks):
+            following = table_tasks[index + 1][1][0] if index + 1 < len(table_tasks) else check
+            for task, next_task in zip(chain, [*chain[1:], following], strict=True):
+                task.add_catch(following, errors=["States.ALL"], result_path=f"$.failures.{table}")
+                task.next(next_task)
+
+        state_machine = cdk.aws_stepfunctions.StateMachine(
+            scope,
+            f"IcebergMaintenance{name}",
+            state_machine_name=name,
+            definition_body=cdk.aws_stepfunctions.DefinitionBody.from_chainable(table_tasks[0][1][0]),
+            timeout=cdk.Duration.hours(DEFAULT_MAINTENANCE_TIMEOUT_HOURS),
+        )
+        if not isinstance(workgroup, str):
+            state_machine.node.add_dependency(workgroup)
+        for layer in sorted({table.layer for table in tables}):
+            # OPTIMIZE writes and VACUUM deletes data files
+            buckets[layer].grant_read_write(state_machine)
+            buckets[layer].grant_delete(state_machine)
+
+        rule = cdk.aws_events.Rule(
+            scope,
+            f"IcebergMaintenanceSchedule{name}",
+            schedule=schedule or cdk.aws_events.Schedule.expression(DEFAULT_MAINTENANCE_SCHEDULE),
+            targets=[cdk.aws_events_targets.SfnStateMachine(state_machine, retry_attempts=0)],
+        )
+        Iceberg._tag([state_machine, rule], {"resource": "state machine", **tags}, tag_engine)
+
+        if run_on_deploy:
+            # the digest of the statements is the execution input, so only deployments changing them start a run
+            digest = hashlib.sha256("\n".join(step.statement for step in steps).encode()).hexdigest()
+            call = cdk.custom_resources.AwsSdkCall(
+                service="SFN",
+                action="startExecution",
+                parameters={"stateMachineArn": state_machine.state_machine_arn, "input": f'{{"digest":"{digest}"}}'},
+                physical_resource_id=cdk.custom_resources.PhysicalResourceId.of(f"{name}-{digest[:16]}"),
+            )
+            cdk.custom_resources.AwsCustomResource(
+                scope,
+                f"IcebergMaintenanceOnDeploy{name}",
+                on_create=call,
+                on_update=call,
+                policy=cdk.custom_resources.AwsCustomResourcePolicy.from_statements(
+                    [
+                        cdk.aws_iam.PolicyStatement(
+                            actions=["states:StartExecution"], resources=[state_machine.state_machine_arn]
+                        )
+                    ]
+                ),
+                install_latest_aws_sdk=False,
+            )
+
+        return state_machine
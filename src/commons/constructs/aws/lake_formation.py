@@ -0,0 +1,354 @@
+"""Lake Formation tag-based access control: LF-tags from the configuration vocabulary and grants on tag expressions."""
+
+from __future__ import annotations
+
+import re
+import zlib
+from typing import Dict, List, Sequence, Tuple
+
+import aws_cdk as cdk
+from constructs import Construct
+
+from commons.utils import ConfigLoader
+
+# https://docs.aws.amazon.com/lake-formation/latest/dg/TBAC-creating-tags.html
+LF_TAG_KEY_PATTERN: str = r"[\w\s.:/=+\-@%]{1,128}"
+LF_TAG_VALUE_PATTERN: str = r"[\w\s.:/=+\-@%*]{1,256}"
+LF_TAG_MAX_VALUES: int = 1000
+LAYER_TAG_KEY: str = "layer"
+TABLE_PERMISSIONS: Tuple[str, ...] = ("SELECT", "DESCRIBE")
+DATABASE_PERMISSIONS: Tuple[str, ...] = ("DESCRIBE",)
+RESOURCE_TYPES: Tuple[str, ...] = ("DATABASE", "TABLE")
+
+Principal = cdk.aws_iam.IRole | str
+Expression = Dict[str, str | Sequence[str]]
+# principal, expression, permissions, permissions with grant option, resource type
+_Grant = Tuple[Principal, Dict[str, Tuple[str, ...]], Tuple[str, ...], Tuple[str, ...], str]
+
+
+class LakeFormation:
+    """
+    LakeFormation attaches LF-tags to Glue databases and tables and grants principals access through tag expressions.
+
+    Granting per table emits one `AWS::LakeFormation::PrincipalPermissions` per principal and table, so the template
+    grows as principals x tables and every new table needs new grants. With tag-based access control, databases and
+    tables carry LF-tags (the `Tags.default` vocabulary on databases, the `Storage` layer on tables) and each principal
+    is granted once per tag expression, e.g. `{"layer": ["stage", "analytics"]}`: the grant count scales with the
+    roles, and new tables are covered as soon as they are tagged. Tables inherit the LF-tags of their database.
+
+    Like `GrantPlanner`, nothing is added to the stack until `apply`, which creates each LF-tag once with every value
+    used, then the associations and the grants. The stack must be deployed by a Lake Formation administrator.
+
+    Usage:
+    ```python
+    lake_formation = LakeFormation(scope=stack, config=config)
+    lake_formation.tag_database(database)
+    lake_formation.tag_table(database, table, layer="second_layer")
+    lake_formation.grant_layers(analyst_role, ["second_layer", "third_layer"])
+    report = lake_formation.apply()
+    ```
+
+    useful links:
+        LF-tags: https://docs.aws.amazon.com/lake-formation/latest/dg/tag-based-access-control.html
+    """
+
+    def __init__(self, scope: Construct, config: ConfigLoader, catalog_id: str | None = None) -> None:
+        """
+        Initializes an empty plan.
+
+        Arguments:
+            scope (Construct): The stack in which the LF-tags, associations and grants are created.
+            config (ConfigLoader): The loaded configuration, providing the tag vocabulary and the layer names.
+            catalog_id (str | None): The Data Catalog. Defaults to the account of the stack.
+        """
+        self.scope: Construct = scope
+        self.config: ConfigLoader = config
+        self.catalog_id: str = catalog_id or cdk.Stack.of(scope).account
+
+        self._values: Dict[str, set[str]] = {}
+        # database name -> (database, tags); (database name, table name) -> (database, table, tags)
+        self._databases: Dict[str, Tuple[cdk.aws_glue.CfnDatabase | str, Dict[str, str]]] = {}
+        self._tables: Dict[
+            Tuple[str, str], Tuple[cdk.aws_glue.CfnDatabase | str, cdk.aws_glue.CfnTable | str, Dict[str, str]]
+        ] = {}
+        self._grants: Dict[str, _Grant] = {}
+
+    @staticmethod
+    def vocabulary(config: ConfigLoader) -> Dict[str, str]:
+        """
+        Returns the LF-tags of the databases: the non-empty `Tags.default` entries, with lowercase keys (Lake Formation
+        stores keys in lowercase).
+
+        Arguments:
+            config (ConfigLoader): The loaded configuration.
+
+        Returns:
+            Dict[str, str]: The tag values, keyed by tag key.
+        """
+        return {key.lower(): value for key, value in config.tags.default.items() if value and value.strip()}
+
+    def _layer_name(self, layer: str) -> str:
+        layer_name = getattr(self.config.storage, layer, None)
+        if not layer_name or not layer_name.strip():
+            raise ValueError(f"Layer '{layer}' is not configured in the storage")
+        return layer_name
+
+    def _record(self, tags: Dict[str, str | Sequence[str]]) -> Dict[str, Tuple[str, ...]]:
+        recorded: Dict[str, Tuple[str, ...]] = {}
+        for raw_key, raw_values in tags.items():
+            key = raw_key.lower()
+            values = (raw_values,) if isinstance(raw_values, str) else tuple(raw_values)
+            if not re.fullmatch(LF_TAG_KEY_PATTERN, key):
+                raise ValueError(f"Invalid LF-tag key: {key!r}")
+            if not values:
+                raise ValueError(f"LF-tag '{key}' has no value")
+            for value in values:
+                if not re.fullmatch(LF_TAG_VALUE_PATTERN, value):
+                    raise ValueError(f"Invalid value of LF-tag '{key}': {value!r}")
+            known = self._values.setdefault(key, set())
+            known.update(values)
+            if len(known) > LF_TAG_MAX_VALUES:
+                raise ValueError(f"LF-tag '{key}' has more than {LF_TAG_MAX_VALUES} values")
+            recorded[key] = values
+        return recorded
+
+    @staticmethod
+    def _database_name(database: cdk.aws_glue.CfnDatabase | str) -> str:
+        return database if isinstance(database, str) else database.database_input.name
+
+    @staticmethod
+    def _table_name(table: cdk.aws_glue.CfnTable | str) -> str:
+        return table if isinstance(table, str) else table.table_input.name
+
+    def tag_database(
+        self,
+        database: cdk.aws_glue.CfnDatabase | str,
+        tags: Dict[str, str] | None = None,
+    ) -> Dict[str, str]:
+        """
+        Records the LF-tags of a database; its tables inherit them.
+
+        Arguments:
+            database (cdk.aws_glue.CfnDatabase | str): The database, or the name of an existing one.
+            tags (Dict[str, str] | None): The LF-tags. Defaults to `vocabulary(config)`.
+
+        Returns:
+            Dict[str, str]: The recorded tags.
+
+        Raises:
+            ValueError: If a tag key or value is not a valid LF-tag.
+        """
+        tags = {key.lower(): value for key, value in (tags or self.vocabulary(self.config)).items()}
+        self._record(tags)
+        self._databases[self._database_name(database)] = (database, tags)
+        return tags
+
+    def tag_table(
+        self,
+        database: cdk.aws_glue.CfnDatabase | str,
+        table: cdk.aws_glue.CfnTable | str,
+        layer: str | None = None,
+        tags: Dict[str, str] | None = None,
+    ) -> Dict[str, str]:
+        """
+        Records the LF-tags of a table, on top of those inherited from its database.
+
+        Arguments:
+            database (cdk.aws_glue.CfnDatabase | str): The database of the table, or its name.
+            table (cdk.aws_glue.CfnTable | str): The table, or the name of an existing one.
+            layer (str | None): The `Storage` attribute of the table's layer, e.g. `second_layer`; adds the `layer` tag.
+            tags (Dict[str, str] | None): Other LF-tags.
+
+        Returns:
+            Dict[str, str]: The recorded tags.
+
+        Raises:
+            ValueError: If the layer is not configured, no tag is given, or a tag is not a valid LF-tag.
+        """
+        tags = {key.lower(): value for key, value in (tags or {}).items()}
+        if layer is not None:
+            tags[LAYER_TAG_KEY] = self._layer_name(layer)
+        if not tags:
+            raise ValueError("A table needs a layer or at least one tag")
+        self._record(tags)
+        self._tables[(self._database_name(database), self._table_name(table))] = (database, table, tags)
+        return tags
+
+    def grant(
+        self,
+        principal: Principal,
+        expression: Expression,
+        permissions: Sequence[str] | None = None,
+        resource_type: str = "TABLE",
+        permissions_with_grant_option: Sequence[str] = (),
+    ) -> None:
+        """
+        Records a grant on every database or table matching a tag expression. A resource matches when, for each key
+        of the expression, its tag value is one of the listed values.
+
+        Arguments:
+            principal (cdk.aws_iam.IRole | str): The role, or the ARN of a principal.
+            expression (Dict[str, str | Sequence[str]]): The allowed values per tag key.
+            permissions (Sequence[str] | None): The permissions. Defaults to `TABLE_PERMISSIONS` or
+                `DATABASE_PERMISSIONS`.
+            resource_type (str): `TABLE` or `DATABASE`.
+            permissions_with_grant_option (Sequence[str]): The permissions the principal can grant to others.
+
+        Raises:
+            ValueError: If the resource type is not supported, or the expression is empty or not valid.
+        """
+        if resource_type not in RESOURCE_TYPES:
+            raise ValueError(f"Unsupported resource type '{resource_type}', expected one of {RESOURCE_TYPES}")
+        if not expression:
+            raise ValueError("A tag expression needs at least one tag")
+        recorded = self._record(expression)
+        permissions = tuple(permissions or (TABLE_PERMISSIONS if resource_type == "TABLE" else DATABASE_PERMISSIONS))
+
+        principal_id = principal if isinstance(principal, str) else principal.node.path
+        expression_id = sorted((key, sorted(values)) for key, values in recorded.items())
+        canonical = repr((principal_id, expression_id, resource_type))
+        grant_id = f"LFGrant{re.sub(r'[^A-Za-z0-9]', '', principal_id)[-32:]}{zlib.crc32(canonical.encode()):08x}"
+        _, _, granted, with_grant, _ = self._grants.get(grant_id, (None, None, (), (), None))
+        self._grants[grant_id] = (
+            principal,
+            recorded,
+            tuple(dict.fromkeys((*granted, *permissions))),
+            tuple(dict.fromkeys((*with_grant, *permissions_with_grant_option))),
+            resource_type,
+        )
+
+    def grant_layers(
+        self, principal: Principal, layers: Sequence[str], permissions: Sequence[str] | None = None
+    ) -> None:
+        """
+        Records a grant on the tables of some layers. Lake Formation implicitly lets the principal describe the
+        databases holding them.
+
+        Arguments:
+            principal (cdk.aws_iam.IRole | str): The role, or the ARN of a principal.
+            layers (Sequence[str]): The `Storage` attributes of the layers, e.g. `["second_layer"]`.
+            permissions (Sequence[str] | None): The table permissions. Defaults to `TABLE_PERMISSIONS`.
+        """
+        self.grant(principal, {LAYER_TAG_KEY: [self._layer_name(layer) for layer in layers]}, permissions)
+
+    def _effective_tables(self) -> List[Dict[str, str]]:
+        effective = []
+        for (database_name, _), (_, _, tags) in self._tables.items():
+            inherited = self._databases.get(database_name, (None, {}))[1]
+            effective.append({**inherited, **tags})
+        return effective
+
+    @staticmethod
+    def _matches(tags: Dict[str, str], expression: Dict[str, Tuple[str, ...]]) -> bool:
+        return all(tags.get(key) in values for key, values in expression.items())
+
+    @staticmethod
+    def _construct_id(prefix: str, *names: str) -> str:
+        readable = re.sub(r"[^A-Za-z0-9]", "", "".join(name.title() for name in names))[:48]
+        return f"{prefix}{readable}{zlib.crc32('/'.join(names).encode()):08x}"
+
+    def apply(self) -> Dict[str, int]:
+        """
+        Creates the LF-tags, associations and grants, and clears the plan.
+
+        Returns:
+            Dict[str, int]: The number of LF-tags, associations and grants created; `grants_per_table`, the grant
+            resources that one grant per principal and matching table (or database) would have needed; and the
+            total resources of both approaches.
+        """
+        tags: Dict[str, cdk.aws_lakeformation.CfnTag] = {}
+        for key in sorted(self._values):
+            tags[key] = cdk.aws_lakeformation.CfnTag(
+                self.scope,
+                self._construct_id("LFTag", key),
+                tag_key=key,
+                tag_values=sorted(self._values[key]),
+                catalog_id=self.catalog_id,
+            )
+
+        associations = 0
+        for database, database_tags in self._databases.values():
+            resource = cdk.aws_lakeformation.CfnTagAssociation.ResourceProperty(
+                database=cdk.aws_lakeformation.CfnTagAssociation.DatabaseResourceProperty(
+                    catalog_id=self.catalog_id,
+                    name=database if isinstance(database, str) else database.ref,
+                )
+            )
+            self._associate(tags, resource, database_tags, self._database_name(database))
+            associations += 1
+
+        for database, table, table_tags in self._tables.values():
+            resource = cdk.aws_lakeformation.CfnTagAssociation.ResourceProperty(
+                table=cdk.aws_lakeformation.CfnTagAssociation.TableResourceProperty(
+                    catalog_id=self.catalog_id,
+                    database_name=database if isinstance(database, str) else database.ref,
+                    name=table if isinstance(table, str) else table.ref,
+                )
+            )
+            self._associate(tags, resource, table_tags, self._database_name(database), self._table_name(table))
+            associations += 1
+
+        effective_tables = self._effective_tables()
+        grants_per_table = 0
+        for grant_id, (principal, expression, permissions, with_grant, resource_type) in self._grants.items():
+            candidates = effective_tables if resource_type == "TABLE" else [t for _, t in self._databases.values()]
+            grants_per_table += sum(self._matches(candidate, expression) for candidate in candidates)
+
+            grant = cdk.aws_lakeformation.CfnPrincipalPermissions(
+                self.scope,
+                grant_id,
+                permissions=list(permissions),
+                permissions_with_grant_option=list(with_grant),
+                principal=cdk.aws_lakeformation.CfnPrincipalPermissions.DataLakePrincipalProperty(
+                    data_lake_principal_identifier=principal if isinstance(principal, str) else principal.role_arn
+                ),
+                resource=cdk.aws_lakeformation.CfnPrincipalPermissions.ResourceProperty(
+                    lf_tag_policy=cdk.aws_lakeformation.CfnPrincipalPermissions.LFTagPolicyResourceProperty(
+                        catalog_id=self.catalog_id,
+                        expression=[
+                            cdk.aws_lakeformation.CfnPrincipalPermissions.LFTagProperty(
+                                tag_key=key, tag_values=list(values)
+                            )
+                            for key, values in sorted(expression.items())
+                        ],
+                        resource_type=resource_type,
+                    )
+                ),
+            )
+            for key in expression:
+                grant.add_dependency(tags[key])
+
+        report = {
+            "lf_tags": len(tags),
+            "associations": associations,
+            "grants": len(self._grants),
+            "grants_per_table": grants_per_table,
+            "resources_after": len(tags) + associations + len(self._grants),
+            "resources_before": grants_per_table,
+        }
+        self._values.clear()
+        self._databases.clear()
+        self._tables.clear()
+        self._grants.clear()
+        return report
+
+    def _associate(
+        self,
+        tags: Dict[str, cdk.aws_lakeformation.CfnTag],
+        resource: cdk.aws_lakeformation.CfnTagAssociation.ResourceProperty,
+        resource_tags: Dict[str, str],
+        *names: str,
+    ) -> None:
+        association = cdk.aws_lakeformation.CfnTagAssociation(
+            self.scope,
+            self._construct_id("LFTags", *names),
+            lf_tags=[
+                cdk.aws_lakeformation.CfnTagAssociation.LFTagPairProperty(
+                    catalog_id=self.catalog_id, tag_key=key, tag_values=[value]
+                )
+                for key, value in sorted(resource_tags.items())
+            ],
+            resource=resource,
+        )
+        for key in resource_tags:
+            association.add_dependency(tags[key])
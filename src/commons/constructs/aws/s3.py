@@ -2,6 +2,10 @@ from typing import Any, Dict, List
 
 import aws_cdk as cdk
 
+from commons.constructs.aws.grants import GrantPlanner
+from commons.constructs.aws.tagging import TagEngine
+from commons.utils import NamingEngine
+
 
 class S3:
     """
@@ -18,6 +22,7 @@ class S3:
         bucket_id: str | None,
         bucket_name: str,
         tags: Dict[str, str],
+        tag_engine: TagEngine | None = None,
         **kwargs: Any,
     ) -> cdk.aws_s3.Bucket:
         """
@@ -28,6 +33,8 @@ class S3:
             bucket_id (str | None): The ID of the bucket. If not provided, the bucket_name will be used as the ID.
             bucket_name (str): The name of the S3 bucket. Must not be empty or blank.
             tags (Dict[str, str]): A dictionary of tags to add to the S3 bucket.
+            tag_engine (TagEngine | None): When provided, the tags are applied through the engine, which tags the
+                shared set once per scope instead of once per bucket and key.
             **kwargs: Additional keyword arguments that are passed to the S3 bucket constructor.
 
         Returns:
@@ -36,10 +43,10 @@ class S3:
         Raises:
             ValueError: If the bucket_name is empty or blank.
         """
-        if not bucket_name or bucket_name.strip():
+        if not bucket_name or not bucket_name.strip():
             raise ValueError("Bucket name cannot be empty")
 
-        if not bucket_id or bucket_id.strip():
+        if not bucket_id or not bucket_id.strip():
             bucket_id = bucket_name
 
         bucket = cdk.aws_s3.Bucket(
@@ -51,6 +58,11 @@ class S3:
             **kwargs,
         )
 
+        if tag_engine is not None:
+            tag_engine.tag_resource_type(resource_type="AWS::S3::Bucket", key="resource", value="s3 bucket")
+            tag_engine.tag(bucket, tags)
+            return bucket
+
         # S3 default tags
         cdk.Tags.of(bucket).add(key="resource", value="s3 bucket")
 
@@ -64,6 +76,7 @@ class S3:
     def apply_permissions(
         bucket: cdk.aws_s3.Bucket,
         permissions: List[Dict[str, cdk.aws_iam.IGrantable]] | List[cdk.aws_iam.IGrantable],
+        planner: GrantPlanner | None = None,
     ) -> None:
         """
         Apply permissions to the specified S3 bucket.
@@ -76,12 +89,16 @@ class S3:
             bucket (cdk.aws_s3.Bucket): The S3 bucket to which permissions will be applied.
             permissions (List[Dict[str, cdk.aws_iam.IGrantable]] | cdk.aws_iam.IGrantable): A list of permissions to be applied. Each permission can be a dictionary
             containing an 'action' and a 'principal', or an instance of `cdk.aws_iam.IGrantable`.
+            planner (GrantPlanner | None): When provided, the grants are recorded in the planner, which merges them
+                into per-principal statements when `GrantPlanner.apply` is called.
         """
         for permission in permissions:
             if isinstance(permission, dict):
                 action = permission.get("action")
                 principal = permission.get("principal")
-                if action == "read":
+                if planner is not None:
+                    planner.add(bucket, action, principal)  # type: ignore
+                elif action == "read":
                     bucket.grant_read(principal)  # type: ignore
                 elif action == "write":
                     bucket.grant_write(principal)  # type: ignore
@@ -90,11 +107,17 @@ class S3:
                 # Add more actions as needed
 
             elif isinstance(permission, cdk.aws_iam.IGrantable):  # type: ignore
-                bucket.grant_read(permission)
+                if planner is not None:
+                    planner.add(bucket, "read", permission)
+                else:
+                    bucket.grant_read(permission)
 
     @staticmethod
     def add_bucket_permission(
-        bucket: cdk.aws_s3.Bucket, action: str, principal: cdk.aws_iam.IPrincipal
+        bucket: cdk.aws_s3.Bucket,
+        action: str,
+        principal: cdk.aws_iam.IPrincipal,
+        planner: GrantPlanner | None = None,
     ) -> None:
         """
         Adds a specified permission to an AWS S3 bucket for a given principal.
@@ -103,13 +126,169 @@ class S3:
             bucket (cdk.aws_s3.Bucket): The S3 bucket to which the permission will be added.
             action (str): The type of permission to be granted. Valid values are 'read', 'write', and 'read_write'.
             principal (cdk.aws_iam.IPrincipal): The principal (e.g., IAM user or role) that will receive the specified permission.
+            planner (GrantPlanner | None): When provided, the grant is recorded in the planner instead of applied.
 
         Raises:
             ValueError: If an unsupported action is provided in the 'action' parameter.
         """
-        if action == "read":
+        if planner is not None:
+            planner.add(bucket, action, principal)
+        elif action == "read":
             bucket.grant_read(principal)
         elif action == "write":
             bucket.grant_write(principal)
         elif action == "read_write":
             bucket.grant_read_write(principal)
+
+    @staticmethod
+    def directory_bucket_name(base_name: str, availability_zone_id: str) -> str:
+        """
+        Returns the name of an S3 Express One Zone directory bucket: `<base name>--<AZ ID>--x-s3`.
+
+        Arguments:
+            base_name (str): The base name, e.g. the name of the layer bucket; lowercase letters, digits and hyphens.
+            availability_zone_id (str): The ID (not the name) of the Availability Zone, e.g. `use1-az4`.
+
+        Returns:
+            str: The bucket name.
+
+        Raises:
+            ValueError: If the name breaks the directory bucket naming rules.
+        """
+        return NamingEngine.check(f"{base_name.strip()}--{availability_zone_id.strip()}--x-s3", "s3express")
+
+    @staticmethod
+    def create_directory_bucket(
+        scope: cdk.Stack,
+        base_name: str,
+        availability_zone_id: str,
+        tags: Dict[str, str],
+        bucket_id: str | None = None,
+    ) -> cdk.aws_s3express.CfnDirectoryBucket:
+        """
+        Creates an S3 Express One Zone directory bucket, for data written and read back within seconds by compute in
+        the same Availability Zone (single-digit millisecond first-byte latency, lower request cost, one AZ only).
+
+        `AWS::S3Express::DirectoryBucket` takes no tags, lifecycle rules or bucket policy: the tags are applied to
+        the resources of `create_express_drain`, which moves aged objects out of the bucket, and access is granted
+        through `grant_directory_bucket`. Directory buckets only accept HTTPS requests.
+
+        Arguments:
+            scope (cdk.Stack): The CDK stack in which the bucket is created.
+            base_name (str): The base name, e.g. the name of the layer bucket.
+            availability_zone_id (str): The ID of the Availability Zone of the compute, e.g. `use1-az4`.
+            tags (Dict[str, str]): The tags of the tier, kept in the bucket metadata of the stack.
+            bucket_id (str | None): The ID of the bucket. Defaults to the bucket name.
+
+        Returns:
+            cdk.aws_s3express.CfnDirectoryBucket: The created bucket.
+
+        Raises:
+            ValueError: If the name breaks the directory bucket naming rules.
+        """
+        bucket_name = S3.directory_bucket_name(base_name, availability_zone_id)
+        bucket = cdk.aws_s3express.CfnDirectoryBucket(
+            scope,
+            bucket_id or bucket_name,
+            bucket_name=bucket_name,
+            data_redundancy="SingleAvailabilityZone",
+            location_name=availability_zone_id,
+        )
+        bucket.add_metadata("tags", {"resource": "s3 directory bucket", **tags})
+        return bucket
+
+    @staticmethod
+    def grant_directory_bucket(
+        bucket: cdk.aws_s3express.CfnDirectoryBucket,
+        grantee: cdk.aws_iam.IGrantable,
+        read_only: bool = False,
+    ) -> None:
+        """
+        Grants access to a directory bucket. Directory buckets authorize sessions, not requests: the SDK calls
+        `CreateSession` once and signs the following requests with the session credentials, so the grant is the
+        single `s3express:CreateSession` action, limited to read-only sessions when `read_only` is set.
+
+        Arguments:
+            bucket (cdk.aws_s3express.CfnDirectoryBucket): The directory bucket.
+            grantee (cdk.aws_iam.IGrantable): The principal receiving the permission.
+            read_only (bool): Whether only `ReadOnly` sessions are allowed.
+        """
+        cdk.aws_iam.Grant.add_to_principal(
+            grantee=grantee,
+            actions=["s3express:CreateSession"],
+            resource_arns=[bucket.attr_arn],
+            conditions={"StringEquals": {"s3express:SessionMode": "ReadOnly"}} if read_only else None,
+        )
+
+    @staticmethod
+    def create_express_drain(
+        scope: cdk.Stack,
+        name: str,
+        directory_bucket: cdk.aws_s3express.CfnDirectoryBucket,
+        target_bucket: cdk.aws_s3.IBucket,
+        code: cdk.aws_lambda.Code,
+        tags: Dict[str, str],
+        prefix: str = "",
+        max_age: cdk.Duration | None = None,
+        schedule: cdk.aws_events.Schedule | None = None,
+        tag_engine: TagEngine | None = None,
+    ) -> cdk.aws_lambda.Function:
+        """
+        Creates the function moving the objects older than `max_age` from a directory bucket to the regular layer
+        bucket (`commons.service.express_drain`), and the EventBridge rule invoking it. Directory buckets have no
+        lifecycle transitions, so this is the path from the low-latency tier to the layer's storage profile.
+
+        Arguments:
+            scope (cdk.Stack): The CDK stack in which the function is created.
+            name (str): The name of the function.
+            directory_bucket (cdk.aws_s3express.CfnDirectoryBucket): The directory bucket.
+            target_bucket (cdk.aws_s3.IBucket): The layer bucket receiving the objects, under the same keys.
+            code (cdk.aws_lambda.Code): The package holding `commons`.
+            tags (Dict[str, str]): A dictionary of tags to add to the function and the rule.
+            prefix (str): The prefix of the drained objects, e.g. `landing/`; directory buckets only list prefixes
+                ending with a slash.
+            max_age (cdk.Duration | None): The age after which objects are moved. Defaults to one hour.
+            schedule (cdk.aws_events.Schedule | None): The schedule. Defaults to every 5 minutes.
+            tag_engine (TagEngine | None): When provided, the tags are applied through the engine.
+
+        Returns:
+            cdk.aws_lambda.Function: The created function.
+        """
+        function = cdk.aws_lambda.Function(
+            scope,
+            f"ExpressDrainFunction{name}",
+            function_name=name,
+            runtime=cdk.aws_lambda.Runtime.PYTHON_3_11,
+            handler="commons.service.express_drain.handler",
+            code=code,
+            memory_size=1024,
+            timeout=cdk.Duration.minutes(15),
+            reserved_concurrent_executions=1,
+            environment={
+                "EXPRESS_DRAIN_SOURCE": directory_bucket.ref,
+                "EXPRESS_DRAIN_TARGET": target_bucket.bucket_name,
+                "EXPRESS_DRAIN_PREFIX": prefix,
+                "EXPRESS_DRAIN_MAX_AGE_SECONDS": str(int((max_age or cdk.Duration.hours(1)).to_seconds())),
+            },
+        )
+        S3.grant_directory_bucket(directory_bucket, function)
+        # the function reads the size of each copy back (HeadObject needs s3:GetObject)
+        target_bucket.grant_read_write(function)
+
+        rule = cdk.aws_events.Rule(
+            scope,
+            f"ExpressDrainSchedule{name}",
+            schedule=schedule or cdk.aws_events.Schedule.rate(cdk.Duration.minutes(5)),
+            targets=[cdk.aws_events_targets.LambdaFunction(function, retry_attempts=0)],
+        )
+
+        tags = {"resource": "lambda function", **tags}
+        if tag_engine is not None:
+            tag_engine.tag(function, tags)
+            tag_engine.tag(rule, tags)
+            return function
+
+        for construct in (function, rule):
+            for key in tags:
+                cdk.Tags.of(construct).add(key=key, value=tags[key])
+        return function
@@ -0,0 +1,145 @@
+"""Split data lake resources into one stack per storage layer."""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, Dict, List
+
+import aws_cdk as cdk
+from constructs import Construct
+
+from commons.model import Storage
+
+# CloudFormation quota of resources per stack
+STACK_RESOURCE_LIMIT: int = 500
+
+
+class LayerShards:
+    """
+    LayerShards groups the resources of the data lake into one stack per `Storage` layer.
+
+    Each configured layer (landing zone, first/second/third layer, assets) gets its own stack, created on first use,
+    so no single template approaches the CloudFormation resource and size limits, and independent layers can be
+    deployed concurrently (`cdk deploy --concurrency`). With `nested=True` the shards are nested stacks of a parent
+    stack instead, which keeps a single deployment unit.
+
+    Usage:
+    ```python
+    shards = LayerShards(scope=app, id_prefix="DataLake", storage=config.storage, env=env)
+    raw = S3.create_bucket(shards.stack_for("first_layer"), None, "raw-bucket", tags)
+    raw_arn = shards.reference("first_layer", "second_layer", "RawBucketArn", raw.bucket_arn)
+    shards.report()
+    ```
+    """
+
+    LAYERS: tuple[str, ...] = ("landing_zone", "first_layer", "second_layer", "third_layer", "assets")
+
+    def __init__(
+        self,
+        scope: Construct,
+        id_prefix: str,
+        storage: Storage,
+        nested: bool = False,
+        **stack_kwargs: Any,
+    ) -> None:
+        """
+        Initializes the shards. No stack is created until a layer is used.
+
+        Arguments:
+            scope (Construct): The app or stage holding the shard stacks, or the parent stack when `nested` is True.
+            id_prefix (str): The prefix of the shard ids and export names, e.g. `DataLake` -> `DataLake-raw`.
+            storage (Storage): The storage layers. Layers without a name cannot be used.
+            nested (bool): Create nested stacks of `scope` instead of top-level stacks.
+            **stack_kwargs: Additional keyword arguments passed to every shard stack (e.g. `env`).
+
+        Raises:
+            ValueError: If `nested` is True and `scope` is not a stack.
+        """
+        if nested and not cdk.Stack.is_stack(scope):
+            raise ValueError("Nested shards need a parent stack as scope")
+
+        self.scope: Construct = scope
+        self.id_prefix: str = id_prefix
+        self.storage: Storage = storage
+        self.nested: bool = nested
+        self.stack_kwargs: Dict[str, Any] = stack_kwargs
+        self.stacks: Dict[str, cdk.Stack] = {}
+
+    def stack_for(self, layer: str) -> cdk.Stack:
+        """
+        Returns the stack of a storage layer, creating it on first use.
+
+        Arguments:
+            layer (str): The `Storage` attribute of the layer, e.g. `first_layer`.
+
+        Returns:
+            cdk.Stack: The shard stack (a `cdk.NestedStack` when `nested` is True).
+
+        Raises:
+            ValueError: If the layer is unknown or has no name in `Storage`.
+        """
+        if layer not in self.LAYERS:
+            raise ValueError(f"Unknown storage layer '{layer}', expected one of {', '.join(self.LAYERS)}")
+
+        if layer not in self.stacks:
+            layer_name = getattr(self.storage, layer)
+            if not layer_name or not layer_name.strip():
+                raise ValueError(f"Storage layer '{layer}' is not configured")
+
+            shard_id = f"{self.id_prefix}-{layer_name}"
+            if self.nested:
+                self.stacks[layer] = cdk.NestedStack(self.scope, shard_id, **self.stack_kwargs)
+            else:
+                self.stacks[layer] = cdk.Stack(self.scope, shard_id, **self.stack_kwargs)
+
+        return self.stacks[layer]
+
+    def reference(self, producer: str, consumer: str, name: str, value: str) -> str:
+        """
+        Passes a value from the producer layer's stack to the consumer layer's stack through an explicit export.
+
+        The consumer is made to depend on the producer, so the deployment order follows the reference. Nested
+        shards share their parent's deployment, so the value is returned as is and CDK wires it as a parameter.
+
+        Arguments:
+            producer (str): The `Storage` attribute of the layer that owns the value.
+            consumer (str): The `Storage` attribute of the layer that uses the value.
+            name (str): The name of the value, unique within the producer, e.g. `RawBucketArn`.
+            value (str): The value, usually a token such as `bucket.bucket_arn`.
+
+        Returns:
+            str: The value to use in the consumer's stack.
+        """
+        producer_stack = self.stack_for(producer)
+        consumer_stack = self.stack_for(consumer)
+        if self.nested or producer_stack is consumer_stack:
+            return value
+
+        export_name = f"{producer_stack.stack_name}-{name}"
+        if producer_stack.node.try_find_child(f"Export{name}") is None:
+            cdk.CfnOutput(producer_stack, f"Export{name}", value=value, export_name=export_name)
+        consumer_stack.add_dependency(producer_stack, reason=f"imports {export_name}")
+        return cdk.Fn.import_value(export_name)
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Counts the CloudFormation resources of each shard.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Per layer, the stack name, the resource count, the count per resource type
+            and whether the count exceeds `STACK_RESOURCE_LIMIT`.
+        """
+        report: Dict[str, Dict[str, Any]] = {}
+        for layer, stack in self.stacks.items():
+            resource_types: List[str] = [
+                child.cfn_resource_type
+                for child in stack.node.find_all()
+                if isinstance(child, cdk.CfnResource) and cdk.Stack.of(child).node.path == stack.node.path
+            ]
+            report[layer] = {
+                "stack": stack.node.path,
+                "resources": len(resource_types),
+                "resource_types": dict(Counter(resource_types)),
+                "over_limit": len(resource_types) > STACK_RESOURCE_LIMIT,
+            }
+        return report
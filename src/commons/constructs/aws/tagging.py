@@ -0,0 +1,94 @@
+"""Tag engine that applies shared tags once per scope and only per-resource deltas at the leaves."""
+
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+import aws_cdk as cdk
+from constructs import Construct
+
+TagDelta = Tuple[Tuple[Tuple[str, str], ...], Tuple[str, ...]]
+
+
+class TagEngine:
+    """
+    TagEngine collects tags per scope and applies them with as few CDK tag aspects as possible.
+
+    Every `cdk.Tags.of(construct).add` call registers one aspect that is visited during synth. Tagging each bucket
+    key by key therefore costs (buckets x tags) aspects. The engine instead applies the shared set (usually
+    `Tags.default`) once on the stack or stage, resource-type tags once per type, and only the keys that differ from
+    the shared set on each resource. Identical tag sets share a single computed delta.
+
+    Usage:
+    ```python
+    engine = TagEngine(scope=stack, shared_tags=config.tags.default)
+    S3.create_bucket(scope=stack, bucket_id=None, bucket_name="raw", tags=config.tags.default, tag_engine=engine)
+    ```
+    """
+
+    def __init__(self, scope: Construct, shared_tags: Dict[str, str]) -> None:
+        """
+        Applies `shared_tags` on `scope`, so every taggable resource below it inherits them.
+
+        Arguments:
+            scope (Construct): The stack or stage that owns the shared tags.
+            shared_tags (Dict[str, str]): The tags shared by all resources in the scope.
+        """
+        self.scope: Construct = scope
+        self.shared_tags: Dict[str, str] = dict(shared_tags)
+        self.aspect_count: int = 0
+
+        self._deltas: Dict[frozenset, TagDelta] = {}
+        self._resource_type_tags: set[Tuple[str, str, str]] = set()
+
+        for key, value in self.shared_tags.items():
+            cdk.Tags.of(scope).add(key=key, value=value)
+            self.aspect_count += 1
+
+    def tag_resource_type(self, resource_type: str, key: str, value: str) -> None:
+        """
+        Tags every resource of `resource_type` in the scope. Repeated calls with the same tag are no-ops.
+
+        Arguments:
+            resource_type (str): The CloudFormation resource type, e.g. `AWS::S3::Bucket`.
+            key (str): The tag key.
+            value (str): The tag value.
+        """
+        if (resource_type, key, value) in self._resource_type_tags:
+            return
+
+        cdk.Tags.of(self.scope).add(key=key, value=value, include_resource_types=[resource_type])
+        self._resource_type_tags.add((resource_type, key, value))
+        self.aspect_count += 1
+
+    def tag(self, construct: Construct, tags: Dict[str, str]) -> None:
+        """
+        Makes `construct` carry exactly `tags`, applying only what differs from the shared set.
+
+        Arguments:
+            construct (Construct): The resource (or construct subtree) to tag.
+            tags (Dict[str, str]): The full set of tags the resource must carry.
+        """
+        added, removed = self.delta(tags)
+        for key, value in added:
+            cdk.Tags.of(construct).add(key=key, value=value)
+        for key in removed:
+            cdk.Tags.of(construct).remove(key=key)
+        self.aspect_count += len(added) + len(removed)
+
+    def delta(self, tags: Dict[str, str]) -> TagDelta:
+        """
+        Returns the tags to add and the shared keys to remove so a resource ends up with exactly `tags`.
+
+        Arguments:
+            tags (Dict[str, str]): The full set of tags the resource must carry.
+
+        Returns:
+            TagDelta: A tuple of (key, value) pairs to add and a tuple of shared keys to remove.
+        """
+        cache_key = frozenset(tags.items())
+        if cache_key not in self._deltas:
+            added = tuple(sorted((key, value) for key, value in tags.items() if self.shared_tags.get(key) != value))
+            removed = tuple(sorted(key for key in self.shared_tags if key not in tags))
+            self._deltas[cache_key] = (added, removed)
+        return self._deltas[cache_key]
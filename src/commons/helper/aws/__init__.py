@@ -0,0 +1,5 @@
+"""AWS helpers."""
+
+from .clients import ClientCache, ClientStats, default_client_cache
+
+__all__ = ["ClientCache", "ClientStats", "default_client_cache"]
@@ -0,0 +1,226 @@
+"""Process-wide cache of boto3 clients, shared across threads.
+
+Creating a client resolves credentials, loads the service model and endpoint rules and opens a new connection pool,
+so tools that create a client per call pay that cost (and new TLS handshakes) on every call. `ClientCache` creates
+one client per service, region, role and pool size and hands the same client to every caller: botocore clients are
+thread-safe, only their creation from a shared session is not, so creations are serialized under a lock while
+lookups of existing clients are not.
+
+Usage:
+```
+cache = ClientCache(config)  # region from config.account.region
+s3 = cache.client("s3")
+glue = cache.client("glue", role_arn="arn:aws:iam::123456789012:role/reader")
+cache.stats()
+```
+
+Requires `boto3`.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from commons.utils import ConfigLoader, singleton
+
+DEFAULT_MAX_POOL_CONNECTIONS: int = 50
+DEFAULT_RETRY_MODE: str = "adaptive"
+DEFAULT_MAX_ATTEMPTS: int = 10
+DEFAULT_ROLE_SESSION_NAME: str = "commons"
+
+
+@dataclass
+class ClientStats:
+    """Usage counters of a cached client.
+
+    Attributes:
+        creations (int): Times the client was created.
+        reuses (int): Times the cached client was returned instead.
+        in_flight (int): API calls currently running on the client.
+        peak_in_flight (int): The highest number of concurrent API calls seen.
+        calls (int): API calls started on the client.
+    """
+
+    creations: int = 0
+    reuses: int = 0
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    calls: int = 0
+
+
+class _AssumedRoleProvider:
+    """Credential provider of a role session: the role is assumed on first use and again before it expires.
+
+    :param assume_role: Returns fresh credentials as `access_key`, `secret_key`, `token` and `expiry_time`.
+    """
+
+    METHOD = "sts-assume-role"
+    CANONICAL_NAME = "custom-sts-assume-role"
+
+    def __init__(self, assume_role: Callable[[], dict[str, str]]) -> None:
+        self.assume_role = assume_role
+
+    def load(self) -> Any:
+        """Returns the refreshable credentials of the role, without assuming it yet."""
+        from botocore.credentials import DeferredRefreshableCredentials
+
+        return DeferredRefreshableCredentials(refresh_using=self.assume_role, method=self.METHOD)
+
+
+class ClientCache:
+    """Creates each boto3 client once and shares it across threads.
+
+    :param config: The loaded configuration; `config.account.region` is the default region.
+    :param max_pool_connections: The default size of the connection pool of each client. Size it to the number of
+        threads sharing a client, or calls wait for a free connection.
+    :param retry_mode: The botocore retry mode; `adaptive` also rate-limits the client when it is throttled.
+    :param max_attempts: The maximum attempts of a call, including the first one.
+    :param endpoint_url: An endpoint for every client, e.g. a local stand-in such as MinIO or a moto server.
+    :param role_session_name: The session name of assumed roles.
+    """
+
+    def __init__(
+        self,
+        config: ConfigLoader | None = None,
+        max_pool_connections: int = DEFAULT_MAX_POOL_CONNECTIONS,
+        retry_mode: str = DEFAULT_RETRY_MODE,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        endpoint_url: str | None = None,
+        role_session_name: str = DEFAULT_ROLE_SESSION_NAME,
+    ) -> None:
+        self.region = config.account.region if config is not None else None
+        self.max_pool_connections = max_pool_connections
+        self.retry_mode = retry_mode
+        self.max_attempts = max_attempts
+        self.endpoint_url = endpoint_url
+        self.role_session_name = role_session_name
+        self._lock = threading.RLock()
+        self._stats_lock = threading.Lock()
+        self._sessions: dict[tuple[str | None, str | None], Any] = {}
+        self._clients: dict[tuple[str, str | None, str | None, int], Any] = {}
+        self._stats: dict[tuple[str, str | None, str | None, int], ClientStats] = {}
+
+    def client(
+        self,
+        service: str,
+        region: str | None = None,
+        role_arn: str | None = None,
+        max_pool_connections: int | None = None,
+    ) -> Any:
+        """Returns the client of a service, creating it on first use.
+
+        :param service: The service name, e.g. `s3`.
+        :param region: The region. Defaults to the region of the configuration, then to the boto3 default.
+        :param role_arn: A role to assume; its credentials are refreshed before they expire.
+        :param max_pool_connections: The size of the connection pool. Defaults to the cache setting.
+        :return: The shared client.
+        """
+        key = (service, region or self.region or None, role_arn, max_pool_connections or self.max_pool_connections)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._create(*key)
+                    self._clients[key] = client
+                    self._stats[key] = ClientStats(creations=1)
+                    return client
+        with self._stats_lock:
+            self._stats[key].reuses += 1
+        return client
+
+    def _create(self, service: str, region: str | None, role_arn: str | None, max_pool_connections: int) -> Any:
+        from botocore.config import Config
+
+        client = self._session(region, role_arn).client(
+            service,
+            region_name=region,
+            endpoint_url=self.endpoint_url,
+            config=Config(
+                max_pool_connections=max_pool_connections,
+                retries={"mode": self.retry_mode, "max_attempts": self.max_attempts},
+            ),
+        )
+        key = (service, region, role_arn, max_pool_connections)
+        client.meta.events.register("before-call", lambda **_: self._call_started(key))
+        client.meta.events.register("after-call", lambda **_: self._call_ended(key))
+        client.meta.events.register("after-call-error", lambda **_: self._call_ended(key))
+        return client
+
+    def _session(self, region: str | None, role_arn: str | None) -> Any:
+        """Returns the boto3 session of a region and role. Called under the lock: sessions are not thread-safe."""
+        session = self._sessions.get((region, role_arn))
+        if session is not None:
+            return session
+
+        import boto3
+
+        if role_arn is None:
+            session = boto3.session.Session(region_name=region)
+        else:
+            import botocore.session
+            from botocore.credentials import CredentialResolver
+
+            sts = self.client("sts", region)
+
+            def assume_role() -> dict[str, str]:
+                credentials = sts.assume_role(RoleArn=role_arn, RoleSessionName=self.role_session_name)["Credentials"]
+                return {
+                    "access_key": credentials["AccessKeyId"],
+                    "secret_key": credentials["SecretAccessKey"],
+                    "token": credentials["SessionToken"],
+                    "expiry_time": credentials["Expiration"].isoformat(),
+                }
+
+            # the role is the only credential source of the session, plugged in through botocore's public
+            # component registry rather than by setting its private credentials
+            core = botocore.session.Session()
+            core.register_component("credential_provider", CredentialResolver([_AssumedRoleProvider(assume_role)]))
+            session = boto3.session.Session(botocore_session=core, region_name=region)
+
+        self._sessions[(region, role_arn)] = session
+        return session
+
+    def _call_started(self, key: tuple[str, str | None, str | None, int]) -> None:
+        with self._stats_lock:
+            stats = self._stats.get(key)
+            if stats is not None:
+                stats.calls += 1
+                stats.in_flight += 1
+                stats.peak_in_flight = max(stats.peak_in_flight, stats.in_flight)
+
+    def _call_ended(self, key: tuple[str, str | None, str | None, int]) -> None:
+        with self._stats_lock:
+            stats = self._stats.get(key)
+            if stats is not None:
+                stats.in_flight -= 1
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Returns the counters of every cached client, keyed `<service>:<region>:<role>:<pool size>`, and their
+        sum under `total`.
+
+        :return: The counters, as dictionaries.
+        """
+        with self._stats_lock:
+            snapshot = {key: ClientStats(**asdict(stats)) for key, stats in self._stats.items()}
+        total = ClientStats()
+        for stats in snapshot.values():
+            for field, value in asdict(stats).items():
+                setattr(total, field, getattr(total, field) + value)
+        report = {":".join(str(part or "") for part in key): asdict(stats) for key, stats in snapshot.items()}
+        report["total"] = asdict(total)
+        return report
+
+    def clear(self) -> None:
+        """Drops the cached clients and sessions and their counters."""
+        with self._lock, self._stats_lock:
+            self._clients.clear()
+            self._sessions.clear()
+            self._stats.clear()
+
+
+# process-wide cache used when no cache is passed, with the default settings; `default_client_cache.reset()` drops it
+default_client_cache = singleton(ClientCache)
@@ -2,8 +2,27 @@
 
 from .account import Account
 from .company import Company
+from .iceberg import IcebergTable, PartitionTransform, SortField
+from .key_layout import KeyLayout, ObjectKey
 from .project import Project
 from .storage import Storage
+from .storage_profile import StorageProfile
+from .table import Column, PartitionKey, TableDefinition
 from .tags import Tags
 
-__all__ = ["Account", "Company", "Project", "Tags", "Storage"]
+__all__ = [
+    "Account",
+    "Company",
+    "Project",
+    "Tags",
+    "Storage",
+    "StorageProfile",
+    "Column",
+    "PartitionKey",
+    "TableDefinition",
+    "KeyLayout",
+    "ObjectKey",
+    "IcebergTable",
+    "PartitionTransform",
+    "SortField",
+]
@@ -0,0 +1,204 @@
+"""Iceberg table definition model."""
+
+from __future__ import annotations
+
+import re
+from typing import Literal
+
+from pydantic import BaseModel, Field, model_validator
+
+from commons.model.storage import Storage
+from commons.model.table import Column
+
+_IDENTIFIER = re.compile(r"[a-z][a-z0-9_]{0,254}")
+DEFAULT_TARGET_FILE_SIZE_BYTES: int = 512 * 1024**2
+DEFAULT_VACUUM_MAX_SNAPSHOT_AGE_SECONDS: int = 5 * 24 * 3600
+
+
+class PartitionTransform(BaseModel):
+    """Represents an Iceberg partition field: a transform of a column.
+
+    Attributes:
+        column (str): The source column.
+        transform (str): `identity`, `year`, `month`, `day`, `hour`, `bucket` or `truncate`.
+        width (int | None): `bucket` and `truncate`: the number of buckets or the truncation width.
+    """
+
+    column: str
+    transform: Literal["identity", "year", "month", "day", "hour", "bucket", "truncate"] = "identity"
+    width: int | None = Field(default=None, gt=0)
+
+    @model_validator(mode="after")
+    def _check_width(self) -> PartitionTransform:
+        if (self.transform in ("bucket", "truncate")) != (self.width is not None):
+            raise ValueError(f"Partition field '{self.column}': only bucket and truncate transforms take a width")
+        return self
+
+    @property
+    def expression(self) -> str:
+        """The field as written in `PARTITIONED BY`, e.g. `day(created_at)` or `bucket(16, customer_id)`."""
+        if self.transform == "identity":
+            return self.column
+        if self.width is not None:
+            return f"{self.transform}({self.width}, {self.column})"
+        return f"{self.transform}({self.column})"
+
+
+class SortField(BaseModel):
+    """Represents a column of the sort order of an Iceberg table.
+
+    Attributes:
+        column (str): The column.
+        descending (bool): Whether values are sorted in descending order.
+        nulls_first (bool): Whether nulls come first.
+    """
+
+    column: str
+    descending: bool = False
+    nulls_first: bool = False
+
+    @property
+    def expression(self) -> str:
+        """The field as written in `ORDER BY`, e.g. `created_at DESC NULLS LAST`."""
+        direction = "DESC" if self.descending else "ASC"
+        nulls = "FIRST" if self.nulls_first else "LAST"
+        return f"{self.column} {direction} NULLS {nulls}"
+
+
+class IcebergTable(BaseModel):
+    """Represents an Apache Iceberg table of the curated or analytics layer, managed through Athena.
+
+    Iceberg tracks its data files in table metadata, so queries prune files with column statistics instead of
+    listing folders, and partitioning is derived from column transforms instead of key folders.
+
+    The table properties (file size, compression, vacuum and optimize settings) are applied to existing tables by
+    `alter_statement`. The columns, partitioning and location only take effect when the table is created: changing
+    them for an existing table needs a migration (`ALTER TABLE ... ADD COLUMNS`, or a new table filled with `INSERT
+    INTO ... SELECT`), as Athena DDL cannot evolve an Iceberg partition spec.
+
+    Attributes:
+        name (str): The table name (lowercase, underscores).
+        layer (str): `second_layer` or `third_layer`.
+        columns (list[Column]): The columns.
+        partitioning (list[PartitionTransform]): The partition fields, outermost first.
+        sort_order (list[SortField]): The order in which rows are written, so that files hold narrow value ranges.
+        target_file_size_bytes (int): The size of the data files written and rewritten by `OPTIMIZE`.
+        vacuum_max_snapshot_age_seconds (int): Snapshots older than this are expired by `VACUUM`.
+        vacuum_min_snapshots_to_keep (int): Snapshots always kept by `VACUUM`.
+        optimize_rewrite_delete_file_threshold (int): Delete files that make `OPTIMIZE` rewrite a data file.
+        optimize_where (str | None): A predicate limiting `OPTIMIZE` to recent partitions, e.g.
+            `created_at >= current_date - interval '7' day`.
+        prefix (str | None): The dataset prefix under the layer prefix. Defaults to the table name.
+        write_compression (str): The Parquet compression codec.
+        description (str | None): An optional description.
+    """
+
+    name: str
+    layer: Literal["second_layer", "third_layer"]
+    columns: list[Column]
+    partitioning: list[PartitionTransform] = Field(default_factory=list)
+    sort_order: list[SortField] = Field(default_factory=list)
+    target_file_size_bytes: int = Field(default=DEFAULT_TARGET_FILE_SIZE_BYTES, ge=1024**2)
+    vacuum_max_snapshot_age_seconds: int = Field(default=DEFAULT_VACUUM_MAX_SNAPSHOT_AGE_SECONDS, gt=0)
+    vacuum_min_snapshots_to_keep: int = Field(default=1, ge=1)
+    optimize_rewrite_delete_file_threshold: int = Field(default=2, ge=1)
+    optimize_where: str | None = None
+    prefix: str | None = None
+    write_compression: Literal["zstd", "snappy", "gzip"] = "zstd"
+    description: str | None = None
+
+    @model_validator(mode="after")
+    def _check_columns(self) -> IcebergTable:
+        names = [column.name for column in self.columns]
+        for name in [self.name, *names]:
+            if not _IDENTIFIER.fullmatch(name):
+                raise ValueError(f"Invalid Iceberg identifier: {name!r}")
+        if not names:
+            raise ValueError(f"Table '{self.name}' has no columns")
+        for field in [*self.partitioning, *self.sort_order]:
+            if field.column not in names:
+                raise ValueError(f"Table '{self.name}' has no column '{field.column}'")
+        return self
+
+    def location(self, bucket_name: str, storage: Storage) -> str:
+        """Returns the S3 location of the table, e.g. `s3://bucket/stage/orders/`.
+
+        :param bucket_name: The name of the bucket of the layer.
+        :param storage: The storage layers, used for the layer prefix.
+        :return: The table location, ending with a slash.
+        """
+        parts = [getattr(storage, self.layer), self.prefix or self.name]
+        return f"s3://{bucket_name}/" + "/".join(part.strip("/") for part in parts if part) + "/"
+
+    def properties(self) -> dict[str, str]:
+        """Returns the Athena `TBLPROPERTIES` of the table."""
+        return {
+            "table_type": "ICEBERG",
+            "format": "parquet",
+            "write_compression": self.write_compression,
+            "write_target_data_file_size_bytes": str(self.target_file_size_bytes),
+            "optimize_rewrite_delete_file_threshold": str(self.optimize_rewrite_delete_file_threshold),
+            "vacuum_min_snapshots_to_keep": str(self.vacuum_min_snapshots_to_keep),
+            "vacuum_max_snapshot_age_seconds": str(self.vacuum_max_snapshot_age_seconds),
+        }
+
+    def create_statement(self, database: str, bucket_name: str, storage: Storage) -> str:
+        """Returns the `CREATE TABLE IF NOT EXISTS` statement of the table.
+
+        :param database: The Glue database.
+        :param bucket_name: The name of the bucket of the layer.
+        :param storage: The storage layers.
+        :return: The statement.
+        """
+        columns = ",\n".join(
+            f"  {column.name} {column.type}" + (f" COMMENT '{_quote(column.comment)}'" if column.comment else "")
+            for column in self.columns
+        )
+        statement = f"CREATE TABLE IF NOT EXISTS {database}.{self.name} (\n{columns}\n)"
+        if self.description:
+            statement += f"\nCOMMENT '{_quote(self.description)}'"
+        if self.partitioning:
+            statement += f"\nPARTITIONED BY ({', '.join(field.expression for field in self.partitioning)})"
+        statement += f"\nLOCATION '{self.location(bucket_name, storage)}'"
+        properties = ",\n".join(f"  '{key}'='{value}'" for key, value in self.properties().items())
+        return f"{statement}\nTBLPROPERTIES (\n{properties}\n)"
+
+    def alter_statement(self, database: str) -> str:
+        """Returns the `ALTER TABLE ... SET TBLPROPERTIES` statement applying the properties to an existing table.
+
+        `table_type` and `format` are fixed when the table is created, and are not set again.
+
+        :param database: The Glue database.
+        :return: The statement.
+        """
+        properties = ",\n".join(
+            f"  '{key}'='{value}'" for key, value in self.properties().items() if key not in ("table_type", "format")
+        )
+        return f"ALTER TABLE {database}.{self.name} SET TBLPROPERTIES (\n{properties}\n)"
+
+    def optimize_statement(self, database: str) -> str:
+        """Returns the `OPTIMIZE ... REWRITE DATA` statement compacting small files to the target size."""
+        statement = f"OPTIMIZE {database}.{self.name} REWRITE DATA USING BIN_PACK"
+        return f"{statement} WHERE {self.optimize_where}" if self.optimize_where else statement
+
+    def vacuum_statement(self, database: str) -> str:
+        """Returns the `VACUUM` statement expiring old snapshots and deleting unreferenced files."""
+        return f"VACUUM {database}.{self.name}"
+
+    def insert_statement(self, database: str, query: str) -> str:
+        """Returns an `INSERT INTO` statement writing the rows of `query` in the sort order of the table.
+
+        Athena cannot store a sort order in Iceberg metadata, so writers apply it through this statement.
+
+        :param database: The Glue database.
+        :param query: The `SELECT` producing the rows, with the columns of the table.
+        :return: The statement.
+        """
+        statement = f"INSERT INTO {database}.{self.name}\nSELECT * FROM (\n{query}\n)"
+        if self.sort_order:
+            statement += f"\nORDER BY {', '.join(field.expression for field in self.sort_order)}"
+        return statement
+
+
+def _quote(text: str) -> str:
+    return text.replace("'", "''")
@@ -0,0 +1,218 @@
+"""Object key layout model."""
+
+from __future__ import annotations
+
+import re
+import zlib
+from collections.abc import Iterable, Mapping, Sequence
+from functools import cached_property, lru_cache
+from typing import Literal, NamedTuple
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+class ObjectKey(NamedTuple):
+    """The components of an object key.
+
+    Attributes:
+        prefix (str): The layer prefix, e.g. `raw`.
+        dataset (str): The dataset, e.g. `orders`.
+        partitions (dict[str, str]): The Hive-style partition values, outermost first.
+        file_name (str): The object name.
+        shard (str | None): The hash shard, or None for unsharded layouts.
+    """
+
+    prefix: str
+    dataset: str
+    partitions: dict[str, str]
+    file_name: str
+    shard: str | None = None
+
+
+class KeyLayout(BaseModel):
+    """Represents how the objects of a layer are keyed: `<prefix>/<dataset>/<key>=<value>/.../<file name>`.
+
+    S3 scales request rates per key prefix, so a layout can spread the objects of a dataset over `shards` hash
+    prefixes. With `shard_position="leading"` the shard is the first folder (`<shard>/<prefix>/<dataset>/...`), which
+    spreads every dataset and partition of the layer and suits write-heavy zones such as the landing zone. With
+    `shard_position="partition"` the shard is the last folder (`.../<key>=<value>/<shard>/<file name>`): the load is
+    spread within each partition and table and partition locations stay plain prefixes that Athena reads recursively.
+
+    The shard of a key is derived from its dataset, partitions and file name, so it never needs to be stored.
+
+    Attributes:
+        prefix (str): The layer prefix, e.g. `Storage.landing_zone`.
+        shards (int): The number of hash shards, or 0 for unsharded keys.
+        shard_position (str): `leading` or `partition`.
+        partition_keys (tuple[str, ...]): When set, the partition keys every key must have, in this order.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    prefix: str
+    shards: int = Field(default=0, ge=0, le=4096)
+    shard_position: Literal["leading", "partition"] = "leading"
+    partition_keys: tuple[str, ...] = ()
+
+    @model_validator(mode="after")
+    def _check_prefix(self) -> KeyLayout:
+        if not self.prefix.strip("/") or "=" in self.prefix:
+            raise ValueError(f"Invalid key layout prefix: {self.prefix!r}")
+        return self
+
+    @cached_property
+    def _prefix(self) -> str:
+        return self.prefix.strip("/")
+
+    @cached_property
+    def _shard_format(self) -> str:
+        return f"0{len(f'{self.shards - 1:x}')}x" if self.shards else ""
+
+    @cached_property
+    def _pattern(self) -> re.Pattern[str]:
+        shard = r"(?P<shard>[0-9a-f]+)/"
+        prefix = re.escape(self._prefix) + "/"
+        body = r"(?P<dataset>[^/=]+)/(?P<partitions>(?:[^/=]+=[^/]*/)*)"
+        if not self.shards:
+            return re.compile(prefix + body + r"(?P<file>[^/]+)")
+        if self.shard_position == "leading":
+            return re.compile(shard + prefix + body + r"(?P<file>[^/]+)")
+        return re.compile(prefix + body + shard + r"(?P<file>[^/]+)")
+
+    def _folders(
+        self,
+        dataset: str,
+        partitions: Mapping[str, str] | Sequence[tuple[str, str]] | None,
+        complete: bool = True,
+    ) -> str:
+        pairs = list(partitions.items() if isinstance(partitions, Mapping) else partitions or ())
+        keys = tuple(key for key, _ in pairs)
+        expected = self.partition_keys if complete else self.partition_keys[: len(keys)]
+        if self.partition_keys and keys != expected:
+            raise ValueError(f"Partitions must be {self.partition_keys}, got {keys}")
+        if not dataset or "/" in dataset or "=" in dataset:
+            raise ValueError(f"Invalid dataset: {dataset!r}")
+        folders = [dataset]
+        for key, raw_value in pairs:
+            value = str(raw_value)
+            if not key or "/" in key or "=" in key or "/" in value:
+                raise ValueError(f"Invalid partition: {key}={value}")
+            folders.append(f"{key}={value}")
+        return "/".join(folders) + "/"
+
+    def shard(self, folders: str, file_name: str) -> str | None:
+        """Returns the shard of an object from its `<dataset>/<key>=<value>/.../` folders and name."""
+        if not self.shards:
+            return None
+        return self._shard(zlib.crc32(folders.encode()), file_name)
+
+    def _shard(self, folders_crc: int, file_name: str) -> str:
+        # the CRC of the folders seeds the CRC of the name, so batches of one partition hash the folders once
+        return format(zlib.crc32(file_name.encode(), folders_crc) % self.shards, self._shard_format)
+
+    def _key(self, folders: str, file_name: str, folders_crc: int | None = None) -> str:
+        if not file_name or "/" in file_name:
+            raise ValueError(f"Invalid file name: {file_name!r}")
+        if not self.shards:
+            return f"{self._prefix}/{folders}{file_name}"
+        shard = self._shard(zlib.crc32(folders.encode()) if folders_crc is None else folders_crc, file_name)
+        if self.shard_position == "leading":
+            return f"{shard}/{self._prefix}/{folders}{file_name}"
+        return f"{self._prefix}/{folders}{shard}/{file_name}"
+
+    def build(
+        self,
+        dataset: str,
+        file_name: str,
+        partitions: Mapping[str, str] | Sequence[tuple[str, str]] | None = None,
+    ) -> str:
+        """Returns the key of an object.
+
+        :param dataset: The dataset, e.g. `orders`.
+        :param file_name: The object name.
+        :param partitions: The partition values, outermost first, e.g. `{"dt": "2024-01-01"}`.
+        :return: The object key.
+        """
+        return self._key(self._folders(dataset, partitions), file_name)
+
+    def build_many(
+        self,
+        dataset: str,
+        file_names: Iterable[str],
+        partitions: Mapping[str, str] | Sequence[tuple[str, str]] | None = None,
+    ) -> list[str]:
+        """Returns the keys of many objects of one dataset partition; the folders are validated and rendered once.
+
+        :param dataset: The dataset.
+        :param file_names: The object names.
+        :param partitions: The partition values shared by the objects.
+        :return: The object keys, in the order of `file_names`.
+        """
+        folders = self._folders(dataset, partitions)
+        folders_crc = zlib.crc32(folders.encode())
+        return [self._key(folders, file_name, folders_crc) for file_name in file_names]
+
+    def parse(self, key: str) -> ObjectKey:
+        """Splits a key of this layout into its components.
+
+        :param key: The object key.
+        :return: The components.
+        :raises ValueError: If the key does not follow the layout or its shard does not match its content.
+        """
+        return self._parse(key, self._pattern.fullmatch(key))
+
+    def _parse(self, key: str, match: re.Match[str] | None) -> ObjectKey:
+        if match is None:
+            raise ValueError(f"Key does not follow the layout of {self._prefix!r}: {key}")
+        folders = f"{match['dataset']}/{match['partitions']}"
+        shard = match.groupdict().get("shard")
+        if shard is not None and shard != self.shard(folders, match["file"]):
+            raise ValueError(f"Key is not in its shard: {key}")
+        partitions = dict(folder.split("=", 1) for folder in match["partitions"].split("/") if folder)
+        return ObjectKey(self._prefix, match["dataset"], partitions, match["file"], shard)
+
+    def parse_many(self, keys: Iterable[str], strict: bool = True) -> list[ObjectKey | None]:
+        """Splits many keys of this layout.
+
+        :param keys: The object keys.
+        :param strict: Whether a key outside the layout raises ValueError (True) or yields None (False).
+        :return: The components of each key, in order.
+        """
+        pattern = self._pattern
+        parsed: list[ObjectKey | None] = []
+        for key in keys:
+            match = pattern.fullmatch(key)
+            if match is None and not strict:
+                parsed.append(None)
+                continue
+            parsed.append(self._parse(key, match))
+        return parsed
+
+    def prefixes(
+        self,
+        dataset: str | None = None,
+        partitions: Mapping[str, str] | Sequence[tuple[str, str]] | None = None,
+    ) -> list[str]:
+        """Returns the prefixes to list to find every object of a layer, dataset or dataset partition.
+
+        With leading shards, the objects are spread over one prefix per shard; otherwise one prefix covers them.
+
+        :param dataset: The dataset, or None for the whole layer.
+        :param partitions: The leading partition values, or None.
+        :return: The prefixes.
+        """
+        folders = self._folders(dataset, partitions, complete=False) if dataset else ""
+        if self.shards and self.shard_position == "leading":
+            return [f"{format(shard, self._shard_format)}/{self._prefix}/{folders}" for shard in range(self.shards)]
+        return [f"{self._prefix}/{folders}"]
+
+
+@lru_cache(maxsize=256)
+def key_layout(
+    prefix: str,
+    shards: int = 0,
+    shard_position: str = "leading",
+    partition_keys: tuple[str, ...] = (),
+) -> KeyLayout:
+    """Returns the layout of a prefix. Layouts are cached, so their compiled key pattern is built once per layout."""
+    return KeyLayout(prefix=prefix, shards=shards, shard_position=shard_position, partition_keys=partition_keys)
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+from collections.abc import Sequence
+
 from pydantic import BaseModel
 
+from commons.model.key_layout import KeyLayout, key_layout
+
 
 class Storage(BaseModel):
     """Represents a Storage model with different storage layers and zones.
@@ -21,3 +25,24 @@ class Storage(BaseModel):
     third_layer: str | None  # type: ignore[annotation-unchecked]
     landing_zone: str | None  # type: ignore[annotation-unchecked]
     assets: str | None  # type: ignore[annotation-unchecked]
+
+    def key_layout(
+        self,
+        layer: str,
+        shards: int = 0,
+        shard_position: str = "leading",
+        partition_keys: Sequence[str] = (),
+    ) -> KeyLayout:
+        """Returns the object key layout of a layer, prefixed with the layer name.
+
+        :param layer: The attribute of the layer, e.g. `landing_zone`.
+        :param shards: The number of hash shards spreading the keys over prefixes, or 0.
+        :param shard_position: `leading` (`<shard>/<layer>/...`) or `partition` (`.../<key>=<value>/<shard>/<file>`).
+        :param partition_keys: The partition keys every key must have, in order, or empty for any.
+        :return: The cached layout.
+        :raises ValueError: If the layer is not configured.
+        """
+        prefix = getattr(self, layer)
+        if not prefix or not prefix.strip():
+            raise ValueError(f"Storage layer '{layer}' is not configured")
+        return key_layout(prefix, shards, shard_position, tuple(partition_keys))
@@ -0,0 +1,65 @@
+"""Storage profile model."""
+
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class StorageProfile(BaseModel):
+    """Represents the cost/performance settings of the bucket of a storage layer.
+
+    Attributes:
+        versioned (bool): Whether object versioning is enabled.
+        kms_encryption (bool): Whether objects are encrypted with SSE-KMS and an S3 Bucket Key. The Bucket Key keeps
+            KMS request volume (and cost) low on high-throughput buckets.
+        transitions (dict[str, int]): Lifecycle transitions, as storage class name -> days after creation,
+            e.g. {"INTELLIGENT_TIERING": 0}.
+        archive_access_days (int | None): Days without access before Intelligent-Tiering moves objects to the
+            Archive Access tier (at least 90), or None to keep them queryable.
+        deep_archive_access_days (int | None): Days without access before Intelligent-Tiering moves objects to the
+            Deep Archive Access tier (at least 180), or None.
+        expiration_days (int | None): Days after which current objects expire, or None.
+        noncurrent_version_expiration_days (int | None): Days after which noncurrent versions expire, or None.
+        abort_incomplete_multipart_upload_days (int | None): Days after which incomplete multipart uploads are
+            aborted and their parts deleted, or None.
+    """
+
+    versioned: bool = False
+    kms_encryption: bool = True
+    transitions: dict[str, int] = Field(default_factory=dict)
+    archive_access_days: int | None = Field(default=None, ge=90)
+    deep_archive_access_days: int | None = Field(default=None, ge=180)
+    expiration_days: int | None = Field(default=None, ge=1)
+    noncurrent_version_expiration_days: int | None = Field(default=None, ge=1)
+    abort_incomplete_multipart_upload_days: int | None = Field(default=7, ge=1)
+
+    @property
+    def intelligent_tiering_archive(self) -> bool:
+        """Whether an Intelligent-Tiering archive configuration is needed."""
+        return self.archive_access_days is not None or self.deep_archive_access_days is not None
+
+
+# default profile per `Storage` layer
+DEFAULT_STORAGE_PROFILES: dict[str, StorageProfile] = {
+    # short-lived, high-throughput drop zone: objects are compacted into the first layer and then expire
+    "landing_zone": StorageProfile(expiration_days=30, abort_incomplete_multipart_upload_days=1),
+    # raw history, read by Athena tables and Glue crawlers and written by compaction: tier automatically, but never
+    # archive by default (archived objects cannot be read until restored); opt in through `profiles`
+    "first_layer": StorageProfile(
+        versioned=True,
+        transitions={"INTELLIGENT_TIERING": 0},
+        noncurrent_version_expiration_days=30,
+    ),
+    # queried by Athena: tier automatically, but never archive (archived objects cannot be queried)
+    "second_layer": StorageProfile(
+        versioned=True,
+        transitions={"INTELLIGENT_TIERING": 0},
+        noncurrent_version_expiration_days=30,
+    ),
+    "third_layer": StorageProfile(
+        versioned=True,
+        transitions={"INTELLIGENT_TIERING": 0},
+        noncurrent_version_expiration_days=7,
+    ),
+    "assets": StorageProfile(versioned=True, noncurrent_version_expiration_days=90),
+}
@@ -0,0 +1,132 @@
+"""Table definition model."""
+
+from __future__ import annotations
+
+from typing import Literal
+
+from pydantic import BaseModel, Field, model_validator
+
+from commons.model.storage import Storage
+
+
+class Column(BaseModel):
+    """Represents a table column.
+
+    Attributes:
+        name (str): The column name.
+        type (str): The Hive/Glue data type, e.g. `string`, `bigint`, `timestamp`.
+        comment (str | None): An optional description.
+    """
+
+    name: str
+    type: str
+    comment: str | None = None
+
+
+class PartitionKey(BaseModel):
+    """Represents a partition key and how Athena projects its values.
+
+    Attributes:
+        name (str): The partition column name.
+        projection (str): The projection type: `date`, `integer`, `enum` or `injected`.
+        type (str): The Glue data type of the column. Defaults to `string`.
+        range (str | None): `date` and `integer` projections: the `min,max` range, e.g. `2020-01-01,NOW` or `0,23`.
+        format (str | None): `date` projections: the Java date format of the values, e.g. `yyyy-MM-dd`.
+        interval (int | None): `date` and `integer` projections: the step between values.
+        interval_unit (str | None): `date` projections: the unit of the interval, e.g. `DAYS` or `HOURS`.
+        digits (int | None): `integer` projections: the zero-padded width of the values.
+        values (list[str]): `enum` projections: the allowed values.
+    """
+
+    name: str
+    projection: Literal["date", "integer", "enum", "injected"]
+    type: str = "string"
+    range: str | None = None
+    format: str | None = None
+    interval: int | None = None
+    interval_unit: str | None = None
+    digits: int | None = None
+    values: list[str] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def _check_projection(self) -> PartitionKey:
+        if self.projection in ("date", "integer") and not self.range:
+            raise ValueError(f"Partition key '{self.name}': {self.projection} projection needs a range")
+        if self.projection == "date" and not self.format:
+            raise ValueError(f"Partition key '{self.name}': date projection needs a format")
+        if self.projection == "enum" and not self.values:
+            raise ValueError(f"Partition key '{self.name}': enum projection needs values")
+        return self
+
+    def projection_parameters(self) -> dict[str, str]:
+        """Returns the `projection.<name>.*` table parameters of this key."""
+        prefix = f"projection.{self.name}"
+        parameters = {f"{prefix}.type": self.projection}
+        if self.range:
+            parameters[f"{prefix}.range"] = self.range
+        if self.format:
+            parameters[f"{prefix}.format"] = self.format
+        if self.interval:
+            parameters[f"{prefix}.interval"] = str(self.interval)
+        if self.interval_unit:
+            parameters[f"{prefix}.interval.unit"] = self.interval_unit
+        if self.digits:
+            parameters[f"{prefix}.digits"] = str(self.digits)
+        if self.values:
+            parameters[f"{prefix}.values"] = ",".join(self.values)
+        return parameters
+
+
+class TableDefinition(BaseModel):
+    """Represents a table of a data lake layer, with partition projection instead of catalogued partitions.
+
+    Attributes:
+        name (str): The table name (lowercase, underscores).
+        layer (str): The `Storage` attribute of the layer holding the data, e.g. `first_layer`.
+        columns (list[Column]): The data columns.
+        partition_keys (list[PartitionKey]): The partition keys, outermost first.
+        data_format (str): `parquet`, `json` or `csv`.
+        prefix (str | None): The dataset prefix under the layer prefix. Defaults to the table name.
+        hive_style (bool): Whether partition folders are named `key=value` (True) or just `value` (False).
+        layer_prefix (bool): Whether object keys start with the layer name, e.g. `raw/orders/...`.
+        description (str | None): An optional description.
+    """
+
+    name: str
+    layer: Literal["landing_zone", "first_layer", "second_layer", "third_layer", "assets"]
+    columns: list[Column]
+    partition_keys: list[PartitionKey] = Field(default_factory=list)
+    data_format: Literal["parquet", "json", "csv"] = "parquet"
+    prefix: str | None = None
+    hive_style: bool = True
+    layer_prefix: bool = True
+    description: str | None = None
+
+    def location(self, bucket_name: str, storage: Storage) -> str:
+        """Returns the S3 location of the table, e.g. `s3://bucket/raw/orders/`.
+
+        :param bucket_name: The name of the bucket of the layer.
+        :param storage: The storage layers, used for the layer prefix.
+        :return: The table location, ending with a slash.
+        """
+        parts = [getattr(storage, self.layer)] if self.layer_prefix else []
+        parts.append(self.prefix or self.name)
+        return f"s3://{bucket_name}/" + "/".join(part.strip("/") for part in parts if part) + "/"
+
+    def location_template(self, bucket_name: str, storage: Storage) -> str:
+        """Returns the `storage.location.template` of the table, with one `${key}` per partition key."""
+        folders = [
+            f"{key.name}=${{{key.name}}}/" if self.hive_style else f"${{{key.name}}}/" for key in self.partition_keys
+        ]
+        return self.location(bucket_name, storage) + "".join(folders)
+
+    def projection_parameters(self, bucket_name: str, storage: Storage) -> dict[str, str]:
+        """Returns the table parameters enabling partition projection, or an empty dict if not partitioned."""
+        if not self.partition_keys:
+            return {}
+
+        parameters = {"projection.enabled": "true"}
+        for key in self.partition_keys:
+            parameters.update(key.projection_parameters())
+        parameters["storage.location.template"] = self.location_template(bucket_name, storage)
+        return parameters
@@ -0,0 +1,539 @@
+"""Audits deployed data lake resources against their synthesized CloudFormation templates.
+
+Every S3 bucket, Athena workgroup and Glue database, table, crawler and job of the templates of cloud assemblies is
+looked up in the account and region of its stack (from `manifest.json`), and the differences are reported:
+
+- `missing`: the resource does not exist.
+- `tag`: a tag of the template (and of `expected_tags`, e.g. `Tags.default`) is absent or has another value.
+- `ssl`, `tls`: the bucket policy does not deny insecure transport or TLS versions below the minimum, as
+  `S3.create_bucket` sets with `enforce_ssl` and `minimum_tls_version`.
+- `property`: a workgroup setting differs from the template.
+- `unresolved`: the physical name is not a literal of the template and the stack does not resolve it.
+- `error`: the lookup failed, e.g. with `AccessDenied`.
+
+Resources are checked concurrently by a bounded thread pool sharing one client per service, region and role
+(`ClientCache`), and throttled calls are retried with exponential backoff and jitter, so hundreds of resources take
+seconds. The stacks of other accounts are read through a role of that account.
+
+Usage:
+```
+python -m commons.service.audit --assembly cdk.out/dev --assembly cdk.out/prod --tag Company=AnyCompany \
+    --role-arn 111111111111=arn:aws:iam::111111111111:role/audit --role-arn 222222222222=arn:aws:iam::...
+```
+
+Requires `boto3`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from commons.helper.aws import ClientCache, default_client_cache
+from commons.utils.constants import DEFAULT_ENCODING
+
+DEFAULT_MAX_WORKERS: int = 16
+DEFAULT_MAX_ATTEMPTS: int = 8
+DEFAULT_BASE_DELAY_SECONDS: float = 0.2
+DEFAULT_MIN_TLS_VERSION: float = 1.2
+THROTTLING_CODES: frozenset[str] = frozenset(
+    {
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "TooManyRequestsException",
+        "RequestLimitExceeded",
+        "SlowDown",
+        "RequestThrottled",
+    }
+)
+NOT_FOUND_CODES: frozenset[str] = frozenset({"NoSuchBucket", "EntityNotFoundException", "InvalidRequestException"})
+# CloudFormation resource type -> (service, template property holding the physical name)
+AUDITED_TYPES: dict[str, tuple[str, str]] = {
+    "AWS::S3::Bucket": ("s3", "BucketName"),
+    "AWS::Athena::WorkGroup": ("athena", "Name"),
+    "AWS::Glue::Database": ("glue", "DatabaseInput.Name"),
+    "AWS::Glue::Table": ("glue", "TableInput.Name"),
+    "AWS::Glue::Crawler": ("glue", "Name"),
+    "AWS::Glue::Job": ("glue", "Name"),
+}
+# workgroup settings compared with the template
+WORKGROUP_PROPERTIES: tuple[str, ...] = (
+    "EnforceWorkGroupConfiguration",
+    "BytesScannedCutoffPerQuery",
+    "PublishCloudWatchMetricsEnabled",
+)
+
+
+class AuditFinding(BaseModel):
+    """A difference between a template and the deployed resource.
+
+    Attributes:
+        assembly (str): The cloud assembly directory of the stack.
+        stack (str): The stack name.
+        logical_id (str): The logical ID of the resource in the template.
+        resource_type (str): The CloudFormation resource type.
+        physical_id (str | None): The name of the resource, when resolved.
+        check (str): `missing`, `tag`, `ssl`, `tls`, `property`, `unresolved` or `error`.
+        key (str | None): The tag key or property name.
+        expected (Any): The expected value.
+        actual (Any): The deployed value.
+    """
+
+    assembly: str
+    stack: str
+    logical_id: str
+    resource_type: str
+    physical_id: str | None = None
+    check: str
+    key: str | None = None
+    expected: Any = None
+    actual: Any = None
+
+
+class AuditReport(BaseModel):
+    """Outcome of an audit.
+
+    Attributes:
+        resources (int): The audited resources.
+        findings (list[AuditFinding]): The differences found.
+        seconds (float): Wall time of the audit.
+    """
+
+    resources: int = 0
+    findings: list[AuditFinding] = []
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """Whether no difference was found."""
+        return not self.findings
+
+    def summary(self) -> dict[str, int]:
+        """Returns the number of findings per check, and of resources with at least one finding."""
+        summary: dict[str, int] = {}
+        for finding in self.findings:
+            summary[finding.check] = summary.get(finding.check, 0) + 1
+        summary["drifted_resources"] = len(
+            {(finding.assembly, finding.stack, finding.logical_id) for finding in self.findings}
+        )
+        return summary
+
+
+@dataclass
+class StackTemplate:
+    """A stack of a cloud assembly.
+
+    Attributes:
+        assembly (str): The assembly directory.
+        stack (str): The stack name.
+        template (dict[str, Any]): The synthesized template.
+        account (str | None): The account of the stack, or None if the stack is environment-agnostic.
+        region (str | None): The region of the stack, or None if the stack is environment-agnostic.
+    """
+
+    assembly: str
+    stack: str
+    template: dict[str, Any]
+    account: str | None = None
+    region: str | None = None
+
+
+@dataclass
+class _Resource:
+    assembly: str
+    stack: str
+    logical_id: str
+    resource_type: str
+    properties: dict[str, Any]
+    region: str | None = None
+    role_arn: str | None = None
+    physical_id: str | None = None
+    resolve_error: str | None = None
+    database: str | None = None
+    ssl: bool = False
+    tls: float | None = None
+    findings: list[AuditFinding] = field(default_factory=list)
+
+    def finding(self, check: str, key: str | None = None, expected: Any = None, actual: Any = None) -> None:
+        self.findings.append(
+            AuditFinding(
+                assembly=self.assembly,
+                stack=self.stack,
+                logical_id=self.logical_id,
+                resource_type=self.resource_type,
+                physical_id=self.physical_id,
+                check=check,
+                key=key,
+                expected=expected,
+                actual=actual,
+            )
+        )
+
+
+def _environment(environment: str | None) -> tuple[str | None, str | None]:
+    """Splits `aws://<account>/<region>` of a manifest; `unknown-account` and `unknown-region` become None."""
+    account, _, region = (environment or "").removeprefix("aws://").partition("/")
+    return (
+        None if not account or account.startswith("unknown-") else account,
+        None if not region or region.startswith("unknown-") else region,
+    )
+
+
+def load_templates(assembly: str | Path) -> list[StackTemplate]:
+    """Reads the stacks of a cloud assembly directory, with their name and environment from `manifest.json`.
+
+    Without a manifest, every `*.template.json` is an environment-agnostic stack named after its file.
+
+    :param assembly: The assembly directory, e.g. `cdk.out` or `cdk.out/dev`.
+    :return: The stacks, in template file order.
+    """
+    directory = Path(assembly)
+    artifacts: dict[str, dict[str, Any]] = {}
+    manifest = directory / "manifest.json"
+    if manifest.exists():
+        for artifact_id, artifact in (
+            json.loads(manifest.read_text(encoding=DEFAULT_ENCODING)).get("artifacts", {}).items()
+        ):
+            if artifact.get("type") == "aws:cloudformation:stack":
+                properties = artifact.get("properties", {})
+                template_file = properties.get("templateFile", f"{artifact_id}.template.json")
+                artifacts[template_file] = {
+                    "stack": properties.get("stackName", artifact_id),
+                    "environment": artifact.get("environment"),
+                }
+
+    stacks = []
+    for path in sorted(directory.glob("*.template.json")):
+        artifact = artifacts.get(path.name, {})
+        account, region = _environment(artifact.get("environment"))
+        stacks.append(
+            StackTemplate(
+                assembly=str(assembly),
+                stack=artifact.get("stack", path.name.removesuffix(".template.json")),
+                template=json.loads(path.read_text(encoding=DEFAULT_ENCODING)),
+                account=account,
+                region=region,
+            )
+        )
+    return stacks
+
+
+def _tags(value: Any) -> dict[str, str]:
+    """Normalizes CloudFormation (`[{"Key": .., "Value": ..}]`) and Glue (`{key: value}`) tags; tokens are dropped."""
+    if isinstance(value, dict):
+        pairs = value.items()
+    else:
+        pairs = ((item.get("Key"), item.get("Value")) for item in value or [])
+    return {key: tag for key, tag in pairs if isinstance(key, str) and isinstance(tag, str)}
+
+
+def _secure_transport(statements: Iterable[dict[str, Any]]) -> tuple[bool, float | None]:
+    """Returns whether the statements deny insecure transport, and the minimum TLS version they enforce."""
+    ssl, tls = False, None
+    for statement in statements:
+        if statement.get("Effect") != "Deny":
+            continue
+        condition = statement.get("Condition", {})
+        if str(condition.get("Bool", {}).get("aws:SecureTransport", "")).lower() == "false":
+            ssl = True
+        version = condition.get("NumericLessThan", {}).get("s3:TlsVersion")
+        if version is not None:
+            tls = max(tls or 0.0, float(version))
+    return ssl, tls
+
+
+class Auditor:
+    """Compares deployed resources with their templates.
+
+    :param expected_tags: Tags every taggable resource must carry on top of its template tags, e.g. `Tags.default`.
+    :param cache: The client cache. Defaults to `default_client_cache()`.
+    :param region: The region of environment-agnostic stacks. Defaults to the region of the cache.
+    :param role_arn: A role to assume for the stacks of accounts without a role in `role_arns`.
+    :param role_arns: The role to assume per account, e.g. an audit role of each account of the assemblies.
+    :param max_workers: The resources checked concurrently.
+    :param max_attempts: The attempts of a throttled call.
+    :param base_delay_seconds: The first backoff delay; it doubles at each attempt, with full jitter.
+    :param min_tls_version: The TLS version every bucket policy must enforce, or None to only check the template's.
+    :param require_ssl: Whether every bucket policy must deny insecure transport, not only the template's.
+    """
+
+    def __init__(
+        self,
+        expected_tags: dict[str, str] | None = None,
+        cache: ClientCache | None = None,
+        region: str | None = None,
+        role_arn: str | None = None,
+        role_arns: dict[str, str] | None = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay_seconds: float = DEFAULT_BASE_DELAY_SECONDS,
+        min_tls_version: float | None = DEFAULT_MIN_TLS_VERSION,
+        require_ssl: bool = True,
+    ) -> None:
+        self.expected_tags = {key: value for key, value in (expected_tags or {}).items() if value}
+        self.cache = cache or default_client_cache()
+        self.region = region
+        self.role_arn = role_arn
+        self.role_arns = role_arns or {}
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.min_tls_version = min_tls_version
+        self.require_ssl = require_ssl
+        self.retries = 0
+        self._accounts: dict[tuple[str | None, str | None], str] = {}
+
+    def _client(self, service: str, region: str | None = None, role_arn: str | None = None) -> Any:
+        return self.cache.client(service, region or self.region, role_arn, max_pool_connections=self.max_workers)
+
+    def _call(
+        self, service: str, operation: str, region: str | None = None, role_arn: str | None = None, **kwargs: Any
+    ) -> Any:
+        """Calls an API operation, retrying throttled calls with exponential backoff and full jitter."""
+        from botocore.exceptions import ClientError
+
+        method: Callable[..., Any] = getattr(self._client(service, region, role_arn), operation)
+        for attempt in range(self.max_attempts):
+            try:
+                return method(**kwargs)
+            except ClientError as error:
+                if error.response["Error"]["Code"] not in THROTTLING_CODES or attempt == self.max_attempts - 1:
+                    raise
+                self.retries += 1
+                time.sleep(random.uniform(0, self.base_delay_seconds * 2**attempt))
+
+    @staticmethod
+    def _code(error: Exception) -> str:
+        return getattr(error, "response", {}).get("Error", {}).get("Code", "")
+
+    def _arn(self, service: str, resource: _Resource, path: str) -> str:
+        key = (resource.region, resource.role_arn)
+        if key not in self._accounts:
+            self._accounts[key] = self._call("sts", "get_caller_identity", *key)["Account"]
+        meta = self._client(service, *key).meta
+        return f"arn:{meta.partition}:{service}:{meta.region_name}:{self._accounts[key]}:{path}"
+
+    def _resources(self, stack: StackTemplate) -> list[_Resource]:
+        declared = stack.template.get("Resources", {})
+        role_arn = self.role_arns.get(stack.account or "", self.role_arn)
+
+        def literal(value: Any) -> str | None:
+            if isinstance(value, str):
+                return value
+            if isinstance(value, dict) and "Ref" in value:
+                referenced = declared.get(value["Ref"], {})
+                if referenced.get("Type") in AUDITED_TYPES:
+                    return literal(self._name(referenced))
+            return None
+
+        resources = []
+        for logical_id, resource in declared.items():
+            if resource.get("Type") not in AUDITED_TYPES:
+                continue
+            audited = _Resource(
+                stack.assembly,
+                stack.stack,
+                logical_id,
+                resource["Type"],
+                resource.get("Properties", {}),
+                region=stack.region,
+                role_arn=role_arn,
+            )
+            audited.physical_id = literal(self._name(resource))
+            if audited.resource_type == "AWS::Glue::Table":
+                audited.database = literal(audited.properties.get("DatabaseName"))
+            resources.append(audited)
+
+        # bucket policies of the template, for the SSL/TLS settings each bucket is expected to have
+        buckets = {
+            resource.logical_id: resource for resource in resources if resource.resource_type == "AWS::S3::Bucket"
+        }
+        for resource in declared.values():
+            if resource.get("Type") != "AWS::S3::BucketPolicy":
+                continue
+            bucket = resource.get("Properties", {}).get("Bucket")
+            target = buckets.get(bucket.get("Ref")) if isinstance(bucket, dict) else None
+            if target is not None:
+                statements = resource["Properties"].get("PolicyDocument", {}).get("Statement", [])
+                target.ssl, target.tls = _secure_transport(statements)
+        return resources
+
+    @staticmethod
+    def _name(resource: dict[str, Any]) -> Any:
+        value: Any = resource.get("Properties", {})
+        for part in AUDITED_TYPES[resource["Type"]][1].split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        return value
+
+    def _resolve(self, stack: StackTemplate, resources: list[_Resource]) -> None:
+        """Looks up the physical names the template does not hold in the stack, with one paginated listing.
+
+        A failed listing, e.g. `AccessDenied`, is recorded on the resources and reported as an `error`.
+        """
+        unresolved = [resource for resource in resources if resource.physical_id is None]
+        if not unresolved:
+            return
+        target = (unresolved[0].region, unresolved[0].role_arn)
+        physical = {}
+        kwargs = {"StackName": stack.stack}
+        try:
+            while True:
+                page = self._call("cloudformation", "list_stack_resources", *target, **kwargs)
+                for summary in page["StackResourceSummaries"]:
+                    physical[summary["LogicalResourceId"]] = summary.get("PhysicalResourceId")
+                if not page.get("NextToken"):
+                    break
+                kwargs["NextToken"] = page["NextToken"]
+        except Exception as error:  # noqa: BLE001 - reported per resource
+            for resource in unresolved:
+                resource.resolve_error = f"{type(error).__name__}: {error}"
+            return
+        for resource in unresolved:
+            resource.physical_id = physical.get(resource.logical_id)
+
+    def _check_tags(self, resource: _Resource, actual: dict[str, str]) -> None:
+        expected = {**self.expected_tags, **_tags(resource.properties.get("Tags"))}
+        for key, value in sorted(expected.items()):
+            # an empty value, e.g. of an unset configuration entry, is not enforced
+            if value and actual.get(key) != value:
+                resource.finding("tag", key, value, actual.get(key))
+
+    def _check_bucket(self, resource: _Resource) -> None:
+        name = resource.physical_id
+        target = (resource.region, resource.role_arn)
+        try:
+            tags = self._call("s3", "get_bucket_tagging", *target, Bucket=name)["TagSet"]
+        except Exception as error:
+            if self._code(error) != "NoSuchTagSet":
+                raise
+            tags = []
+        self._check_tags(resource, _tags(tags))
+
+        try:
+            policy = json.loads(self._call("s3", "get_bucket_policy", *target, Bucket=name)["Policy"])
+        except Exception as error:
+            if self._code(error) != "NoSuchBucketPolicy":
+                raise
+            policy = {}
+        statements = policy.get("Statement", [])
+        ssl, tls = _secure_transport([statements] if isinstance(statements, dict) else statements)
+        if (resource.ssl or self.require_ssl) and not ssl:
+            resource.finding("ssl", "aws:SecureTransport", "deny false", None)
+        min_tls = max(resource.tls or 0.0, self.min_tls_version or 0.0)
+        if min_tls and (tls or 0.0) < min_tls:
+            resource.finding("tls", "s3:TlsVersion", min_tls, tls)
+
+    def _check_workgroup(self, resource: _Resource) -> None:
+        target = (resource.region, resource.role_arn)
+        workgroup = self._call("athena", "get_work_group", *target, WorkGroup=resource.physical_id).get("WorkGroup")
+        if not workgroup:
+            resource.finding("missing")
+            return
+        expected = resource.properties.get("WorkGroupConfiguration", {})
+        actual = workgroup.get("Configuration", {})
+        for key in WORKGROUP_PROPERTIES:
+            if key in expected and isinstance(expected[key], (bool, int, str)) and expected[key] != actual.get(key):
+                resource.finding("property", key, expected[key], actual.get(key))
+        arn = self._arn("athena", resource, f"workgroup/{resource.physical_id}")
+        tags = self._call("athena", "list_tags_for_resource", *target, ResourceARN=arn)["Tags"]
+        self._check_tags(resource, _tags(tags))
+
+    def _check_glue(self, resource: _Resource) -> None:
+        name = resource.physical_id
+        target = (resource.region, resource.role_arn)
+        if resource.resource_type == "AWS::Glue::Database":
+            self._call("glue", "get_database", *target, Name=name)
+        elif resource.resource_type == "AWS::Glue::Table":
+            if resource.database is None:
+                resource.finding("unresolved", "DatabaseName")
+                return
+            self._call("glue", "get_table", *target, DatabaseName=resource.database, Name=name)
+        else:
+            kind = "crawler" if resource.resource_type == "AWS::Glue::Crawler" else "job"
+            self._call("glue", f"get_{kind}", *target, **({"Name": name} if kind == "crawler" else {"JobName": name}))
+            arn = self._arn("glue", resource, f"{kind}/{name}")
+            tags = self._call("glue", "get_tags", *target, ResourceArn=arn)["Tags"]
+            self._check_tags(resource, _tags(tags))
+
+    def _check(self, resource: _Resource) -> list[AuditFinding]:
+        if resource.physical_id is None:
+            if resource.resolve_error is not None:
+                resource.finding("error", "PhysicalResourceId", actual=resource.resolve_error)
+            else:
+                resource.finding("unresolved")
+            return resource.findings
+        service = AUDITED_TYPES[resource.resource_type][0]
+        try:
+            if service == "s3":
+                self._check_bucket(resource)
+            elif service == "athena":
+                self._check_workgroup(resource)
+            else:
+                self._check_glue(resource)
+        except Exception as error:  # noqa: BLE001 - reported per resource
+            if self._code(error) in NOT_FOUND_CODES:
+                resource.finding("missing")
+            else:
+                resource.finding("error", actual=f"{type(error).__name__}: {error}")
+        return resource.findings
+
+    def audit(self, stacks: Iterable[StackTemplate]) -> AuditReport:
+        """Audits the resources of stacks, each in the account and region of its environment.
+
+        :param stacks: The stacks, e.g. from `load_templates` for each assembly.
+        :return: The findings.
+        """
+        started = time.perf_counter()
+        resources = []
+        for stack in stacks:
+            stack_resources = self._resources(stack)
+            self._resolve(stack, stack_resources)
+            resources.extend(stack_resources)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            findings = [finding for found in executor.map(self._check, resources) for finding in found]
+
+        return AuditReport(resources=len(resources), findings=findings, seconds=time.perf_counter() - started)
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--assembly", required=True, action="append", help="cloud assembly directory; repeatable")
+    parser.add_argument("--tag", action="append", default=[], help="expected KEY=VALUE tag; repeatable")
+    parser.add_argument("--region", default=None, help="region of environment-agnostic stacks")
+    parser.add_argument(
+        "--role-arn", action="append", default=[], help="ACCOUNT=ARN role of an account, or the default ARN; repeatable"
+    )
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    role_arns = dict(role.split("=", 1) for role in args.role_arn if "=" in role)
+    defaults = [role for role in args.role_arn if "=" not in role]
+    auditor = Auditor(
+        expected_tags=dict(tag.split("=", 1) for tag in args.tag),
+        region=args.region,
+        role_arn=defaults[-1] if defaults else None,
+        role_arns=role_arns,
+        max_workers=args.max_workers,
+    )
+    report = auditor.audit(stack for assembly in args.assembly for stack in load_templates(assembly))
+    sys.stdout.write(json.dumps({"summary": report.summary(), **report.model_dump()}, default=str, indent=2) + "\n")
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
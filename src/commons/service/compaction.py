@@ -0,0 +1,570 @@
+"""Compacts the small JSON/CSV objects of the landing zone into size-targeted, partitioned Parquet files.
+
+Source keys are `<source prefix><dataset>/[<key>=<value>/...]<file>`; each dataset and partition is compacted into
+`<target prefix><dataset>/[<key>=<value>/...]part-<batch id>-<n>.parquet`. Objects are read in parallel, buffered
+into row groups of about `row_group_bytes` and written to Parquet files rolled at `target_file_bytes`, so memory is
+bounded by the row group buffer and not by the size of a batch.
+
+Every batch is recorded in a ledger before its files are written and committed after, so a rerun skips the
+compacted objects and replays an interrupted batch with the same composition and the same output keys. Failures are
+isolated: an object that cannot be read (malformed or deleted) is left out of its batch and quarantined, and a batch
+that fails is quarantined whole, its partial files removed, while the other batches go on. Quarantined objects are
+retried once they are rewritten.
+
+Usage:
+```
+python -m commons.service.compaction --source s3://landing-bucket --source-prefix landing/ \
+    --target s3://raw-bucket --target-prefix raw/
+```
+
+Requires `pyarrow`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from pydantic import BaseModel
+
+from commons.model import KeyLayout
+from commons.service.object_store import DeleteError, ObjectInfo, ObjectStore, open_store
+from commons.utils import ProcessLogger
+from commons.utils.constants import DEFAULT_ENCODING
+
+DEFAULT_TARGET_FILE_BYTES: int = 128 * 1024**2
+DEFAULT_ROW_GROUP_BYTES: int = 32 * 1024**2
+DEFAULT_MAX_BATCH_FILES: int = 5000
+DEFAULT_MAX_WORKERS: int = 16
+LEDGER_PREFIX: str = "_compaction/ledger/"
+LEDGER_SNAPSHOT: str = "snapshot.json"
+# source file suffix -> reader
+SOURCE_FORMATS: dict[str, str] = {".json": "json", ".jsonl": "json", ".ndjson": "json", ".csv": "csv"}
+
+
+def _pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.csv
+        import pyarrow.json
+        import pyarrow.parquet
+    except ImportError as error:  # pragma: no cover - depends on the environment
+        raise ImportError("The compaction service requires pyarrow: pip install pyarrow") from error
+    return pyarrow
+
+
+@dataclass(frozen=True)
+class Batch:
+    """Objects of one dataset partition compacted together.
+
+    Attributes:
+        dataset (str): The first folder of the keys under the source prefix.
+        partitions (tuple[tuple[str, str], ...]): The `key=value` folders of the keys, outermost first.
+        data_format (str): `json` or `csv`.
+        objects (tuple[ObjectInfo, ...]): The source objects, in key order.
+    """
+
+    dataset: str
+    partitions: tuple[tuple[str, str], ...]
+    data_format: str
+    objects: tuple[ObjectInfo, ...]
+
+    @property
+    def batch_id(self) -> str:
+        """A digest of the fingerprints of the objects: the same objects always form the same batch."""
+        digest = hashlib.sha256()
+        for info in self.objects:
+            digest.update(info.fingerprint.encode(DEFAULT_ENCODING))
+        return digest.hexdigest()[:32]
+
+    def file_name(self, index: int) -> str:
+        """Returns the name of the `index`-th Parquet file of the batch."""
+        return f"part-{self.batch_id}-{index:05d}.parquet"
+
+    def output_key(self, target_prefix: str, index: int) -> str:
+        """Returns the key of the `index`-th Parquet file of the batch under a target prefix."""
+        folders = "".join(f"{key}={value}/" for key, value in self.partitions)
+        return f"{target_prefix}{self.dataset}/{folders}{self.file_name(index)}"
+
+    def to_record(self) -> dict[str, Any]:
+        return {
+            "dataset": self.dataset,
+            "partitions": [list(pair) for pair in self.partitions],
+            "data_format": self.data_format,
+            "objects": [[info.key, info.size, info.last_modified] for info in self.objects],
+        }
+
+    @classmethod
+    def from_record(cls, record: dict[str, Any]) -> Batch:
+        return cls(
+            dataset=record["dataset"],
+            partitions=tuple(tuple(pair) for pair in record["partitions"]),
+            data_format=record["data_format"],
+            objects=tuple(ObjectInfo(key, size, last_modified) for key, size, last_modified in record["objects"]),
+        )
+
+
+class CompactionLedger:
+    """Records the batches of a target store: `pending/<id>.json` while written, `done/<id>.json` after.
+
+    The quarantined objects of a batch are recorded in `failed/<id>.json`. `roll_up` folds the `done/` records into
+    `snapshot.json`, so a run reads one snapshot and the records of the runs since the last roll-up.
+
+    :param store: The store holding the ledger, usually the target store.
+    :param prefix: The key prefix of the ledger, outside the compacted datasets.
+    """
+
+    def __init__(self, store: ObjectStore, prefix: str = LEDGER_PREFIX) -> None:
+        self.store = store
+        self.prefix = prefix
+        self._compacted: set[str] | None = None
+        self._done_keys: list[str] = []
+
+    def _records(self, state: str) -> Iterator[tuple[str, dict[str, Any]]]:
+        for info in self.store.list(f"{self.prefix}{state}/"):
+            yield info.key, json.loads(self.store.read(info.key))
+
+    def compacted(self) -> set[str]:
+        """Returns the fingerprints of the objects of the committed batches."""
+        if self._compacted is None:
+            snapshot = f"{self.prefix}{LEDGER_SNAPSHOT}"
+            has_snapshot = any(info.key == snapshot for info in self.store.list(snapshot))
+            self._compacted = set(json.loads(self.store.read(snapshot))["compacted"]) if has_snapshot else set()
+            for key, record in self._records("done"):
+                self._done_keys.append(key)
+                self._compacted.update(
+                    ObjectInfo(key, size, last_modified).fingerprint
+                    for key, size, last_modified in record["batch"]["objects"]
+                )
+        return self._compacted
+
+    def quarantined(self) -> set[str]:
+        """Returns the fingerprints of the quarantined objects."""
+        return {
+            ObjectInfo(key, size, last_modified).fingerprint
+            for _, record in self._records("failed")
+            for key, size, last_modified in record["objects"]
+        }
+
+    def pending(self) -> list[Batch]:
+        """Returns the batches that were started but not committed."""
+        return [Batch.from_record(record["batch"]) for _, record in self._records("pending")]
+
+    def begin(self, batch: Batch) -> None:
+        """Records that a batch is about to be written."""
+        body = json.dumps({"batch": batch.to_record()})
+        self.store.put(f"{self.prefix}pending/{batch.batch_id}.json", body.encode(DEFAULT_ENCODING))
+
+    def commit(self, batch: Batch, outputs: list[str]) -> None:
+        """Records that all the files of a batch are written."""
+        body = json.dumps({"batch": batch.to_record(), "outputs": outputs, "committed_at": time.time()})
+        self.store.put(f"{self.prefix}done/{batch.batch_id}.json", body.encode(DEFAULT_ENCODING))
+        self.store.delete([f"{self.prefix}pending/{batch.batch_id}.json"])
+        self.compacted().update(info.fingerprint for info in batch.objects)
+        self._done_keys.append(f"{self.prefix}done/{batch.batch_id}.json")
+
+    def quarantine(self, batch: Batch, errors: dict[str, str], *, failed: bool = False) -> None:
+        """Records the objects of a batch that could not be compacted, with their error.
+
+        :param batch: The batch.
+        :param errors: The error message per object key.
+        :param failed: Whether the whole batch failed; its pending record is then removed, so it is not replayed.
+        """
+        objects = [[info.key, info.size, info.last_modified] for info in batch.objects if info.key in errors]
+        body = json.dumps({"batch_id": batch.batch_id, "objects": objects, "errors": errors, "failed_at": time.time()})
+        self.store.put(f"{self.prefix}failed/{batch.batch_id}.json", body.encode(DEFAULT_ENCODING))
+        if failed:
+            self.store.delete([f"{self.prefix}pending/{batch.batch_id}.json"])
+
+    def roll_up(self, listed: set[str], prefixes: Iterable[str]) -> None:
+        """Folds the `done/` records into the snapshot.
+
+        Fingerprints of objects under `prefixes` that are no longer listed are dropped: a deleted or rewritten object
+        cannot be planned again under that fingerprint, so the snapshot stays bounded by the source objects.
+
+        :param listed: The fingerprints of the source objects listed by the run.
+        :param prefixes: The listed source prefixes.
+        """
+        prefixes = tuple(prefixes)
+        kept = sorted(
+            fingerprint
+            for fingerprint in self.compacted()
+            if fingerprint in listed or not fingerprint.rsplit(":", 2)[0].startswith(prefixes)
+        )
+        # the snapshot is written before the records are removed: an interruption only leaves duplicates
+        body = json.dumps({"compacted": kept, "rolled_up_at": time.time()})
+        self.store.put(f"{self.prefix}{LEDGER_SNAPSHOT}", body.encode(DEFAULT_ENCODING))
+        self.store.delete(self._done_keys)
+        self._compacted, self._done_keys = set(kept), []
+
+
+class CompactionResult(BaseModel):
+    """Outcome of a compaction run.
+
+    Attributes:
+        batches (int): The number of compacted batches.
+        files_read (int): The number of source objects compacted.
+        bytes_read (int): Their total size.
+        files_written (int): The number of Parquet files written.
+        bytes_written (int): Their total size.
+        skipped (int): Source objects left out: already compacted or quarantined, unknown format or outside any
+            dataset folder.
+        failed (int): The number of batches that failed and were quarantined.
+        quarantined (int): The number of source objects quarantined by this run.
+        undeleted (int): Compacted source objects that `delete_sources` could not delete; they are not compacted
+            again.
+        seconds (float): Wall time of the run.
+    """
+
+    batches: int = 0
+    files_read: int = 0
+    bytes_read: int = 0
+    files_written: int = 0
+    bytes_written: int = 0
+    skipped: int = 0
+    failed: int = 0
+    quarantined: int = 0
+    undeleted: int = 0
+    seconds: float = 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        """Source megabytes compacted per second."""
+        return self.bytes_read / 1024**2 / self.seconds if self.seconds else 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        """Source objects compacted per second."""
+        return self.files_read / self.seconds if self.seconds else 0.0
+
+
+class _ParquetFiles:
+    """Writes tables to Parquet files of about `target_bytes`, uploading each file when it is rolled."""
+
+    def __init__(self, store: ObjectStore, output_key: Callable[[int], str], target_bytes: int) -> None:
+        self.store = store
+        self.output_key = output_key
+        self.target_bytes = target_bytes
+        self.outputs: list[str] = []
+        self.bytes_written = 0
+        self._writer: Any = None
+        self._path: str | None = None
+
+    def write(self, table: Any) -> None:
+        pa = _pyarrow()
+        if self._writer is not None and not self._writer.schema.equals(table.schema):
+            # the inferred schema changed within the partition: start a new file rather than failing the batch
+            self.roll()
+        if self._writer is None:
+            handle, self._path = tempfile.mkstemp(suffix=".parquet")
+            os.close(handle)
+            self._writer = pa.parquet.ParquetWriter(self._path, table.schema, compression="snappy")
+        self._writer.write_table(table)
+        if os.path.getsize(self._path) >= self.target_bytes:
+            self.roll()
+
+    def roll(self) -> None:
+        if self._writer is None:
+            return
+        self._writer.close()
+        key = self.output_key(len(self.outputs))
+        self.bytes_written += os.path.getsize(self._path)
+        try:
+            self.store.put_file(key, self._path)
+        finally:
+            os.unlink(self._path)
+        self.outputs.append(key)
+        self._writer = self._path = None
+
+
+class Compactor:
+    """Compacts the objects under a source prefix into Parquet files under a target prefix.
+
+    :param source: The store of the small objects, e.g. the landing zone bucket.
+    :param target: The store receiving the Parquet files and the ledger, e.g. the first layer bucket.
+    :param source_prefix: The prefix of the compacted objects, e.g. `landing/`.
+    :param target_prefix: The prefix of the Parquet files, e.g. `raw/`.
+    :param target_file_bytes: The size at which Parquet files are rolled.
+    :param row_group_bytes: The in-memory size of the tables buffered into one row group.
+    :param max_batch_files: The maximum number of objects of a batch.
+    :param max_workers: The number of threads reading and parsing objects.
+    :param delete_sources: Whether the source objects are deleted once their batch is committed.
+    :param ledger: The ledger. Defaults to a `CompactionLedger` in the target store.
+    :param source_layout: The layout of the source keys, e.g. `Storage.key_layout("landing_zone", shards=16)`. When
+        set, every prefix of the layout is listed and keys are parsed with it instead of `source_prefix`.
+    :param target_layout: The layout of the Parquet keys, e.g. `Storage.key_layout("first_layer")`. When set, it is
+        used instead of `target_prefix`.
+    """
+
+    def __init__(
+        self,
+        source: ObjectStore,
+        target: ObjectStore,
+        source_prefix: str = "",
+        target_prefix: str = "",
+        target_file_bytes: int = DEFAULT_TARGET_FILE_BYTES,
+        row_group_bytes: int = DEFAULT_ROW_GROUP_BYTES,
+        max_batch_files: int = DEFAULT_MAX_BATCH_FILES,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        delete_sources: bool = False,
+        ledger: CompactionLedger | None = None,
+        source_layout: KeyLayout | None = None,
+        target_layout: KeyLayout | None = None,
+    ) -> None:
+        if target_file_bytes <= 0 or row_group_bytes <= 0 or max_batch_files <= 0:
+            raise ValueError("Compaction sizes must be positive")
+        self.source = source
+        self.target = target
+        self.source_prefix = source_prefix
+        self.target_prefix = target_prefix
+        self.target_file_bytes = target_file_bytes
+        self.row_group_bytes = row_group_bytes
+        self.max_batch_files = max_batch_files
+        self.max_workers = max_workers
+        self.delete_sources = delete_sources
+        self.ledger = ledger or CompactionLedger(target)
+        self.source_layout = source_layout
+        self.target_layout = target_layout
+        self.logger = ProcessLogger(process_name="", log_level=logging.INFO)
+
+    def plan(self, objects: Iterable[ObjectInfo]) -> tuple[list[Batch], int]:
+        """Groups the objects that are not compacted yet into batches of one dataset partition and format.
+
+        :param objects: The source objects.
+        :return: The batches and the number of objects left out.
+        """
+        excluded = self.ledger.compacted() | self.ledger.quarantined()
+        groups: dict[tuple[str, tuple[tuple[str, str], ...], str], list[ObjectInfo]] = {}
+        skipped = 0
+        objects = list(objects)
+        for info, (dataset, partitions, file_name) in zip(objects, self._components(objects), strict=True):
+            data_format = SOURCE_FORMATS.get(os.path.splitext(file_name)[1].lower())
+            if not dataset or data_format is None or info.fingerprint in excluded:
+                skipped += 1
+                continue
+            groups.setdefault((dataset, partitions, data_format), []).append(info)
+
+        batches = [
+            Batch(dataset, partitions, data_format, tuple(members[start : start + self.max_batch_files]))
+            for (dataset, partitions, data_format), members in groups.items()
+            for start in range(0, len(members), self.max_batch_files)
+        ]
+        return batches, skipped
+
+    def _components(self, objects: list[ObjectInfo]) -> Iterator[tuple[str, tuple[tuple[str, str], ...], str]]:
+        """Yields the dataset (empty outside any dataset), partitions and file name of each object."""
+        if self.source_layout is not None:
+            for parsed in self.source_layout.parse_many((info.key for info in objects), strict=False):
+                if parsed is None:
+                    yield "", (), ""
+                else:
+                    yield parsed.dataset, tuple(parsed.partitions.items()), parsed.file_name
+            return
+        for info in objects:
+            folders = info.key[len(self.source_prefix) :].split("/")
+            partitions = tuple(tuple(folder.split("=", 1)) for folder in folders[1:-1] if "=" in folder)
+            yield (folders[0] if len(folders) > 1 else ""), partitions, folders[-1]
+
+    def _prefixes(self) -> list[str]:
+        return [self.source_prefix] if self.source_layout is None else list(self.source_layout.prefixes())
+
+    def _list(self) -> Iterator[ObjectInfo]:
+        for prefix in self._prefixes():
+            yield from self.source.list(prefix)
+
+    def _output_key(self, batch: Batch, index: int) -> str:
+        if self.target_layout is None:
+            return batch.output_key(self.target_prefix, index)
+        return self.target_layout.build(batch.dataset, batch.file_name(index), batch.partitions)
+
+    def _read(self, batch: Batch, info: ObjectInfo) -> Any:
+        pa = _pyarrow()
+        buffer = pa.BufferReader(self.source.read(info.key))
+        if batch.data_format == "csv":
+            return pa.csv.read_csv(buffer)
+        return pa.json.read_json(buffer)
+
+    def _try_read(self, batch: Batch, info: ObjectInfo) -> tuple[Any, str | None]:
+        try:
+            return self._read(batch, info), None
+        except Exception as error:  # noqa: BLE001 - the object is quarantined, not the batch
+            return None, f"{type(error).__name__}: {error}"
+
+    def _tables(self, batch: Batch, executor: ThreadPoolExecutor, errors: dict[str, str]) -> Iterator[Any]:
+        """Yields the tables of a batch concatenated into buffers of about `row_group_bytes`.
+
+        Objects that are missing or cannot be parsed are left out and their error is added to `errors`.
+        """
+        pa = _pyarrow()
+        buffered: list[Any] = []
+        buffered_bytes = 0
+        # read ahead a bounded window, so memory does not grow with the batch
+        window = self.max_workers * 4
+        for start in range(0, len(batch.objects), window):
+            objects = batch.objects[start : start + window]
+            for info, (table, error) in zip(
+                objects, executor.map(lambda info: self._try_read(batch, info), objects), strict=True
+            ):
+                if error is not None:
+                    errors[info.key] = error
+                    continue
+                buffered.append(table)
+                buffered_bytes += table.nbytes
+                if buffered_bytes >= self.row_group_bytes:
+                    yield pa.concat_tables(buffered, promote_options="permissive")
+                    buffered, buffered_bytes = [], 0
+        if buffered:
+            yield pa.concat_tables(buffered, promote_options="permissive")
+
+    def compact_batch(self, batch: Batch, executor: ThreadPoolExecutor) -> tuple[list[str], int, dict[str, str]]:
+        """Writes the Parquet files of a batch and commits it to the ledger.
+
+        Objects that cannot be read are quarantined and left in the source. If the batch itself fails, the files it
+        wrote are removed, whatever their prefix or shard, before the error is raised.
+
+        :param batch: The batch.
+        :param executor: The pool reading the source objects.
+        :return: The keys of the written files, their total size and the error per quarantined object.
+        """
+        self.ledger.begin(batch)
+        errors: dict[str, str] = {}
+        files = _ParquetFiles(self.target, lambda index: self._output_key(batch, index), self.target_file_bytes)
+        try:
+            for table in self._tables(batch, executor, errors):
+                files.write(table)
+            files.roll()
+        except Exception:
+            self.target.delete(files.outputs)
+            raise
+        if errors:
+            self.ledger.quarantine(batch, errors)
+        self.ledger.commit(batch, files.outputs)
+        return files.outputs, files.bytes_written, errors
+
+    def _delete_sources(self, batch: Batch, errors: dict[str, str], result: CompactionResult) -> None:
+        """Deletes the compacted objects of a committed batch; the quarantined ones stay in the source."""
+        try:
+            self.source.delete(info.key for info in batch.objects if info.key not in errors)
+        except DeleteError as error:
+            # the batch is committed: its objects are compacted and only left in place
+            result.undeleted += len(error.errors)
+            self.logger.warning(
+                "could not delete %d compacted objects of %s: %s", len(error.errors), batch.dataset, error
+            )
+
+    def _quarantine_batch(self, batch: Batch, error: Exception, result: CompactionResult) -> None:
+        message = f"{type(error).__name__}: {error}"
+        self.ledger.quarantine(batch, {info.key: message for info in batch.objects}, failed=True)
+        result.failed += 1
+        result.quarantined += len(batch.objects)
+        self.logger.error("quarantined batch %s of %s: %s", batch.batch_id, batch.dataset, message)
+
+    def run(self) -> CompactionResult:
+        """Replays the pending batches, then compacts every object of the source prefix not compacted yet.
+
+        A failing batch is quarantined and the run goes on with the next one; the `done/` records are then rolled up
+        into the ledger snapshot.
+
+        :return: The counters and duration of the run.
+        """
+        started = time.perf_counter()
+        pending = self.ledger.pending()
+        # objects of an interrupted batch are only replayed with that batch, never regrouped
+        replayed = {info.fingerprint for batch in pending for info in batch.objects}
+        listed = list(self._list())
+        batches, skipped = self.plan(info for info in listed if info.fingerprint not in replayed)
+        batches = pending + batches
+
+        result = CompactionResult(skipped=skipped)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for batch in batches:
+                try:
+                    outputs, bytes_written, errors = self.compact_batch(batch, executor)
+                except Exception as error:  # noqa: BLE001 - one batch must not block the others
+                    self._quarantine_batch(batch, error, result)
+                    continue
+                if self.delete_sources:
+                    self._delete_sources(batch, errors, result)
+                if errors:
+                    result.quarantined += len(errors)
+                    self.logger.warning("quarantined %d objects of %s", len(errors), batch.dataset)
+                result.batches += 1
+                result.files_read += len(batch.objects) - len(errors)
+                result.bytes_read += sum(info.size for info in batch.objects if info.key not in errors)
+                result.files_written += len(outputs)
+                result.bytes_written += bytes_written
+                self.logger.info(
+                    "compacted %d objects of %s into %d files",
+                    len(batch.objects) - len(errors),
+                    batch.dataset,
+                    len(outputs),
+                )
+
+        self.ledger.roll_up({info.fingerprint for info in listed}, self._prefixes())
+        result.seconds = time.perf_counter() - started
+        return result
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--source", required=True, help="s3://<bucket> or a local directory")
+    parser.add_argument("--source-prefix", default="")
+    parser.add_argument("--source-shards", type=int, default=0, help="leading hash shards of the source keys")
+    parser.add_argument("--target", required=True, help="s3://<bucket> or a local directory")
+    parser.add_argument("--target-prefix", default="")
+    parser.add_argument("--target-file-bytes", type=int, default=DEFAULT_TARGET_FILE_BYTES)
+    parser.add_argument("--max-batch-files", type=int, default=DEFAULT_MAX_BATCH_FILES)
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--delete-sources", default="false", help="true to delete compacted objects")
+    # Glue jobs pass their own arguments (--JOB_ID, --job-bookmark-option, ...) along with the job's
+    return parser.parse_known_args(argv)[0]
+
+
+def run(args: argparse.Namespace) -> CompactionResult:
+    compactor = Compactor(
+        source=open_store(args.source),
+        target=open_store(args.target),
+        source_prefix=args.source_prefix,
+        source_layout=KeyLayout(prefix=args.source_prefix, shards=args.source_shards) if args.source_shards else None,
+        target_prefix=args.target_prefix,
+        target_file_bytes=args.target_file_bytes,
+        max_batch_files=args.max_batch_files,
+        max_workers=args.max_workers,
+        delete_sources=str(args.delete_sources).lower() == "true",
+    )
+    return compactor.run()
+
+
+def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
+    """Lambda entry point: the arguments are read from `COMPACTION_*` environment variables, e.g.
+    `COMPACTION_SOURCE=s3://landing-bucket`, overridden by the same keys (without the prefix) in the event.
+    Scheduled EventBridge events carry their own `source` and are not read."""
+    options = {
+        key.removeprefix("COMPACTION_").lower().replace("_", "-"): value
+        for key, value in os.environ.items()
+        if key.startswith("COMPACTION_")
+    }
+    if (event or {}).get("source") != "aws.events":
+        options.update({key.replace("_", "-"): str(value) for key, value in (event or {}).items()})
+    argv = [item for key, value in options.items() for item in (f"--{key}", value)]
+    result = run(parse_args(argv))
+    return {**result.model_dump(), "mb_per_second": result.mb_per_second, "files_per_second": result.files_per_second}
+
+
+def main() -> None:
+    result = run(parse_args(sys.argv[1:]))
+    sys.stdout.write(json.dumps({**result.model_dump(), "mb_per_second": result.mb_per_second}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""Moves aged objects from an S3 Express One Zone directory bucket to the regular bucket of their layer.
+
+The directory bucket is the low-latency tier of near-real-time pipelines, which write objects and read them back
+within seconds. Directory buckets have no lifecycle transitions, so objects older than `max_age_seconds` are copied
+server-side to the layer bucket under the same key (or under `target_prefix`), checked by size, and only then
+deleted from the directory bucket. A failed copy leaves the object in place for the next run.
+
+Writers may overwrite a key at any time: the copy and the delete are both conditional on the ETag of the listed
+version, so a newer version is never deleted without being drained; it is left in place for a later run.
+
+Usage:
+```
+python -m commons.service.express_drain --source dlh-landing--use1-az4--x-s3 --target dlh-landing \
+    --prefix landing/ --max-age-seconds 3600
+```
+
+Requires `boto3`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from pydantic import BaseModel
+
+from commons.helper.aws import default_client_cache
+from commons.service.object_store import ObjectInfo, S3ObjectStore
+from commons.utils import ProcessLogger
+
+DEFAULT_MAX_AGE_SECONDS: int = 3600
+DEFAULT_MAX_WORKERS: int = 16
+
+
+class DrainResult(BaseModel):
+    """Outcome of a drain run.
+
+    Attributes:
+        keys (list[str]): The keys moved to the target bucket.
+        changed (list[str]): The keys overwritten during the run, left in place for a later run.
+        errors (dict[str, str]): The error message per key that could not be moved.
+        bytes (int): The total size of the moved objects.
+        seconds (float): Wall time of the run.
+    """
+
+    keys: list[str] = []
+    changed: list[str] = []
+    errors: dict[str, str] = {}
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+class ExpressDrain:
+    """Moves the objects of a directory bucket prefix that are older than a maximum age.
+
+    :param source_bucket: The directory bucket.
+    :param target_bucket: The regular layer bucket.
+    :param prefix: The prefix of the drained objects; empty or ending with a slash, as directory buckets require.
+    :param target_prefix: Replaces `prefix` in the target keys. Defaults to `prefix`.
+    :param max_age_seconds: The age after which objects are moved.
+    :param client: An S3 client. Defaults to the client of `default_client_cache()`; boto3 creates and refreshes the
+        directory bucket sessions itself.
+    :param max_workers: The threads copying objects.
+    """
+
+    def __init__(
+        self,
+        source_bucket: str,
+        target_bucket: str,
+        prefix: str = "",
+        target_prefix: str | None = None,
+        max_age_seconds: int = DEFAULT_MAX_AGE_SECONDS,
+        client: Any = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        if prefix and not prefix.endswith("/"):
+            raise ValueError(f"Directory bucket prefixes must end with a slash: {prefix!r}")
+        if client is None:
+            client = default_client_cache().client("s3", max_pool_connections=max_workers)
+
+        self.source = S3ObjectStore(source_bucket, client=client)
+        self.target_bucket = target_bucket
+        self.prefix = prefix
+        self.target_prefix = prefix if target_prefix is None else target_prefix
+        self.max_age_seconds = max_age_seconds
+        self.client = client
+        self.max_workers = max_workers
+        self.logger = ProcessLogger(process_name="", log_level=logging.INFO)
+
+    def aged(self, now: float | None = None) -> list[ObjectInfo]:
+        """Returns the objects of the prefix older than the maximum age.
+
+        :param now: The current POSIX time. Defaults to the clock.
+        :return: The objects.
+        """
+        cutoff = (time.time() if now is None else now) - self.max_age_seconds
+        return [info for info in self.source.list(self.prefix) if info.last_modified <= cutoff]
+
+    def target_key(self, key: str) -> str:
+        """Returns the key of an object in the target bucket."""
+        return self.target_prefix + key[len(self.prefix) :]
+
+    def move(self, info: ObjectInfo) -> None:
+        """Copies the listed version of an object to the target bucket and checks its size.
+
+        :raises ValueError: If the copy does not have the size of the source.
+        :raises botocore.exceptions.ClientError: `PreconditionFailed` if the object was overwritten since listed.
+        """
+        target_key = self.target_key(info.key)
+        extra_args = {"CopySourceIfMatch": info.etag} if info.etag else None
+        # managed copy: server-side, in parts for objects over the multipart threshold
+        self.client.copy(
+            {"Bucket": self.source.bucket, "Key": info.key}, self.target_bucket, target_key, ExtraArgs=extra_args
+        )
+        size = self.client.head_object(Bucket=self.target_bucket, Key=target_key)["ContentLength"]
+        if size != info.size:
+            raise ValueError(f"s3://{self.target_bucket}/{target_key}: expected {info.size} bytes, got {size}")
+
+    def delete(self, info: ObjectInfo) -> bool:
+        """Deletes a moved object from the directory bucket if it is still the listed version.
+
+        :return: False if the object was overwritten since listed, and is kept.
+        """
+        from botocore.exceptions import ClientError
+
+        if not info.etag:
+            self.source.delete([info.key])
+            return True
+        try:
+            self.client.delete_object(Bucket=self.source.bucket, Key=info.key, IfMatch=info.etag)
+        except ClientError as error:
+            if not _precondition_failed(error):
+                raise
+            return False
+        return True
+
+    def run(self, now: float | None = None) -> DrainResult:
+        """Moves the aged objects, deleting each one from the directory bucket once copied.
+
+        :param now: The current POSIX time. Defaults to the clock.
+        :return: The moved keys, errors, bytes and duration of the run.
+        """
+        result = DrainResult()
+        lock = threading.Lock()
+        started = time.perf_counter()
+
+        def move(info: ObjectInfo) -> None:
+            try:
+                self.move(info)
+                deleted = self.delete(info)
+            except Exception as error:  # noqa: BLE001 - reported per object
+                with lock:
+                    if _precondition_failed(error):
+                        result.changed.append(info.key)
+                    else:
+                        result.errors[info.key] = f"{type(error).__name__}: {error}"
+                return
+            with lock:
+                if not deleted:
+                    result.changed.append(info.key)
+                    return
+                result.keys.append(info.key)
+                result.bytes += info.size
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            list(executor.map(move, self.aged(now)))
+
+        result.seconds = time.perf_counter() - started
+        self.logger.info(
+            "moved %d objects (%d bytes), %d changed, %d errors",
+            len(result.keys),
+            result.bytes,
+            len(result.changed),
+            len(result.errors),
+        )
+        return result
+
+
+def _precondition_failed(error: Exception) -> bool:
+    """Whether a conditional request failed because the object changed (`412` on HEAD, `PreconditionFailed`)."""
+    code = getattr(error, "response", {}).get("Error", {}).get("Code", "")
+    return code in ("PreconditionFailed", "412")
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--source", required=True, help="the directory bucket name")
+    parser.add_argument("--target", required=True, help="the layer bucket name")
+    parser.add_argument("--prefix", default="")
+    parser.add_argument("--target-prefix", default=None)
+    parser.add_argument("--max-age-seconds", type=int, default=DEFAULT_MAX_AGE_SECONDS)
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS)
+    return parser.parse_known_args(argv)[0]
+
+
+def run(args: argparse.Namespace) -> DrainResult:
+    drain = ExpressDrain(
+        source_bucket=args.source,
+        target_bucket=args.target,
+        prefix=args.prefix,
+        target_prefix=args.target_prefix,
+        max_age_seconds=args.max_age_seconds,
+        max_workers=args.max_workers,
+    )
+    return drain.run()
+
+
+def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
+    """Lambda entry point: the arguments are read from `EXPRESS_DRAIN_*` environment variables, e.g.
+    `EXPRESS_DRAIN_SOURCE=dlh-landing--use1-az4--x-s3`, overridden by the same keys (without the prefix) in the
+    event. Scheduled EventBridge events carry their own `source` and are not read."""
+    options = {
+        key.removeprefix("EXPRESS_DRAIN_").lower().replace("_", "-"): value
+        for key, value in os.environ.items()
+        if key.startswith("EXPRESS_DRAIN_")
+    }
+    if (event or {}).get("source") != "aws.events":
+        options.update({key.replace("_", "-"): str(value) for key, value in (event or {}).items()})
+    argv = [item for key, value in options.items() for item in (f"--{key}", value)]
+    result = run(parse_args(argv))
+    return {
+        "moved": len(result.keys),
+        "changed": result.changed,
+        "errors": result.errors,
+        "bytes": result.bytes,
+        "seconds": result.seconds,
+    }
+
+
+def main() -> None:
+    result = run(parse_args(sys.argv[1:]))
+    summary = {"moved": len(result.keys), "changed": result.changed, "errors": result.errors, "bytes": result.bytes}
+    sys.stdout.write(json.dumps(summary) + "\n")
+
+
+if __name__ == "__main__":
+    main()
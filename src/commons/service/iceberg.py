@@ -0,0 +1,209 @@
+"""Maintenance of the Iceberg tables of the curated and analytics layers through Athena.
+
+For each table, in order: `CREATE TABLE IF NOT EXISTS` (so new definitions are created on the next run), `ALTER
+TABLE ... SET TBLPROPERTIES` (so changed properties reach existing tables), `OPTIMIZE ... REWRITE DATA USING
+BIN_PACK` (rewrites small files and files with many deletes to the target file size) and `VACUUM` (expires old
+snapshots and deletes the files no snapshot references). A failing statement skips the remaining statements of its
+table, not the other tables. Column and partitioning changes are not applied to existing tables (see
+`IcebergTable`).
+
+The statements are produced by `IcebergMaintenance.steps`, which the Step Functions definition of
+`commons.constructs.aws.iceberg` also uses, and run by a `QueryRunner`: `AthenaQueryRunner` in AWS, any stand-in
+recording the statements in tests.
+
+Usage:
+```
+maintenance = IcebergMaintenance(AthenaQueryRunner("dlh-dev-stage"), "lake", tables, bucket_names, config.storage)
+result = maintenance.run()
+```
+
+`AthenaQueryRunner` requires `boto3`.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+from commons.helper.aws import default_client_cache
+from commons.model import IcebergTable, Storage
+from commons.utils import ProcessLogger
+
+DEFAULT_POLL_SECONDS: float = 1.0
+DEFAULT_QUERY_TIMEOUT_SECONDS: float = 3600.0
+MAINTENANCE_ACTIONS: tuple[str, ...] = ("create", "alter", "optimize", "vacuum")
+
+
+class QueryFailedError(ValueError):
+    """An Athena query ended in the FAILED or CANCELLED state, or did not finish in time."""
+
+
+class QueryRunner(ABC):
+    """Runs SQL statements and waits for them to finish."""
+
+    @abstractmethod
+    def run(self, statement: str, database: str) -> str:
+        """Runs a statement in a database and returns its query execution id.
+
+        :raises QueryFailedError: If the statement fails.
+        """
+
+
+class AthenaQueryRunner(QueryRunner):
+    """Runs statements in an Athena workgroup, which sets the result location and the engine version.
+
+    :param workgroup: The workgroup name.
+    :param client: An Athena client. Defaults to the client of `default_client_cache()`.
+    :param poll_seconds: The interval between two status checks.
+    :param timeout_seconds: The time after which a query is cancelled.
+    """
+
+    def __init__(
+        self,
+        workgroup: str,
+        client: Any = None,
+        poll_seconds: float = DEFAULT_POLL_SECONDS,
+        timeout_seconds: float = DEFAULT_QUERY_TIMEOUT_SECONDS,
+    ) -> None:
+        self.workgroup = workgroup
+        self.client = client or default_client_cache().client("athena")
+        self.poll_seconds = poll_seconds
+        self.timeout_seconds = timeout_seconds
+
+    def run(self, statement: str, database: str) -> str:
+        query_id = self.client.start_query_execution(
+            QueryString=statement,
+            QueryExecutionContext={"Database": database},
+            WorkGroup=self.workgroup,
+        )["QueryExecutionId"]
+
+        deadline = time.monotonic() + self.timeout_seconds
+        while True:
+            status = self.client.get_query_execution(QueryExecutionId=query_id)["QueryExecution"]["Status"]
+            if status["State"] == "SUCCEEDED":
+                return query_id
+            if status["State"] in ("FAILED", "CANCELLED"):
+                raise QueryFailedError(f"{query_id} {status['State']}: {status.get('StateChangeReason', '')}")
+            if time.monotonic() > deadline:
+                self.client.stop_query_execution(QueryExecutionId=query_id)
+                raise QueryFailedError(f"{query_id} did not finish within {self.timeout_seconds} seconds")
+            time.sleep(self.poll_seconds)
+
+
+@dataclass(frozen=True)
+class MaintenanceStep:
+    """A statement of the maintenance of a table.
+
+    Attributes:
+        table (str): The table name.
+        action (str): `create`, `alter`, `optimize` or `vacuum`.
+        statement (str): The SQL statement.
+    """
+
+    table: str
+    action: Literal["create", "alter", "optimize", "vacuum"]
+    statement: str
+
+
+class MaintenanceResult(BaseModel):
+    """Outcome of a maintenance run.
+
+    Attributes:
+        query_ids (dict[str, str]): The query execution id per `<table>:<action>` that succeeded.
+        errors (dict[str, str]): The error message per `<table>:<action>` that failed.
+        skipped (list[str]): The `<table>:<action>` not run because an earlier statement of the table failed.
+        seconds (float): Wall time of the run.
+    """
+
+    query_ids: dict[str, str] = {}
+    errors: dict[str, str] = {}
+    skipped: list[str] = []
+    seconds: float = 0.0
+
+
+class IcebergMaintenance:
+    """Creates, compacts and vacuums Iceberg tables.
+
+    :param runner: Runs the statements.
+    :param database: The Glue database of the tables.
+    :param tables: The tables.
+    :param bucket_names: The bucket name per `Storage` layer attribute, e.g. `{"second_layer": "..."}`.
+    :param storage: The storage layers.
+    :param actions: The actions to run, in order. Defaults to `MAINTENANCE_ACTIONS`.
+    """
+
+    def __init__(
+        self,
+        runner: QueryRunner | None,
+        database: str,
+        tables: Iterable[IcebergTable],
+        bucket_names: dict[str, str],
+        storage: Storage,
+        actions: Iterable[str] = MAINTENANCE_ACTIONS,
+    ) -> None:
+        self.runner = runner
+        self.database = database
+        self.tables = list(tables)
+        self.bucket_names = bucket_names
+        self.storage = storage
+        self.actions = tuple(actions)
+        self.logger = ProcessLogger(process_name="", log_level=logging.INFO)
+
+        unknown = set(self.actions) - set(MAINTENANCE_ACTIONS)
+        if unknown:
+            raise ValueError(f"Unknown maintenance actions: {sorted(unknown)}")
+        names = [table.name for table in self.tables]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate Iceberg tables: {names}")
+        missing = {table.layer for table in self.tables} - set(bucket_names)
+        if "create" in self.actions and missing:
+            raise ValueError(f"No bucket name for layers: {sorted(missing)}")
+
+    def steps(self) -> list[MaintenanceStep]:
+        """Returns the statements of a run, table by table."""
+        steps = []
+        for table in self.tables:
+            for action in self.actions:
+                if action == "create":
+                    bucket_name = self.bucket_names[table.layer]
+                    statement = table.create_statement(self.database, bucket_name, self.storage)
+                elif action == "alter":
+                    statement = table.alter_statement(self.database)
+                elif action == "optimize":
+                    statement = table.optimize_statement(self.database)
+                else:
+                    statement = table.vacuum_statement(self.database)
+                steps.append(MaintenanceStep(table.name, action, statement))
+        return steps
+
+    def run(self) -> MaintenanceResult:
+        """Runs the statements of every table, skipping the rest of a table after a failure.
+
+        :return: The query ids, errors and skipped steps of the run.
+        """
+        if self.runner is None:
+            raise ValueError("A query runner is required to run the maintenance")
+
+        result = MaintenanceResult()
+        started = time.perf_counter()
+        failed: set[str] = set()
+        for step in self.steps():
+            name = f"{step.table}:{step.action}"
+            if step.table in failed:
+                result.skipped.append(name)
+                continue
+            try:
+                result.query_ids[name] = self.runner.run(step.statement, self.database)
+            except Exception as error:  # noqa: BLE001 - reported per table
+                failed.add(step.table)
+                result.errors[name] = f"{type(error).__name__}: {error}"
+                self.logger.warning("%s failed: %s", name, error)
+
+        result.seconds = time.perf_counter() - started
+        return result
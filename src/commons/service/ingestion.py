@@ -0,0 +1,308 @@
+"""Uploads files and streams to the landing zone with concurrent multipart transfers and checksum verification.
+
+Objects are keyed by a `KeyLayout` shared with the compaction service, by default
+`<Storage.landing_zone>/<dataset>/[<key>=<value>/...]<file name>`.
+
+Large files and streams go through the boto3 transfer manager: parts of `part_size` bytes are uploaded by
+`max_concurrency` threads, and at most `max_buffered_parts` parts of a stream are held in memory. Every object is
+uploaded with a SHA-256 checksum: single-part uploads send the local digest, which S3 verifies before storing the
+object, and multipart uploads are compared after the upload with the composite checksum S3 computed from the parts.
+Small files are uploaded in parallel by a thread pool, one `PutObject` each.
+
+Usage:
+```
+client = IngestionClient("company-project-dev-landing", config.storage)
+client.upload_file("orders.json", dataset="orders", partitions={"dt": "2024-01-01"})
+result = client.upload_many(paths, dataset="clicks")
+print(result.mb_per_second, result.files_per_second)
+```
+
+Requires `boto3`.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Any
+
+from pydantic import BaseModel
+
+from commons.helper.aws import default_client_cache
+from commons.model import KeyLayout, Storage
+
+DEFAULT_PART_SIZE: int = 16 * 1024**2
+DEFAULT_MULTIPART_THRESHOLD: int = 16 * 1024**2
+DEFAULT_MAX_CONCURRENCY: int = 10
+DEFAULT_MAX_BUFFERED_PARTS: int = 10
+DEFAULT_MAX_WORKERS: int = 32
+CHECKSUM_ALGORITHM: str = "SHA256"
+_READ_SIZE: int = 1024**2
+
+
+class ChecksumMismatchError(ValueError):
+    """The checksum of an uploaded object differs from the checksum of the local data."""
+
+
+class IngestionResult(BaseModel):
+    """Outcome of a batch of uploads.
+
+    Attributes:
+        keys (list[str]): The keys of the uploaded objects.
+        errors (dict[str, str]): The error message per local path that could not be uploaded.
+        bytes (int): The total size of the uploaded objects.
+        seconds (float): Wall time of the batch.
+    """
+
+    keys: list[str] = []
+    errors: dict[str, str] = {}
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        """Megabytes uploaded per second."""
+        return self.bytes / 1024**2 / self.seconds if self.seconds else 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        """Objects uploaded per second."""
+        return len(self.keys) / self.seconds if self.seconds else 0.0
+
+
+class _PartHasher:
+    """Reads a stream while computing the SHA-256 digest of each `part_size` slice, as S3 does for the parts."""
+
+    def __init__(self, part_size: int, stream: IO[bytes] | None = None) -> None:
+        self.stream = stream
+        self.part_size = part_size
+        self.parts: list[bytes] = []
+        self.size = 0
+        self._whole = hashlib.sha256()
+        self._digest = hashlib.sha256()
+        self._part_bytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.update(data)
+        return data
+
+    def update(self, data: bytes) -> None:
+        self._whole.update(data)
+        view = memoryview(data)
+        while view:
+            taken = view[: self.part_size - self._part_bytes]
+            self._digest.update(taken)
+            self._part_bytes += len(taken)
+            self.size += len(taken)
+            view = view[len(taken) :]
+            if self._part_bytes == self.part_size:
+                self._close_part()
+
+    def _close_part(self) -> None:
+        self.parts.append(self._digest.digest())
+        self._digest = hashlib.sha256()
+        self._part_bytes = 0
+
+    def checksum(self, multipart: bool) -> str:
+        """Returns the base64 checksum S3 reports for the object: the digest of the whole data for a single-part
+        upload, the digest of the concatenated part digests for a multipart upload."""
+        if not multipart:
+            return base64.b64encode(self._whole.digest()).decode()
+        parts = self.parts + ([self._digest.digest()] if self._part_bytes else [])
+        return base64.b64encode(hashlib.sha256(b"".join(parts)).digest()).decode()
+
+
+def sha256_base64(data: bytes) -> str:
+    """Returns the base64 SHA-256 digest of `data`, as sent in `ChecksumSHA256`."""
+    return base64.b64encode(hashlib.sha256(data).digest()).decode()
+
+
+class IngestionClient:
+    """Uploads data to the landing zone prefix of a bucket.
+
+    :param bucket: The landing zone bucket name.
+    :param storage: The storage layers; `landing_zone` is the prefix of every key.
+    :param client: An S3 client. Defaults to the client of `default_client_cache()`, with a connection pool sized for
+        the concurrency.
+    :param part_size: The size of the parts of multipart uploads (S3 requires at least 5 MB).
+    :param multipart_threshold: Files and streams of at least this size are uploaded in parts.
+    :param max_concurrency: The threads uploading the parts of one transfer.
+    :param max_buffered_parts: The parts of a stream held in memory at once.
+    :param max_workers: The threads of `upload_many`.
+    :param layout: The key layout. Defaults to `storage.key_layout("landing_zone")`; use hash shards to spread
+        high-volume sources over several prefixes.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        storage: Storage,
+        client: Any = None,
+        part_size: int = DEFAULT_PART_SIZE,
+        multipart_threshold: int = DEFAULT_MULTIPART_THRESHOLD,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_buffered_parts: int = DEFAULT_MAX_BUFFERED_PARTS,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        layout: KeyLayout | None = None,
+    ) -> None:
+        from boto3.s3.transfer import TransferConfig
+        from s3transfer.utils import ChunksizeAdjuster
+
+        layout = layout or storage.key_layout("landing_zone")
+        if client is None:
+            client = default_client_cache().client("s3", max_pool_connections=max(max_concurrency, max_workers))
+
+        self.bucket = bucket
+        self.layout = layout
+        self.client = client
+        self.max_workers = max_workers
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=part_size,
+            max_concurrency=max_concurrency,
+        )
+        # not an argument of boto3's TransferConfig, but read by the underlying s3transfer manager
+        self.transfer_config.max_in_memory_upload_chunks = max_buffered_parts
+        self._chunksize_adjuster = ChunksizeAdjuster()
+
+    def landing_key(self, dataset: str, file_name: str, partitions: dict[str, str] | None = None) -> str:
+        """Returns the key of a file of a dataset, e.g. `<landing zone>/<dataset>/[<key>=<value>/...]<file name>`.
+
+        :param dataset: The dataset, e.g. `orders`.
+        :param file_name: The object name.
+        :param partitions: The partition values, outermost first, e.g. `{"dt": "2024-01-01"}`.
+        :return: The object key.
+        """
+        return self.layout.build(dataset, file_name, partitions)
+
+    def _verify(self, key: str, expected: str) -> None:
+        head = self.client.head_object(Bucket=self.bucket, Key=key, ChecksumMode="ENABLED")
+        # multipart checksums are reported as `<digest>-<part count>`
+        actual = head.get("ChecksumSHA256", "").split("-", 1)[0]
+        if actual != expected:
+            raise ChecksumMismatchError(f"s3://{self.bucket}/{key}: expected {expected}, got {actual or 'none'}")
+
+    def _part_size(self, size: int | None) -> int:
+        # the transfer manager enlarges parts to stay within 10,000 parts; hash with the same boundaries
+        return self._chunksize_adjuster.adjust_chunksize(self.transfer_config.multipart_chunksize, size)
+
+    def put(self, key: str, body: bytes) -> str:
+        """Uploads bytes in one request; S3 rejects the object if its SHA-256 differs from the local digest.
+
+        :param key: The full object key.
+        :param body: The content.
+        :return: The key.
+        """
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=body,
+            ChecksumAlgorithm=CHECKSUM_ALGORITHM,
+            ChecksumSHA256=sha256_base64(body),
+        )
+        return key
+
+    def upload_file(
+        self,
+        path: str | Path,
+        dataset: str,
+        partitions: dict[str, str] | None = None,
+        file_name: str | None = None,
+    ) -> str:
+        """Uploads a local file, in parts if it reaches the multipart threshold, and verifies its checksum.
+
+        :param path: The local file.
+        :param dataset: The dataset of the file.
+        :param partitions: The partition values of the file.
+        :param file_name: The object name. Defaults to the file name.
+        :return: The object key.
+        """
+        path = Path(path)
+        key = self.landing_key(dataset, file_name or path.name, partitions)
+        size = path.stat().st_size
+        if size < self.transfer_config.multipart_threshold:
+            return self.put(key, path.read_bytes())
+
+        hasher = _PartHasher(self._part_size(size))
+        with path.open("rb") as file:
+            while chunk := file.read(_READ_SIZE):
+                hasher.update(chunk)
+        self.client.upload_file(
+            str(path),
+            self.bucket,
+            key,
+            ExtraArgs={"ChecksumAlgorithm": CHECKSUM_ALGORITHM},
+            Config=self.transfer_config,
+        )
+        self._verify(key, hasher.checksum(multipart=True))
+        return key
+
+    def upload_stream(
+        self,
+        stream: IO[bytes],
+        dataset: str,
+        file_name: str,
+        partitions: dict[str, str] | None = None,
+    ) -> str:
+        """Uploads a stream of unknown size in parts, holding at most `max_buffered_parts` parts in memory, and
+        verifies its checksum. Streams shorter than the multipart threshold are uploaded in one request.
+
+        :param stream: A readable binary stream; it is read once, sequentially.
+        :param dataset: The dataset of the data.
+        :param file_name: The object name.
+        :param partitions: The partition values of the data.
+        :return: The object key.
+        """
+        key = self.landing_key(dataset, file_name, partitions)
+        hasher = _PartHasher(self._part_size(None), stream)
+        self.client.upload_fileobj(
+            hasher,
+            self.bucket,
+            key,
+            ExtraArgs={"ChecksumAlgorithm": CHECKSUM_ALGORITHM},
+            Config=self.transfer_config,
+        )
+        self._verify(key, hasher.checksum(multipart=hasher.size >= self.transfer_config.multipart_threshold))
+        return key
+
+    def upload_many(
+        self,
+        paths: Iterable[str | Path],
+        dataset: str,
+        partitions: dict[str, str] | None = None,
+    ) -> IngestionResult:
+        """Uploads many files of a dataset partition through a thread pool. Failures are collected, not raised.
+
+        :param paths: The local files.
+        :param dataset: The dataset of the files.
+        :param partitions: The partition values of the files.
+        :return: The keys, errors, bytes and duration of the batch.
+        """
+        result = IngestionResult()
+        lock = threading.Lock()
+        started = time.perf_counter()
+
+        def upload(path: str | Path) -> None:
+            try:
+                key = self.upload_file(path, dataset, partitions)
+                size = Path(path).stat().st_size
+            except Exception as error:  # noqa: BLE001 - reported per file
+                with lock:
+                    result.errors[str(path)] = f"{type(error).__name__}: {error}"
+                return
+            with lock:
+                result.keys.append(key)
+                result.bytes += size
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # consume the iterator so worker exceptions surface here instead of being lost
+            list(executor.map(upload, paths))
+
+        result.seconds = time.perf_counter() - started
+        return result
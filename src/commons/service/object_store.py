@@ -0,0 +1,215 @@
+"""Object storage used by the data lake services, with a local-filesystem backend and an S3 backend.
+
+The services only list, read, write and delete whole objects under `/`-separated keys, so a directory tree behaves
+like a bucket: `LocalObjectStore` is used in tests and benchmarks, `S3ObjectStore` in the deployed jobs.
+"""
+
+from __future__ import annotations
+
+import abc
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any
+
+# objects deleted per DeleteObjects request (the S3 maximum)
+S3_DELETE_BATCH_SIZE: int = 1000
+# DeleteObjects reports per-key errors in its response, outside the client's retries
+S3_DELETE_ATTEMPTS: int = 3
+S3_DELETE_RETRY_DELAY_SECONDS: float = 0.2
+S3_RETRYABLE_DELETE_CODES: frozenset[str] = frozenset({"SlowDown", "InternalError", "ServiceUnavailable"})
+
+
+class DeleteError(OSError):
+    """Some objects could not be deleted.
+
+    :param errors: The error message per object key.
+    """
+
+    def __init__(self, errors: dict[str, str]) -> None:
+        self.errors = errors
+        first = next(iter(errors.items()))
+        super().__init__(f"{len(errors)} objects could not be deleted, e.g. {first[0]}: {first[1]}")
+
+
+@dataclass(frozen=True, slots=True)
+class ObjectInfo:
+    """An object of a store.
+
+    Attributes:
+        key (str): The object key, `/`-separated.
+        size (int): The size in bytes.
+        last_modified (float): The modification time, as a POSIX timestamp.
+        etag (str | None): The entity tag of this version of the object, when the store has one (S3).
+    """
+
+    key: str
+    size: int
+    last_modified: float
+    etag: str | None = field(default=None, compare=False)
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifies this version of the object: a rewritten key gets a new fingerprint."""
+        return f"{self.key}:{self.size}:{int(self.last_modified)}"
+
+
+class ObjectStore(abc.ABC):
+    """A flat namespace of objects addressed by key."""
+
+    @abc.abstractmethod
+    def list(self, prefix: str = "") -> Iterator[ObjectInfo]:
+        """Yields the objects whose key starts with `prefix`, in key order."""
+
+    @abc.abstractmethod
+    def open(self, key: str) -> IO[bytes]:
+        """Opens an object for reading. The caller closes the stream."""
+
+    @abc.abstractmethod
+    def put_file(self, key: str, path: str | Path) -> None:
+        """Uploads a local file as an object, replacing any object with the same key."""
+
+    @abc.abstractmethod
+    def delete(self, keys: Iterable[str]) -> None:
+        """Deletes objects. Missing keys are ignored.
+
+        :raises DeleteError: If some objects could not be deleted.
+        """
+
+    def read(self, key: str) -> bytes:
+        """Returns the content of an object."""
+        with self.open(key) as stream:
+            return stream.read()
+
+    def put(self, key: str, body: bytes) -> None:
+        """Writes an object from bytes."""
+        with tempfile.NamedTemporaryFile(delete=False) as file:
+            file.write(body)
+        try:
+            self.put_file(key, file.name)
+        finally:
+            os.unlink(file.name)
+
+
+class LocalObjectStore(ObjectStore):
+    """Objects stored as files under a root directory; keys are paths relative to the root."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if not path.is_relative_to(self.root.resolve()):
+            raise ValueError(f"Key escapes the store root: {key}")
+        return path
+
+    def list(self, prefix: str = "") -> Iterator[ObjectInfo]:
+        # walk only the directory holding the prefix, like S3 only lists the matching keys
+        directory = self._path(prefix.rsplit("/", 1)[0]) if "/" in prefix else self.root.resolve()
+        if not directory.is_dir():
+            return
+        root = self.root.resolve()
+        paths = (path for path in directory.rglob("*") if path.is_file() and not path.name.startswith(".tmp-"))
+        for path in sorted(paths):
+            key = path.relative_to(root).as_posix()
+            if key.startswith(prefix):
+                stat = path.stat()
+                yield ObjectInfo(key=key, size=stat.st_size, last_modified=stat.st_mtime)
+
+    def open(self, key: str) -> IO[bytes]:
+        return self._path(key).open("rb")
+
+    def put_file(self, key: str, path: str | Path) -> None:
+        target = self._path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # copy then rename, so readers never see a partial object
+        staging = target.with_name(f".tmp-{target.name}")
+        shutil.copyfile(path, staging)
+        os.replace(staging, target)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+
+class S3ObjectStore(ObjectStore):
+    """Objects of an S3 bucket. Requires `boto3`.
+
+    :param bucket: The bucket name.
+    :param client: An S3 client. Defaults to the client of `default_client_cache()`.
+    """
+
+    def __init__(self, bucket: str, client: Any = None) -> None:
+        if client is None:
+            from commons.helper.aws import default_client_cache
+
+            client = default_client_cache().client("s3")
+        self.bucket = bucket
+        self.client = client
+
+    def list(self, prefix: str = "") -> Iterator[ObjectInfo]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                yield ObjectInfo(
+                    key=item["Key"],
+                    size=item["Size"],
+                    last_modified=item["LastModified"].timestamp(),
+                    etag=item.get("ETag"),
+                )
+
+    def open(self, key: str) -> IO[bytes]:
+        return self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+
+    def put_file(self, key: str, path: str | Path) -> None:
+        self.client.upload_file(str(path), self.bucket, key)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        errors: dict[str, str] = {}
+        for start in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+            errors.update(self._delete_batch(keys[start : start + S3_DELETE_BATCH_SIZE]))
+        if errors:
+            raise DeleteError(errors)
+
+    def _delete_batch(self, keys: list[str]) -> dict[str, str]:
+        """Deletes up to `S3_DELETE_BATCH_SIZE` objects, retrying the keys that failed with a transient error.
+
+        :return: The error message per key that could not be deleted.
+        """
+        errors: dict[str, str] = {}
+        pending = keys
+        for attempt in range(S3_DELETE_ATTEMPTS):
+            if attempt:
+                time.sleep(S3_DELETE_RETRY_DELAY_SECONDS * 2 ** (attempt - 1))
+            # quiet mode: the response only lists the keys that failed
+            response = self.client.delete_objects(
+                Bucket=self.bucket, Delete={"Objects": [{"Key": key} for key in pending], "Quiet": True}
+            )
+            pending = []
+            for error in response.get("Errors", []):
+                if error.get("Code") in S3_RETRYABLE_DELETE_CODES and attempt < S3_DELETE_ATTEMPTS - 1:
+                    pending.append(error["Key"])
+                else:
+                    errors[error["Key"]] = f"{error.get('Code')}: {error.get('Message')}"
+            if not pending:
+                break
+        return errors
+
+
+def open_store(location: str | Path, client: Any = None) -> ObjectStore:
+    """Opens `s3://<bucket>` as an `S3ObjectStore` and any other location as a `LocalObjectStore` directory.
+
+    :param location: The bucket URL or the local root directory.
+    :param client: The S3 client of an `S3ObjectStore`.
+    :return: The store.
+    """
+    location = str(location)
+    if location.startswith("s3://"):
+        return S3ObjectStore(location.removeprefix("s3://").strip("/"), client=client)
+    return LocalObjectStore(location)
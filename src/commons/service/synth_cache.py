@@ -0,0 +1,250 @@
+"""Local cache of synthesized cloud assemblies, keyed by the hash of everything that shapes them.
+
+An environment's templates are a function of its configuration (and the environment variables it resolves), the
+builder code that turns it into constructs (including the kwargs passed to helpers such as `S3.create_bucket`),
+the commons library code and the installed CDK version. When none of these changed, the previous assembly is
+reused and the environment is not synthesized again.
+
+The builder code is the builder module and every module it imports, directly or not, from its own source tree
+(e.g. `app/stacks/*.py` next to `app/build.py`), found by parsing the imports without running them. Code loaded
+otherwise (plugins, data files read at synth time) must be listed as extra sources.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import shutil
+import threading
+from collections.abc import Iterable
+from importlib import metadata
+from pathlib import Path
+
+from commons.utils.constants import DEFAULT_ENCODING
+
+# files hashed when a source directory is part of the key
+SOURCE_SUFFIXES: tuple[str, ...] = (".py", ".toml", ".json")
+DEFAULT_MAX_BYTES: int = 512 * 1024 * 1024
+
+
+def _package_version(name: str) -> str:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def hash_sources(paths: Iterable[str | Path]) -> str:
+    """Hashes the content of source files; directories are walked for files ending in `SOURCE_SUFFIXES`.
+
+    :param paths: Files or directories.
+    :return: The hex SHA-256 digest of the relative paths and contents, in a stable order.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(Path(path).resolve() for path in paths):
+        if path.is_file():
+            files = [path]
+        else:
+            files = sorted(file for file in path.rglob("*") if file.suffix in SOURCE_SUFFIXES)
+        for file in files:
+            digest.update(str(file.relative_to(path.parent)).encode(DEFAULT_ENCODING))
+            digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+def _module_path(root: Path, name: str) -> Path | None:
+    base = root.joinpath(*name.split("."))
+    for candidate in (base.with_suffix(".py"), base / "__init__.py"):
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def _imported_names(tree: ast.AST, package: list[str]) -> Iterable[str]:
+    """Yields the absolute names of the modules an AST may import, with their parent packages."""
+    for node in ast.walk(tree):
+        names: list[str] = []
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            base = package[: len(package) - node.level + 1] if node.level else []
+            module = ".".join([*base, *(node.module.split(".") if node.module else [])])
+            # `from package import name` may import the submodule `package.name`
+            names = [module, *(f"{module}.{alias.name}" if module else alias.name for alias in node.names)]
+        for name in filter(None, names):
+            parts = name.split(".")
+            yield from (".".join(parts[:index]) for index in range(1, len(parts) + 1))
+
+
+def local_modules(module: str) -> list[Path]:
+    """Returns the source files of a module and of the modules it imports transitively from its own source tree.
+
+    The tree is the `sys.path` entry holding the module; installed packages and the standard library are outside it.
+    Imports are found by parsing the sources, so no module is executed.
+
+    :param module: The module name, e.g. `app.build`.
+    :return: The source files, the module's first.
+    """
+    spec = importlib.util.find_spec(module)
+    if spec is None or not spec.origin or not Path(spec.origin).is_file():
+        return []
+    origin = Path(spec.origin).resolve()
+    root = origin.parents[module.count(".") + (origin.name == "__init__.py")]
+
+    found = {module: origin}
+    queue = [module]
+    while queue:
+        name = queue.pop()
+        path = found[name]
+        package = name.split(".") if path.name == "__init__.py" else name.split(".")[:-1]
+        try:
+            tree = ast.parse(path.read_bytes(), filename=str(path))
+        except SyntaxError:
+            continue
+        for imported in _imported_names(tree, package):
+            if imported not in found and (imported_path := _module_path(root, imported)) is not None:
+                found[imported] = imported_path
+                queue.append(imported)
+    return list(found.values())
+
+
+def builder_sources(builder: str) -> list[Path]:
+    """Returns the commons package directory and the local source files of the builder (see `local_modules`).
+
+    :param builder: The `module:function` reference of the stack builder.
+    :return: The paths whose content shapes the synthesized templates.
+    """
+    import commons
+
+    return [Path(commons.__file__).parent, *local_modules(builder.partition(":")[0])]
+
+
+class SynthCache:
+    """Directory of cached cloud assemblies with size-based, least-recently-used eviction.
+
+    Usage:
+    ```python
+    cache = SynthCache(".synth-cache", max_bytes=256 * 1024 * 1024)
+    synthesize_environments(targets, "app:build", cache=cache)
+    cache.stats()
+    ```
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """Initializes the cache.
+
+        :param directory: The cache directory. It is created if missing.
+        :param max_bytes: The total size above which the least recently used entries are evicted.
+        """
+        self.directory: Path = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        configs: dict, environment: dict[str, str], builder: str, sources: Iterable[str | Path] | None = None
+    ) -> str:
+        """Computes the cache key of one environment.
+
+        :param configs: The configuration, as consumed by ConfigLoader.
+        :param environment: The environment variables the configuration resolves.
+        :param builder: The `module:function` reference of the stack builder.
+        :param sources: Source files or directories whose content shapes the templates. Defaults to
+            `builder_sources(builder)`.
+        :return: The hex SHA-256 cache key.
+        """
+        variables = configs.get("account", {}).values()
+        document = {
+            "configs": configs,
+            "environment": {key: environment.get(key, os.environ.get(key, "")) for key in variables},
+            "builder": builder,
+            "sources": hash_sources(builder_sources(builder) if sources is None else sources),
+            "versions": {name: _package_version(name) for name in ("aws-cdk-lib", "constructs", "jsii")},
+        }
+        return hashlib.sha256(json.dumps(document, sort_keys=True, default=str).encode(DEFAULT_ENCODING)).hexdigest()
+
+    def get(self, key: str) -> Path | None:
+        """Returns the cached assembly directory for `key`, or None, and records a hit or a miss.
+
+        :param key: The cache key.
+        :return: The cached assembly directory, or None.
+        """
+        entry = self.directory / key
+        with self._lock:
+            if not entry.is_dir():
+                self.misses += 1
+                return None
+            self.hits += 1
+            os.utime(entry)
+            return entry
+
+    def restore(self, key: str, outdir: str | Path) -> bool:
+        """Copies the cached assembly for `key` into `outdir`, replacing its content.
+
+        :param key: The cache key.
+        :param outdir: The assembly output directory.
+        :return: True on a cache hit, False on a miss.
+        """
+        entry = self.get(key)
+        if entry is None:
+            return False
+        shutil.rmtree(outdir, ignore_errors=True)
+        shutil.copytree(entry, outdir)
+        return True
+
+    def put(self, key: str, assembly_dir: str | Path) -> None:
+        """Stores a synthesized assembly and evicts old entries if the cache grew past `max_bytes`.
+
+        :param key: The cache key.
+        :param assembly_dir: The cloud assembly directory to store.
+        """
+        entry = self.directory / key
+        staging = self.directory / f".{key}.{os.getpid()}.{threading.get_ident()}"
+        shutil.copytree(assembly_dir, staging)
+        with self._lock:
+            shutil.rmtree(entry, ignore_errors=True)
+            staging.rename(entry)
+            os.utime(entry)
+            self._evict(keep=entry)
+
+    def _evict(self, keep: Path) -> None:
+        entries = sorted(
+            (path for path in self.directory.iterdir() if path.is_dir() and not path.name.startswith(".")),
+            key=lambda path: path.stat().st_mtime,
+        )
+        sizes = {path: _directory_size(path) for path in entries}
+        total = sum(sizes.values())
+        for path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= sizes[path]
+            self.evictions += 1
+
+    def stats(self) -> dict[str, int | float]:
+        """Returns the hit/miss/eviction counters, the hit ratio and the number and size of cached entries."""
+        with self._lock:
+            entries = [path for path in self.directory.iterdir() if path.is_dir() and not path.name.startswith(".")]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "entries": len(entries),
+                "bytes": sum(_directory_size(path) for path in entries),
+                "max_bytes": self.max_bytes,
+            }
+
+
+def _directory_size(path: Path) -> int:
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
@@ -0,0 +1,264 @@
+"""Synthesizes several environments in parallel, one jsii runtime per worker process.
+
+Usage:
+```
+python -m commons.service.synthesis --builder app:build --outdir cdk.out dev=config/dev.toml prod=config/prod.toml
+```
+
+The builder is a `module:function` reference to a function receiving the `cdk.App` and the environment's
+`ConfigLoader`; it adds the stacks of one environment to the app.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import toml
+from pydantic import BaseModel
+
+from commons.service.synth_cache import DEFAULT_MAX_BYTES, SynthCache, builder_sources
+from commons.utils import ProcessLogger
+from commons.utils.constants import DEFAULT_ENCODING
+
+# optional table of a config file holding the environment variables the account section refers to
+ENVIRONMENT_TABLE: str = "environment"
+
+
+class SynthTarget(BaseModel):
+    """One environment to synthesize.
+
+    Attributes:
+        name (str): The environment name. The cloud assembly is written to `<outdir>/<name>`.
+        configs (dict[str, Any]): The configuration, as consumed by ConfigLoader.
+        environment (dict[str, str]): Environment variables set in the worker before the configuration is loaded,
+            e.g. the account id/region/environment variables named in the `account` section.
+    """
+
+    name: str
+    configs: dict[str, Any]
+    environment: dict[str, str] = {}
+
+    @classmethod
+    def from_file(cls, name: str, path: str | Path) -> SynthTarget:
+        """Reads a target from a TOML config file. Its optional `[environment]` table becomes `environment`.
+
+        :param name: The environment name.
+        :param path: The TOML configuration file.
+        :return: The target.
+        """
+        configs = toml.loads(Path(path).read_text(encoding=DEFAULT_ENCODING))
+        environment = configs.pop(ENVIRONMENT_TABLE, {})
+        return cls(name=name, configs=configs, environment=environment)
+
+
+class SynthResult(BaseModel):
+    """Outcome of one environment's synthesis.
+
+    Attributes:
+        name (str): The environment name.
+        outdir (str): The directory holding the cloud assembly.
+        seconds (float): Wall time of the synthesis in the worker, including loading the configuration.
+        stacks (list[str]): The names of the synthesized stacks.
+        error (str | None): The error message if the synthesis failed.
+        cached (bool): Whether the assembly was restored from the synth cache instead of synthesized.
+    """
+
+    name: str
+    outdir: str
+    seconds: float
+    stacks: list[str] = []
+    error: str | None = None
+    cached: bool = False
+
+
+def resolve_builder(reference: str) -> Callable[..., None]:
+    """Imports the builder function referenced as `module:function`.
+
+    :param reference: The builder reference, e.g. `app:build`.
+    :return: The builder function.
+    :raises ValueError: If the reference is not in the `module:function` form.
+    """
+    module_name, _, function_name = reference.partition(":")
+    if not module_name or not function_name:
+        raise ValueError(f"Builder must be given as 'module:function', got '{reference}'")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+@contextmanager
+def _environment(variables: dict[str, str]) -> Iterator[None]:
+    """Sets environment variables for the duration of the block, restoring the previous values afterwards."""
+    previous = {key: os.environ.get(key) for key in variables}
+    os.environ.update(variables)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def synthesize_target(target: SynthTarget, builder: str, outdir: str | Path) -> SynthResult:
+    """Synthesizes one environment in the current process.
+
+    :param target: The environment to synthesize.
+    :param builder: The `module:function` reference of the stack builder.
+    :param outdir: The parent output directory. The assembly is written to `<outdir>/<target.name>`.
+    :return: The result of the synthesis. Errors are reported in `error` rather than raised.
+    """
+    target_outdir = Path(outdir) / target.name
+    start = time.perf_counter()
+    try:
+        import aws_cdk as cdk
+
+        from commons.utils import ConfigLoader
+
+        with _environment(target.environment):
+            config = ConfigLoader(target.configs)
+            app = cdk.App(outdir=str(target_outdir))
+            resolve_builder(builder)(app, config)
+            assembly = app.synth()
+        stacks = [stack.stack_name for stack in assembly.stacks]
+    except Exception as error:  # noqa: BLE001 - reported back to the parent process
+        return SynthResult(
+            name=target.name,
+            outdir=str(target_outdir),
+            seconds=time.perf_counter() - start,
+            error=f"{type(error).__name__}: {error}",
+        )
+
+    return SynthResult(name=target.name, outdir=str(target_outdir), seconds=time.perf_counter() - start, stacks=stacks)
+
+
+def synthesize_environments(
+    targets: Iterable[SynthTarget],
+    builder: str,
+    outdir: str | Path = "cdk.out",
+    max_workers: int | None = None,
+    cache: SynthCache | None = None,
+    *,
+    cache_sources: Iterable[str | Path] = (),
+) -> list[SynthResult]:
+    """Synthesizes the environments in a pool of worker processes.
+
+    Workers are spawned (not forked), so each one starts its own jsii runtime and reuses it for every environment
+    it synthesizes. With a cache, unchanged environments are restored from it and no worker is started for them.
+
+    :param targets: The environments to synthesize. Names must be unique.
+    :param builder: The `module:function` reference of the stack builder. It must be importable by the workers.
+    :param outdir: The parent output directory.
+    :param max_workers: The number of worker processes. Defaults to the number of targets, capped at the CPU count.
+    :param cache: Optional synth cache to restore unchanged environments from and store new assemblies in.
+    :param cache_sources: Files or directories hashed into the cache keys along with `builder_sources(builder)`,
+        e.g. code the builder loads without importing it.
+    :return: The results, in the order of `targets`.
+    :raises ValueError: If two targets share a name.
+    """
+    targets = list(targets)
+    names = [target.name for target in targets]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Environment names must be unique, got {names}")
+    if not targets:
+        return []
+
+    logger = ProcessLogger(process_name="", log_level=logging.INFO)
+    results: dict[str, SynthResult] = {}
+    start = time.perf_counter()
+
+    keys: dict[str, str] = {}
+    pending: list[SynthTarget] = []
+    sources = [*builder_sources(builder), *cache_sources] if cache is not None else []
+    for target in targets:
+        if cache is None:
+            pending.append(target)
+            continue
+        restore_start = time.perf_counter()
+        keys[target.name] = cache.key(target.configs, target.environment, builder, sources=sources)
+        target_outdir = Path(outdir) / target.name
+        if cache.restore(keys[target.name], target_outdir):
+            results[target.name] = SynthResult(
+                name=target.name,
+                outdir=str(target_outdir),
+                seconds=time.perf_counter() - restore_start,
+                stacks=[path.name.removesuffix(".template.json") for path in target_outdir.glob("*.template.json")],
+                cached=True,
+            )
+            logger.info("Environment %s restored from the synth cache -> %s", target.name, target_outdir)
+        else:
+            pending.append(target)
+
+    max_workers = max_workers or min(len(pending), os.cpu_count() or 1) or 1
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(synthesize_target, target, builder, outdir): target.name for target in pending}
+        for future in as_completed(futures):
+            result = future.result()
+            results[result.name] = result
+            if cache is not None and not result.error:
+                cache.put(keys[result.name], result.outdir)
+            if result.error:
+                logger.error("Environment %s failed after %.2fs: %s", result.name, result.seconds, result.error)
+            else:
+                logger.info(
+                    "Environment %s synthesized in %.2fs: %s -> %s",
+                    result.name,
+                    result.seconds,
+                    ", ".join(result.stacks),
+                    result.outdir,
+                )
+
+    logger.info(
+        "Synthesized %s environments (%s from cache) with %s workers in %.2fs.",
+        len(targets),
+        len(targets) - len(pending),
+        max_workers,
+        time.perf_counter() - start,
+    )
+    if cache is not None:
+        logger.info("Synth cache: %s", cache.stats())
+    return [results[name] for name in names]
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point. Returns 1 if any environment failed."""
+    parser = argparse.ArgumentParser(description="Synthesize several environments in parallel.")
+    parser.add_argument("targets", nargs="+", metavar="NAME=CONFIG", help="environment name and its TOML config")
+    parser.add_argument("--builder", required=True, help="stack builder, as module:function")
+    parser.add_argument("--outdir", default="cdk.out", help="parent output directory (default: cdk.out)")
+    parser.add_argument("--max-workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--cache-dir", default=None, help="reuse unchanged assemblies from this synth cache")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), help="cache size")
+    parser.add_argument(
+        "--cache-source", action="append", default=[], help="extra file or directory hashed into the cache keys"
+    )
+    arguments = parser.parse_args(argv)
+
+    targets = []
+    for value in arguments.targets:
+        name, separator, path = value.partition("=")
+        if not separator:
+            parser.error(f"targets must be given as NAME=CONFIG, got '{value}'")
+        targets.append(SynthTarget.from_file(name=name, path=path))
+
+    cache = None
+    if arguments.cache_dir:
+        cache = SynthCache(arguments.cache_dir, max_bytes=arguments.cache_max_mb * 1024 * 1024)
+    results = synthesize_environments(
+        targets, arguments.builder, arguments.outdir, arguments.max_workers, cache, cache_sources=arguments.cache_source
+    )
+    return 1 if any(result.error for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,21 @@
 """For all utils."""
 
-from .common_decorators import singleton
+from .common_decorators import keyed_singleton, log_metrics, memoize, singleton, timed
 from .logger import ProcessLogger
 from .utils import get_env
-from .config_loader import ConfigLoader
+from .config_loader import ConfigLoader, load_config
+from .naming import NamingEngine, NamingRule
 
-__all__ = ["singleton", "ProcessLogger", "get_env", "ConfigLoader"]
+__all__ = [
+    "singleton",
+    "keyed_singleton",
+    "memoize",
+    "timed",
+    "log_metrics",
+    "ProcessLogger",
+    "get_env",
+    "ConfigLoader",
+    "load_config",
+    "NamingEngine",
+    "NamingRule",
+]
@@ -2,21 +2,262 @@
 
 from __future__ import annotations
 
+import bisect
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
 
+# upper bounds (in milliseconds) of the latency histogram buckets used by `timed`
+LATENCY_BUCKETS_MS: tuple[float, ...] = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000, float("inf"))
 
-def singleton(cls) :
+_registry_lock = threading.Lock()
+_latencies: dict[str, LatencyHistogram] = {}
+_caches: dict[str, CacheInfo] = {}
+
+
+def singleton(cls):
     """Create and maintain a single instance of an object.
 
+    The instance is created under a lock, so threads racing on the first call share one instance.
+    The decorated callable exposes `reset()` to drop the instance, e.g. between tests.
+
     :param cls: The class to apply the singleton pattern to.
     :return: A decorated class instance that ensures only one instance of the class is created.
     """
     instances = {}
+    lock = threading.RLock()
 
     @wraps(cls)
     def get_instance(*args, **kwargs):
         if cls not in instances:
-            instances[cls] = cls(*args, **kwargs)
+            with lock:
+                if cls not in instances:
+                    instances[cls] = cls(*args, **kwargs)
         return instances[cls]
 
+    def reset():
+        with lock:
+            instances.clear()
+
+    get_instance.reset = reset
     return get_instance
+
+
+def keyed_singleton(key):
+    """Create and maintain one instance of an object per key.
+
+    Like `singleton`, instances are created under a lock and the decorated callable exposes `reset()`.
+
+    :param key: A callable receiving the constructor arguments and returning the hashable key of the instance.
+    :return: A decorator that returns the existing instance when the key was already seen.
+    """
+
+    def decorator(cls):
+        instances = {}
+        lock = threading.RLock()
+
+        @wraps(cls)
+        def get_instance(*args, **kwargs):
+            instance_key = key(*args, **kwargs)
+            if instance_key not in instances:
+                with lock:
+                    if instance_key not in instances:
+                        instances[instance_key] = cls(*args, **kwargs)
+            return instances[instance_key]
+
+        def reset():
+            with lock:
+                instances.clear()
+
+        get_instance.reset = reset
+        return get_instance
+
+    return decorator
+
+
+class CacheInfo:
+    """Hit/miss counters of a `memoize` cache."""
+
+    def __init__(self, maxsize: int | None, ttl: float | None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+
+    def as_dict(self) -> dict[str, float | int | None]:
+        """:return: The counters as a dictionary."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": self.size,
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+        }
+
+
+def memoize(maxsize: int | None = 128, ttl: float | None = None, name: str | None = None):
+    """Cache the results of a function, evicting the least recently used entries and entries older than `ttl`.
+
+    Arguments must be hashable. The decorated function exposes `cache_info()` and `cache_clear()`.
+
+    :param maxsize: The maximum number of cached results, or None for an unbounded cache.
+    :param ttl: The number of seconds a result stays valid, or None to keep results until evicted.
+    :param name: The name reported by `log_metrics`. Defaults to the function's qualified name.
+    :return: A decorator that caches the results of the decorated function.
+    """
+
+    def decorator(func):
+        info = CacheInfo(maxsize=maxsize, ttl=ttl)
+        entries: OrderedDict = OrderedDict()
+        lock = threading.Lock()
+        with _registry_lock:
+            _caches[name or f"{func.__module__}.{func.__qualname__}"] = info
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(cache_key)
+                if entry is not None and (ttl is None or now - entry[1] < ttl):
+                    entries.move_to_end(cache_key)
+                    info.hits += 1
+                    return entry[0]
+                info.misses += 1
+
+            result = func(*args, **kwargs)
+
+            with lock:
+                entries[cache_key] = (result, now)
+                entries.move_to_end(cache_key)
+                while maxsize is not None and len(entries) > maxsize:
+                    entries.popitem(last=False)
+                    info.evictions += 1
+                info.size = len(entries)
+            return result
+
+        def cache_clear():
+            with lock:
+                entries.clear()
+                info.size = 0
+
+        wrapper.cache_info = lambda: info
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
+
+
+class LatencyHistogram:
+    """Call latencies of a `timed` function, bucketed by `LATENCY_BUCKETS_MS`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all recorded latencies."""
+        with self._lock:
+            self.count = 0
+            self.total_ms = 0.0
+            self.min_ms = float("inf")
+            self.max_ms = 0.0
+            self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+
+    def record(self, elapsed_ms: float) -> None:
+        """:param elapsed_ms: The latency of one call, in milliseconds."""
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.min_ms = min(self.min_ms, elapsed_ms)
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def as_dict(self) -> dict[str, float | int | dict[str, int]]:
+        """:return: The count, total/mean/min/max latency and the non-empty buckets, keyed by `<=bound`."""
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "min_ms": round(self.min_ms, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {
+                f"<={bound:g}": count for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets, strict=True) if count
+            },
+        }
+
+
+def timed(func=None, *, name: str | None = None):
+    """Record the latency of every call of a function in a histogram reported by `log_metrics`.
+
+    Can be used bare (`@timed`) or with a name (`@timed(name="s3.create_bucket")`).
+
+    :param func: The function to time, when used without arguments.
+    :param name: The name reported by `log_metrics`. Defaults to the function's qualified name.
+    :return: The decorated function, or a decorator when called with keyword arguments only.
+    """
+
+    def decorator(target):
+        histogram = LatencyHistogram()
+        with _registry_lock:
+            histogram = _latencies.setdefault(name or f"{target.__module__}.{target.__qualname__}", histogram)
+
+        @wraps(target)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return target(*args, **kwargs)
+            finally:
+                histogram.record((time.perf_counter() - start) * 1000)
+
+        wrapper.latency = histogram
+        return wrapper
+
+    return decorator(func) if func is not None else decorator
+
+
+def collect_metrics() -> dict[str, dict[str, dict]]:
+    """:return: A snapshot of all `timed` histograms and `memoize` counters, keyed by function name."""
+    with _registry_lock:
+        return {
+            "timed": {key: histogram.as_dict() for key, histogram in _latencies.items()},
+            "memoize": {key: info.as_dict() for key, info in _caches.items()},
+        }
+
+
+def log_metrics(logger) -> None:
+    """Write all `timed` histograms and `memoize` counters through a ProcessLogger.
+
+    :param logger: The ProcessLogger (or any object with an `info(message, *args)` method).
+    """
+    metrics = collect_metrics()
+    for key, values in metrics["timed"].items():
+        logger.info(
+            "timed %s: count %s, mean %s ms, min %s ms, max %s ms, buckets %s",
+            key,
+            values["count"],
+            values["mean_ms"],
+            values["min_ms"],
+            values["max_ms"],
+            values["buckets"],
+        )
+    for key, values in metrics["memoize"].items():
+        logger.info(
+            "memoize %s: hits %s, misses %s, evictions %s, size %s",
+            key,
+            values["hits"],
+            values["misses"],
+            values["evictions"],
+            values["size"],
+        )
+
+
+def reset_metrics() -> None:
+    """Clear the counters of all `timed` histograms. `memoize` caches are cleared with `cache_clear()`."""
+    with _registry_lock:
+        for histogram in _latencies.values():
+            histogram.reset()
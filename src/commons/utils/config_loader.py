@@ -1,21 +1,54 @@
 """Loads information to be used in different modules."""
 
+import hashlib
+import json
 import logging
+import os
+from pathlib import Path
+
+import toml
 
 from commons.model import Account, Company, Project, Storage, Tags
-from commons.utils import ProcessLogger, singleton, utils
+from commons.utils import ProcessLogger, keyed_singleton, utils
+from commons.utils.constants import DEFAULT_ENCODING
+
+# bump when the snapshot layout changes, so older snapshots are ignored
+SNAPSHOT_VERSION: int = 2
+SNAPSHOT_SUFFIX: str = ".snapshot.json"
+
+
+def config_hash(configs: dict[str, dict[str, str]]) -> str:
+    """Computes the content hash that identifies a configuration.
+
+    The account section only names environment variables, so their current values are part of the hash: the same
+    file loaded with a different `ENVIRONMENT_NAME` is a different environment.
+
+    :param configs: The configuration dictionary, as passed to ConfigLoader.
+    :return: The hex SHA-256 digest of the configuration and its resolved environment variables.
+    """
+    environment = {key: utils.get_env(key=key) for key in configs.get("account", {}).values()}
+    document = json.dumps({"configs": configs, "environment": environment}, sort_keys=True, default=str)
+    return hashlib.sha256(document.encode(DEFAULT_ENCODING)).hexdigest()
+
 
+def _loader_key(configs: dict[str, dict[str, str]], *_args: object, **_kwargs: object) -> str:
+    """Keys the ConfigLoader registry by configuration hash: the snapshot path does not change the configuration."""
+    return config_hash(configs)
 
-@singleton
+
+@keyed_singleton(key=_loader_key)
 class ConfigLoader:
-    """Singleton class to configure the project."""
+    """Class to configure the project. One instance is kept per configuration content hash."""
 
-    def __init__(self, configs: dict[str, dict[str, str]]) -> None:
+    def __init__(self, configs: dict[str, dict[str, str]], snapshot_path: str | Path | None = None) -> None:
         """Initializes the ConfigLoader object.
 
         :param configs: A dictionary containing configuration settings required for initializing the ProcessLogger
         and loading various information such as company, project, account, storage, and additional tags.
         The keys should include 'company', 'project', 'account', 'data-lake-storage', and 'additional-tags'.
+        :param snapshot_path: Optional path of a compiled snapshot. When it holds the same configuration hash, the
+        models are restored from it without validation; otherwise the models are validated and the snapshot is
+        (re)written.
         """
         # initialize logger. as it is a singleton, this will keep its instance for further process execution.
         self.logger = ProcessLogger(process_name="", log_level=logging.DEBUG)
@@ -28,6 +61,11 @@ class ConfigLoader:
         self.tags: Tags | None = None
 
         self.properties_for_resource_naming: dict[str, str] | None = None
+        self.config_hash: str = config_hash(configs)
+        self.snapshot_path: Path | None = Path(snapshot_path) if snapshot_path else None
+
+        if self.snapshot_path and self._load_snapshot(self.snapshot_path):
+            return
 
         self._load_company_information(configs.get("company", {}))
         self._load_project_information(configs.get("project", {}))
@@ -36,6 +74,58 @@ class ConfigLoader:
         self._load_tags(additional_tags)
         self._load_properties_for_resource_naming()
 
+        if self.snapshot_path:
+            self._save_snapshot(self.snapshot_path)
+
+    def _load_snapshot(self, path: Path) -> bool:
+        """Restores the models from a compiled snapshot, skipping validation.
+
+        :param path: The snapshot file.
+        :return: True if the snapshot exists and matches the configuration hash, False otherwise.
+        """
+        try:
+            snapshot = json.loads(path.read_text(encoding=DEFAULT_ENCODING))
+        except (OSError, ValueError):
+            return False
+
+        if snapshot.get("version") != SNAPSHOT_VERSION or snapshot.get("hash") != self.config_hash:
+            return False
+
+        self.company = Company.model_construct(**snapshot["company"])
+        self.project = Project.model_construct(**snapshot["project"])
+        self.account = Account.model_construct(**snapshot["account"])
+        self.storage = Storage.model_construct(**snapshot["storage"])
+        self.tags = Tags.model_construct(
+            company=self.company,
+            project=self.project,
+            account=self.account,
+            additional_tags=snapshot["additional_tags"],
+        )
+        self.properties_for_resource_naming = snapshot["properties_for_resource_naming"]
+        self.logger.info("Loaded config snapshot %s (%s).", path, self.config_hash[:12])
+        return True
+
+    def _save_snapshot(self, path: Path) -> None:
+        """Writes the validated models to a compiled snapshot.
+
+        :param path: The snapshot file. It is replaced atomically.
+        :return: None
+        """
+        snapshot = {
+            "version": SNAPSHOT_VERSION,
+            "hash": self.config_hash,
+            "company": self.company.model_dump(),
+            "project": self.project.model_dump(),
+            "account": self.account.model_dump(),
+            "storage": self.storage.model_dump(),
+            "additional_tags": self.tags.additional_tags,
+            "properties_for_resource_naming": self.properties_for_resource_naming,
+        }
+        temporary_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        temporary_path.write_text(json.dumps(snapshot, indent=2, sort_keys=True), encoding=DEFAULT_ENCODING)
+        os.replace(temporary_path, path)
+        self.logger.info("Saved config snapshot %s (%s).", path, self.config_hash[:12])
+
     def _load_company_information(self, configs: dict[str, str]) -> None:
         """Loads company information.
 
@@ -118,9 +208,9 @@ class ConfigLoader:
         """
         self.properties_for_resource_naming = {
             "company-name": self.company.name,
-            "company-short_name": self.company.name,
+            "company-short_name": self.company.short_name,
             "project-name": self.project.name,
-            "project-short_name": self.project.name,
+            "project-short_name": self.project.short_name,
             "account-id": self.account.id,
             "account-region": self.account.region,
             "account-environment": self.account.environment,
@@ -128,3 +218,18 @@ class ConfigLoader:
         self.logger.info("Properties for resource naming:")
         for key, value in self.properties_for_resource_naming.items():
             self.logger.info("::%s:: >> %s", key, value)
+
+
+def load_config(path: str | Path, use_snapshot: bool = True) -> ConfigLoader:
+    """Loads a TOML configuration file, reusing its compiled snapshot when the content hash matches.
+
+    The snapshot is stored next to the source file, e.g. `config.toml` -> `config.snapshot.json`.
+
+    :param path: The TOML configuration file.
+    :param use_snapshot: Read and write the compiled snapshot (default: True).
+    :return: The ConfigLoader for that configuration. Loading the same content twice returns the same instance.
+    """
+    path = Path(path)
+    configs = toml.loads(path.read_text(encoding=DEFAULT_ENCODING))
+    snapshot_path = path.with_suffix(SNAPSHOT_SUFFIX) if use_snapshot else None
+    return ConfigLoader(configs, snapshot_path=snapshot_path)
@@ -1,23 +1,79 @@
 """Logger for project."""
 
+import atexit
+import json
 import logging
-from logging import Formatter, Logger, StreamHandler
+import queue
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging import Formatter, Handler, Logger, LogRecord, StreamHandler
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
 
 from commons.utils import singleton
 
 
+class _BraceMessage:
+    """Message rendered with str.format() only when a handler actually emits the record."""
+
+    def __init__(self, message: str, kwargs: dict[str, Any]) -> None:
+        self.message = message
+        self.kwargs = kwargs
+
+    def __str__(self) -> str:
+        return self.message.format(**self.kwargs)
+
+
+class JsonFormatter(Formatter):
+    """Formats records as one JSON object per line, with timing fields.
+
+    Fields:
+        timestamp: ISO-8601 UTC time the record was created.
+        elapsed_ms: Milliseconds since the logging module was loaded (`LogRecord.relativeCreated`).
+        duration_ms: Present when the record was logged through `ProcessLogger.timing`.
+    """
+
+    def format(self, record: LogRecord) -> str:
+        """Returns the record as a JSON document."""
+        document: dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "elapsed_ms": round(record.relativeCreated, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if hasattr(record, "duration_ms"):
+            document["duration_ms"] = record.duration_ms
+        if record.exc_info:
+            document["exception"] = self.formatException(record.exc_info)
+        return json.dumps(document, default=str)
+
+
 @singleton
 class ProcessLogger:
     """Singleton class for project logging."""
 
-    def __init__(self, process_name: str, log_level: int = logging.INFO) -> None:
+    def __init__(
+        self,
+        process_name: str,
+        log_level: int = logging.INFO,
+        use_queue: bool = False,
+        json_format: bool = False,
+    ) -> None:
         """Initialize console logger.
 
         Args:
             process_name (str): Name of the process for log identification
             log_level (int): Logging level (default: logging.INFO)
+            use_queue (bool): Hand records to a QueueListener thread, so the console I/O happens off the caller's
+                thread (default: False)
+            json_format (bool): Emit one JSON object per record, with timing fields (default: False)
         """
         self.process_name: str = process_name
+        self._listener: QueueListener | None = None
 
         # Configure logger
         self.logger: Logger = logging.getLogger(process_name)
@@ -28,14 +84,47 @@ class ProcessLogger:
             self.logger.handlers.clear()
 
         # Formatter for logs
-        formatter: Formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+        formatter: Formatter = (
+            JsonFormatter()
+            if json_format
+            else logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S")
         )
 
         # Console handler
         console_handler: StreamHandler = logging.StreamHandler()
         console_handler.setFormatter(formatter)
-        self.logger.addHandler(console_handler)
+
+        handler: Handler = console_handler
+        if use_queue:
+            records: queue.SimpleQueue = queue.SimpleQueue()
+            handler = QueueHandler(records)
+            self._listener = QueueListener(records, console_handler, respect_handler_level=True)
+            self._listener.start()
+            atexit.register(self.stop)
+
+        self.logger.addHandler(handler)
+
+    def stop(self) -> None:
+        """Flush and stop the queue listener thread, if running. Safe to call more than once."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def _log(self, level: int, message: str, args: tuple, kwargs: dict) -> None:
+        """Hand the message to the logging framework, which formats it only if the level is enabled.
+
+        Args:
+            level: Logging level
+            message: Message to log
+            args: Positional arguments for % formatting
+            kwargs: Keyword arguments for str.format() formatting
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        if kwargs:
+            self.logger.log(level, _BraceMessage(message, kwargs), stacklevel=3)
+        else:
+            self.logger.log(level, message, *args, stacklevel=3)
 
     def info(self, message: str, *args, **kwargs) -> None:
         """Log information message with optional formatting parameters.
@@ -45,45 +134,38 @@ class ProcessLogger:
             *args: Positional arguments for % formatting
             **kwargs: Keyword arguments for str.format() formatting
         """
-        if args:
-            self.logger.info(message % args)
-        elif kwargs:
-            self.logger.info(message.format(**kwargs))
-        else:
-            self.logger.info(message)
+        self._log(logging.INFO, message, args, kwargs)
 
     def error(self, message: str, *args, **kwargs) -> None:
         """Log error message with optional formatting parameters"""
-        if args:
-            self.logger.error(message % args)
-        elif kwargs:
-            self.logger.error(message.format(**kwargs))
-        else:
-            self.logger.error(message)
+        self._log(logging.ERROR, message, args, kwargs)
 
     def warning(self, message: str, *args, **kwargs) -> None:
         """Log warning message with optional formatting parameters"""
-        if args:
-            self.logger.warning(message % args)
-        elif kwargs:
-            self.logger.warning(message.format(**kwargs))
-        else:
-            self.logger.warning(message)
+        self._log(logging.WARNING, message, args, kwargs)
 
     def debug(self, message: str, *args: tuple, **kwargs: dict) -> None:
         """Log debug message with optional formatting parameters"""
-        if args:
-            self.logger.debug(message % args)
-        elif kwargs:
-            self.logger.debug(message.format(**kwargs))
-        else:
-            self.logger.debug(message)
+        self._log(logging.DEBUG, message, args, kwargs)
 
     def critical(self, message: str, *args: tuple, **kwargs: dict) -> None:
         """Log critical message with optional formatting parameters"""
-        if args:
-            self.logger.critical(message % args)
-        elif kwargs:
-            self.logger.critical(message.format(**kwargs))
-        else:
-            self.logger.critical(message)
+        self._log(logging.CRITICAL, message, args, kwargs)
+
+    @contextmanager
+    def timing(self, label: str, level: int = logging.INFO) -> Iterator[None]:
+        """Log how long the wrapped block took, as `duration_ms` in JSON output.
+
+        Args:
+            label: Name of the timed block
+            level: Logging level of the timing record (default: logging.INFO)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration_ms = round((time.perf_counter() - start) * 1000, 3)
+            if self.logger.isEnabledFor(level):
+                self.logger.log(
+                    level, "%s took %.3f ms", label, duration_ms, extra={"duration_ms": duration_ms}, stacklevel=3
+                )
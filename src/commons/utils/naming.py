@@ -0,0 +1,249 @@
+"""Resource naming engine built on the `#`-separated name patterns of `constants`.
+
+A pattern such as `DEFAULT_RESOURCE_NAME_PATTERN` (`account-environment#<resource_short_name>#<resource_name>`) is a
+list of parts: a bare part is a key of `ConfigLoader.properties_for_resource_naming`, a `<part>` is given when the
+name is rendered. Patterns are compiled once; rendered names are memoized, so stacks rendering thousands of names
+(or the same names again) only pay for each distinct name once.
+
+Each name is normalized and checked against the rules of its service (`NAMING_RULES`), and names claimed through
+`NamingEngine.name` are checked for collisions across the whole app while the stacks are built, instead of failing
+later during deployment.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from commons.utils.common_decorators import memoize
+from commons.utils.constants import (
+    DEFAULT_RESOURCE_NAME_PATTERN,
+    DEFAULT_RESOURCE_NAME_PATTERN_SEPARATOR,
+    UNDERSCORE_RESOURCE_NAME_PATTERN_SEPARATOR,
+)
+
+if TYPE_CHECKING:
+    from commons.utils.config_loader import ConfigLoader
+
+PATTERN_PART_SEPARATOR: str = "#"
+_IPV4 = re.compile(r"\d{1,3}(\.\d{1,3}){3}")
+
+
+@dataclass(frozen=True)
+class NamingRule:
+    """Naming constraints of a service.
+
+    Attributes:
+        service (str): The rule name, e.g. `s3`.
+        separator (str): The separator joining the parts of a name.
+        min_length (int): The minimum length.
+        max_length (int): The maximum length.
+        allowed (str): A regular expression every name must fully match.
+        lowercase (bool): Whether names are lowercased.
+    """
+
+    service: str
+    separator: str
+    min_length: int
+    max_length: int
+    allowed: str
+    lowercase: bool = True
+
+    def normalize(self, name: str) -> str:
+        """Lowercases the name if required and replaces spaces and other separators with the rule separator."""
+        if self.lowercase:
+            name = name.lower()
+        for separator in (" ", DEFAULT_RESOURCE_NAME_PATTERN_SEPARATOR, UNDERSCORE_RESOURCE_NAME_PATTERN_SEPARATOR):
+            if separator != self.separator:
+                name = name.replace(separator, self.separator)
+        return name
+
+    def violations(self, name: str) -> list[str]:
+        """Returns the reasons why `name` breaks the rule, or an empty list."""
+        found = []
+        if not self.min_length <= len(name) <= self.max_length:
+            found.append(f"length {len(name)} is outside {self.min_length}..{self.max_length}")
+        if not re.fullmatch(self.allowed, name):
+            found.append(f"does not match {self.allowed}")
+        if self.service == "s3":
+            if ".." in name or ".-" in name or "-." in name:
+                found.append("has adjacent periods or a period next to a hyphen")
+            if _IPV4.fullmatch(name):
+                found.append("is formatted as an IP address")
+            if name.startswith("xn--") or name.endswith(("-s3alias", "--ol-s3", "--x-s3")):
+                found.append("uses a reserved prefix or suffix")
+        return found
+
+
+# naming rules per service; `default` applies when no service is given
+NAMING_RULES: dict[str, NamingRule] = {
+    "default": NamingRule("default", "-", 1, 255, r"[A-Za-z0-9._-]+", lowercase=False),
+    # bucket names: https://docs.aws.amazon.com/AmazonS3/latest/userguide/bucketnamingrules.html
+    "s3": NamingRule("s3", "-", 3, 63, r"[a-z0-9][a-z0-9.-]*[a-z0-9]"),
+    # directory buckets: https://docs.aws.amazon.com/AmazonS3/latest/userguide/directory-bucket-naming-rules.html
+    "s3express": NamingRule("s3express", "-", 3, 63, r"[a-z0-9][a-z0-9-]*[a-z0-9]--[a-z0-9]+-az[0-9]+--x-s3"),
+    # databases, tables and columns: https://docs.aws.amazon.com/athena/latest/ug/tables-databases-columns-names.html
+    "glue": NamingRule("glue", "_", 1, 255, r"[a-z0-9_]+"),
+    "athena": NamingRule("athena", "_", 1, 255, r"[a-z0-9_]+"),
+    # workgroups: https://docs.aws.amazon.com/athena/latest/APIReference/API_WorkGroup.html
+    "athena_workgroup": NamingRule("athena_workgroup", "-", 1, 128, r"[a-zA-Z0-9._-]+", lowercase=False),
+}
+
+
+@dataclass(frozen=True)
+class CompiledPattern:
+    """A name pattern split into its parts.
+
+    Attributes:
+        pattern (str): The source pattern.
+        parts (tuple[tuple[bool, str], ...]): `(is_placeholder, key)` per part, in order.
+    """
+
+    pattern: str
+    parts: tuple[tuple[bool, str], ...]
+
+    @property
+    def placeholders(self) -> tuple[str, ...]:
+        """The names of the `<placeholder>` parts."""
+        return tuple(key for is_placeholder, key in self.parts if is_placeholder)
+
+
+@memoize(maxsize=64, name="naming.compile_pattern")
+def compile_pattern(pattern: str) -> CompiledPattern:
+    """Splits a `#`-separated pattern into property and `<placeholder>` parts.
+
+    :param pattern: The pattern, e.g. `DEFAULT_RESOURCE_NAME_PATTERN`.
+    :return: The compiled pattern.
+    :raises ValueError: If the pattern has an empty part.
+    """
+    parts = []
+    for raw_part in pattern.split(PATTERN_PART_SEPARATOR):
+        part = raw_part.strip()
+        if not part or part == "<>":
+            raise ValueError(f"Empty part in name pattern: {pattern!r}")
+        if part.startswith("<") and part.endswith(">"):
+            parts.append((True, part[1:-1]))
+        else:
+            parts.append((False, part))
+    return CompiledPattern(pattern=pattern, parts=tuple(parts))
+
+
+@memoize(maxsize=65536, name="naming.render")
+def _render(
+    pattern: str, properties: tuple[tuple[str, str], ...], values: tuple[tuple[str, str], ...], service: str
+) -> str:
+    compiled = compile_pattern(pattern)
+    known = dict(properties)
+    given = dict(values)
+    rule = NAMING_RULES[service]
+
+    rendered = []
+    for is_placeholder, key in compiled.parts:
+        source = given if is_placeholder else known
+        if key not in source:
+            kind = "placeholder" if is_placeholder else "naming property"
+            raise ValueError(f"Missing {kind} '{key}' for pattern {pattern!r}")
+        if source[key]:
+            rendered.append(str(source[key]).strip())
+
+    return NamingEngine.check(rule.normalize(rule.separator.join(rendered)), service)
+
+
+class NamingEngine:
+    """Renders resource names from a pattern and the naming properties of a configuration.
+
+    One engine is meant to be shared by every stack of an app: the names claimed through `name` are registered per
+    service, and a second owner claiming the same name raises immediately.
+
+    :param config: The loaded configuration, providing `properties_for_resource_naming`.
+    :param pattern: The name pattern. Defaults to `DEFAULT_RESOURCE_NAME_PATTERN`.
+    """
+
+    def __init__(self, config: ConfigLoader, pattern: str = DEFAULT_RESOURCE_NAME_PATTERN) -> None:
+        self.pattern = compile_pattern(pattern).pattern
+        self.properties: tuple[tuple[str, str], ...] = tuple(
+            sorted((config.properties_for_resource_naming or {}).items())
+        )
+        self._claims: dict[tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def render(self, resource_short_name: str, resource_name: str, service: str = "default", **values: str) -> str:
+        """Renders and checks a name without claiming it.
+
+        :param resource_short_name: The `<resource_short_name>` part, e.g. `s3`.
+        :param resource_name: The `<resource_name>` part, e.g. `raw`.
+        :param service: The key of the rule in `NAMING_RULES`.
+        :param values: The values of other placeholders of the pattern.
+        :return: The name.
+        :raises ValueError: If the service is unknown, a part is missing or the name breaks the service rule.
+        """
+        if service not in NAMING_RULES:
+            raise ValueError(f"Unknown naming service: {service}")
+        values = {"resource_short_name": resource_short_name, "resource_name": resource_name, **values}
+        return _render(self.pattern, self.properties, tuple(sorted(values.items())), service)
+
+    def render_many(self, resources: Iterable[tuple[str, str]], service: str = "default") -> list[str]:
+        """Renders many `(resource_short_name, resource_name)` pairs.
+
+        :param resources: The pairs.
+        :param service: The key of the rule in `NAMING_RULES`.
+        :return: The names, in order.
+        """
+        return [self.render(short_name, name, service) for short_name, name in resources]
+
+    @staticmethod
+    def check(name: str, service: str) -> str:
+        """Checks a name rendered elsewhere against the rule of a service.
+
+        :param name: The name.
+        :param service: The key of the rule in `NAMING_RULES`.
+        :return: The name.
+        :raises ValueError: If the service is unknown or the name breaks its rule.
+        """
+        if service not in NAMING_RULES:
+            raise ValueError(f"Unknown naming service: {service}")
+        violations = NAMING_RULES[service].violations(name)
+        if violations:
+            raise ValueError(f"Invalid {service} name '{name}': " + "; ".join(violations))
+        return name
+
+    def claim(self, name: str, service: str, owner: str) -> None:
+        """Registers `owner` as the only user of a name of a service.
+
+        :param name: The name.
+        :param service: The key of the rule in `NAMING_RULES`; names only collide within a service.
+        :param owner: Identifies the user, e.g. the construct path.
+        :raises ValueError: If another owner already claimed the name.
+        """
+        with self._lock:
+            current = self._claims.setdefault((service, name), owner)
+        if current != owner:
+            raise ValueError(f"{service} name collision: '{name}' is used by '{current}' and '{owner}'")
+
+    def name(
+        self, resource_short_name: str, resource_name: str, service: str = "default", owner: str | None = None
+    ) -> str:
+        """Renders a name and claims it for `owner`.
+
+        :param resource_short_name: The `<resource_short_name>` part.
+        :param resource_name: The `<resource_name>` part.
+        :param service: The key of the rule in `NAMING_RULES`.
+        :param owner: Identifies the user of the name. Defaults to the name itself: claims without an owner never
+            collide with each other, but still collide with a claim of the same name by an explicit owner.
+        :return: The name.
+        :raises ValueError: If the name breaks the service rule or another owner already claimed it.
+        """
+        name = self.render(resource_short_name, resource_name, service)
+        self.claim(name, service, owner or name)
+        return name
+
+    def claims(self) -> dict[str, dict[str, str]]:
+        """Returns the claimed names per service, with their owners."""
+        with self._lock:
+            report: dict[str, dict[str, str]] = {}
+            for (service, name), owner in self._claims.items():
+                report.setdefault(service, {})[name] = owner
+        return report
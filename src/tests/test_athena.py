@@ -0,0 +1,52 @@
+import aws_cdk as cdk
+from aws_cdk.assertions import Match, Template
+
+from commons.constructs import Athena
+from commons.constructs.aws.athena import RESULT_REUSE_TAG
+
+
+def test_layer_workgroups_share_the_results_bucket(configloader_instance):
+    stack = cdk.Stack(cdk.App(), "AthenaStack")
+    results = Athena.create_results_bucket(stack, "athena-results", tags=configloader_instance.tags.default)
+    workgroups = Athena.create_layer_workgroups(
+        stack,
+        configloader_instance,
+        results,
+        workgroup_name=lambda layer_name: f"wg-{layer_name}",
+        bytes_scanned_cutoff_per_query={"third_layer": 10 * 1024**3},
+    )
+    assert list(workgroups) == ["first_layer", "second_layer", "third_layer"]
+
+    template = Template.from_stack(stack)
+    template.resource_count_is("AWS::Athena::WorkGroup", 3)
+    template.has_resource_properties(
+        "AWS::S3::Bucket",
+        {
+            "BucketName": "athena-results",
+            "LifecycleConfiguration": {"Rules": [Match.object_like({"ExpirationInDays": 7})]},
+        },
+    )
+    template.has_resource_properties(
+        "AWS::Athena::WorkGroup",
+        {
+            "Name": "wg-analytics",
+            "Tags": Match.array_with([{"Key": RESULT_REUSE_TAG, "Value": "60"}]),
+            "WorkGroupConfiguration": Match.object_like(
+                {
+                    "BytesScannedCutoffPerQuery": 10 * 1024**3,
+                    "EnforceWorkGroupConfiguration": True,
+                    "PublishCloudWatchMetricsEnabled": True,
+                    "EngineVersion": {"SelectedEngineVersion": "Athena engine version 3"},
+                    "ResultConfiguration": Match.object_like(
+                        {"OutputLocation": {"Fn::Join": ["", ["s3://", {"Ref": Match.any_value()}, "/analytics/"]]}}
+                    ),
+                }
+            ),
+        },
+    )
+
+
+def test_result_reuse_configuration():
+    assert Athena.result_reuse_configuration(15) == {
+        "ResultReuseByAgeConfiguration": {"Enabled": True, "MaxAgeInMinutes": 15}
+    }
@@ -0,0 +1,175 @@
+import json
+
+import aws_cdk as cdk
+import pytest
+
+from commons.constructs import S3, Athena, Glue
+from commons.helper.aws import ClientCache
+from commons.service.audit import Auditor, load_templates
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+EXPECTED = {"Company": "Amazon Web Services", "Project": "Data Lakehouse"}
+
+
+def synthesize(tmp_path, configloader_instance, env=None):
+    app = cdk.App(outdir=str(tmp_path))
+    stack = cdk.Stack(app, "AuditStack", stack_name="dlh-audit", env=env)
+    tags = configloader_instance.tags.default
+    raw = S3.create_bucket(stack, None, "aws-dlh-raw", tags)
+    S3.create_bucket(stack, None, "aws-dlh-stage", tags)
+    Athena.create_workgroup(stack, "dlh-stage", raw, tags)
+    Glue.create_database(stack, "dlh_raw")
+    app.synth()
+    return load_templates(tmp_path)
+
+
+def deploy_with_drift(template):
+    declared = {
+        resource["Properties"].get("BucketName") or resource["Properties"].get("Name"): resource
+        for resource in template["Resources"].values()
+        if resource["Type"] in ("AWS::S3::Bucket", "AWS::Athena::WorkGroup")
+    }
+    policy = {
+        "Statement": [
+            {"Effect": "Deny", "Condition": {"Bool": {"aws:SecureTransport": "false"}}},
+            {"Effect": "Deny", "Condition": {"NumericLessThan": {"s3:TlsVersion": 1.2}}},
+        ]
+    }
+    # raw is deployed as declared; stage lost its Company tag and its TLS statement
+    s3 = boto3.client("s3", region_name="us-east-1")
+    for name, statements, tags in (
+        ("aws-dlh-raw", policy["Statement"], declared["aws-dlh-raw"]["Properties"]["Tags"]),
+        ("aws-dlh-stage", policy["Statement"][:1], declared["aws-dlh-stage"]["Properties"]["Tags"][1:]),
+    ):
+        s3.create_bucket(Bucket=name)
+        s3.put_bucket_tagging(Bucket=name, Tagging={"TagSet": tags})
+        s3.put_bucket_policy(Bucket=name, Policy=json.dumps({"Statement": statements}))
+
+    workgroup = declared["dlh-stage"]["Properties"]
+    boto3.client("athena", region_name="us-east-1").create_work_group(
+        Name="dlh-stage",
+        Configuration={
+            "EnforceWorkGroupConfiguration": False,
+            "BytesScannedCutoffPerQuery": workgroup["WorkGroupConfiguration"]["BytesScannedCutoffPerQuery"],
+            "PublishCloudWatchMetricsEnabled": True,
+        },
+        Tags=workgroup["Tags"],
+    )
+    # the database was never created
+
+
+def test_templates(tmp_path, configloader_instance):
+    [stack] = synthesize(tmp_path, configloader_instance)
+    assert (stack.assembly, stack.stack, stack.account, stack.region) == (str(tmp_path), "dlh-audit", None, None)
+    resources = stack.template["Resources"].values()
+    assert sum(resource["Type"] == "AWS::S3::Bucket" for resource in resources) == 2
+
+    env = cdk.Environment(account="123456789012", region="eu-west-1")
+    [stack] = synthesize(tmp_path / "prod", configloader_instance, env=env)
+    assert (stack.account, stack.region) == ("123456789012", "eu-west-1")
+
+
+def test_audit_reports_drift(tmp_path, configloader_instance):
+    templates = synthesize(tmp_path, configloader_instance)
+
+    with moto.mock_aws():
+        deploy_with_drift(templates[0].template)
+        auditor = Auditor(expected_tags=EXPECTED, cache=ClientCache(), region="us-east-1", max_workers=4)
+        report = auditor.audit(templates)
+
+    assert report.resources == 4
+    found = {(finding.physical_id, finding.check, finding.key) for finding in report.findings}
+    assert found == {
+        ("aws-dlh-stage", "tag", "Company"),
+        ("aws-dlh-stage", "tls", "s3:TlsVersion"),
+        ("dlh-stage", "property", "EnforceWorkGroupConfiguration"),
+        ("dlh_raw", "missing", None),
+    }
+    assert report.summary()["drifted_resources"] == 3
+    assert not report.ok
+
+
+def test_throttled_calls_are_retried():
+    from botocore.exceptions import ClientError
+
+    class ThrottledGlue:
+        calls = 0
+
+        def get_database(self, Name):
+            self.calls += 1
+            if self.calls < 3:
+                raise ClientError({"Error": {"Code": "ThrottlingException"}}, "GetDatabase")
+            return {"Database": {"Name": Name}}
+
+    class Cache:
+        glue = ThrottledGlue()
+
+        def client(self, service, region=None, role_arn=None, max_pool_connections=None):
+            return self.glue
+
+    auditor = Auditor(cache=Cache(), base_delay_seconds=0.001, max_attempts=3)
+    assert auditor._call("glue", "get_database", Name="dlh_raw")["Database"]["Name"] == "dlh_raw"
+    assert auditor.retries == 2
+
+    auditor = Auditor(cache=Cache(), base_delay_seconds=0.001, max_attempts=2)
+    Cache.glue.calls = 0
+    with pytest.raises(ClientError):
+        auditor._call("glue", "get_database", Name="dlh_raw")
+
+
+class RecordingCache(ClientCache):
+    def __init__(self):
+        super().__init__()
+        self.targets = set()
+
+    def client(self, service, region=None, role_arn=None, max_pool_connections=None):
+        self.targets.add((service, region, role_arn))
+        return super().client(service, region, max_pool_connections=max_pool_connections)
+
+
+def test_same_stack_of_several_environments(tmp_path, configloader_instance):
+    dev = synthesize(
+        tmp_path / "dev", configloader_instance, cdk.Environment(account="111111111111", region="us-east-1")
+    )
+    prod = synthesize(
+        tmp_path / "prod", configloader_instance, cdk.Environment(account="222222222222", region="eu-west-1")
+    )
+    roles = {
+        "111111111111": "arn:aws:iam::111111111111:role/audit",
+        "222222222222": "arn:aws:iam::222222222222:role/audit",
+    }
+    cache = RecordingCache()
+
+    with moto.mock_aws():
+        deploy_with_drift(dev[0].template)
+        report = Auditor(expected_tags=EXPECTED, cache=cache, region="us-east-1", role_arns=roles).audit(dev + prod)
+
+    # the stacks share a name but not an assembly: each is audited in its own region, with its account's role
+    assert report.resources == 8
+    workgroups = {
+        (finding.assembly, finding.check) for finding in report.findings if finding.physical_id == "dlh-stage"
+    }
+    assert workgroups == {(str(tmp_path / "dev"), "property"), (str(tmp_path / "prod"), "missing")}
+    assert ("athena", "eu-west-1", roles["222222222222"]) in cache.targets
+    assert ("athena", "us-east-1", roles["111111111111"]) in cache.targets
+
+
+def test_failed_name_lookup_is_an_error(tmp_path):
+    from botocore.exceptions import ClientError
+
+    template = {"Resources": {"Bucket": {"Type": "AWS::S3::Bucket", "Properties": {}}}}
+    (tmp_path / "dlh-denied.template.json").write_text(json.dumps(template))
+
+    class DeniedCloudFormation:
+        def list_stack_resources(self, **kwargs):
+            raise ClientError({"Error": {"Code": "AccessDenied", "Message": "denied"}}, "ListStackResources")
+
+    class Cache:
+        def client(self, service, region=None, role_arn=None, max_pool_connections=None):
+            return DeniedCloudFormation()
+
+    [finding] = Auditor(cache=Cache()).audit(load_templates(tmp_path)).findings
+    assert (finding.stack, finding.check, finding.key) == ("dlh-denied", "error", "PhysicalResourceId")
+    assert "AccessDenied" in finding.actual
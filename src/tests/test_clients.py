@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from commons.helper.aws import ClientCache, default_client_cache
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+
+@pytest.fixture
+def aws(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    with moto.mock_aws():
+        yield
+
+
+def test_clients_are_shared_across_threads(aws):
+    cache = ClientCache(max_pool_connections=8)
+    cache.client("s3", "us-east-1").create_bucket(Bucket="aws-dlh-raw")
+
+    def put(index):
+        client = cache.client("s3", "us-east-1")
+        client.put_object(Bucket="aws-dlh-raw", Key=f"{index}.json", Body=b"{}")
+        return id(client)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert len(set(executor.map(put, range(32)))) == 1
+
+    stats = cache.stats()["s3:us-east-1::8"]
+    assert (stats["creations"], stats["reuses"], stats["calls"], stats["in_flight"]) == (1, 32, 33, 0)
+    assert stats["peak_in_flight"] >= 1
+    assert cache.client("s3", "eu-west-1") is not cache.client("s3", "us-east-1")
+    assert cache.stats()["total"]["creations"] == 2
+
+
+def test_assumed_role_clients(aws):
+    cache = ClientCache()
+    role_arn = "arn:aws:iam::123456789012:role/reader"
+    client = cache.client("s3", "us-east-1", role_arn=role_arn)
+    client.list_buckets()
+
+    assert client is cache.client("s3", "us-east-1", role_arn=role_arn)
+    assert client is not cache.client("s3", "us-east-1")
+    assert cache.stats()["sts:us-east-1::50"]["calls"] == 1
+
+
+def test_region_endpoint_and_default_cache(configloader_instance):
+    cache = ClientCache(configloader_instance, endpoint_url="http://localhost:9000")
+    assert cache.region == configloader_instance.account.region
+    assert cache.client("s3", "us-east-1").meta.endpoint_url == "http://localhost:9000"
+    assert default_client_cache() is default_client_cache()
+    default_client_cache.reset()
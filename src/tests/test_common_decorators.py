@@ -0,0 +1,69 @@
+import threading
+import time
+
+from commons.utils import common_decorators
+from commons.utils.common_decorators import collect_metrics, log_metrics, memoize, singleton, timed
+
+
+def test_singleton_is_created_once_across_threads():
+    created = []
+
+    @singleton
+    class Slow:
+        def __init__(self):
+            created.append(self)
+            time.sleep(0.01)
+
+    instances = []
+    threads = [threading.Thread(target=lambda: instances.append(Slow())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(instance is created[0] for instance in instances)
+
+    Slow.reset()
+    assert Slow() is not created[0]
+
+
+def test_memoize_counts_hits_and_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(common_decorators.time, "monotonic", lambda: now[0])
+
+    @memoize(maxsize=2, ttl=10)
+    def square(value):
+        return value * value
+
+    assert [square(2), square(2), square(3), square(4)] == [4, 4, 9, 16]
+    info = square.cache_info()
+    assert (info.hits, info.misses, info.evictions, info.size) == (1, 3, 1, 2)
+
+    now[0] += 11
+    square(4)
+    assert square.cache_info().misses == 4
+
+
+def test_timed_records_histogram_and_logs_metrics():
+    @timed(name="tests.sleepy")
+    def sleepy():
+        time.sleep(0.002)
+
+    sleepy()
+    sleepy()
+    histogram = collect_metrics()["timed"]["tests.sleepy"]
+    assert histogram["count"] == 2
+    assert histogram["min_ms"] >= 2
+    assert sum(histogram["buckets"].values()) == 2
+
+    class RecordingLogger:
+        def __init__(self):
+            self.lines = []
+
+        def info(self, message, *args):
+            self.lines.append(message % args)
+
+    logger = RecordingLogger()
+    log_metrics(logger)
+    assert any(line.startswith("timed tests.sleepy: count 2") for line in logger.lines)
@@ -0,0 +1,356 @@
+import json
+
+import pytest
+
+from commons.service.compaction import Compactor
+from commons.service.object_store import LocalObjectStore
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def _landing(tmp_path, files_per_partition=5, rows_per_file=20):
+    landing = LocalObjectStore(tmp_path / "landing")
+    for day in ("2024-01-01", "2024-01-02"):
+        for index in range(files_per_partition):
+            rows = [{"order_id": f"{day}-{index}-{row}", "amount": row * 1.5} for row in range(rows_per_file)]
+            body = "\n".join(json.dumps(row) for row in rows)
+            landing.put(f"landing/orders/dt={day}/{index:04d}.json", body.encode())
+    landing.put("landing/customers/0000.csv", b"customer_id,name\n1,a\n2,b\n")
+    landing.put("landing/README.txt", b"not data")
+    return landing
+
+
+def _rows(store, keys):
+    return sum(pq.read_metadata(store.root / key).num_rows for key in keys)
+
+
+def test_compacts_partitions_into_parquet(tmp_path):
+    landing = _landing(tmp_path)
+    raw = LocalObjectStore(tmp_path / "raw")
+    result = Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/").run()
+
+    assert (result.batches, result.files_read, result.skipped) == (3, 11, 1)
+    keys = [info.key for info in raw.list("raw/")]
+    assert len(keys) == result.files_written == 3
+    assert all(key.endswith(".parquet") for key in keys)
+    assert any(key.startswith("raw/orders/dt=2024-01-01/part-") for key in keys)
+    assert _rows(raw, keys) == 2 * 5 * 20 + 2
+    assert result.files_per_second > 0 and result.mb_per_second > 0
+
+
+def test_rerun_only_compacts_new_objects(tmp_path):
+    landing = _landing(tmp_path)
+    raw = LocalObjectStore(tmp_path / "raw")
+    Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/").run()
+
+    assert Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/").run().batches == 0
+    landing.put("landing/orders/dt=2024-01-03/0000.json", b'{"order_id": "x", "amount": 1.0}')
+    result = Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/").run()
+    assert (result.batches, result.files_read) == (1, 1)
+
+
+def test_interrupted_batch_is_replayed_with_the_same_outputs(tmp_path):
+    landing = _landing(tmp_path)
+    raw = LocalObjectStore(tmp_path / "raw")
+    compactor = Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/")
+    batches, _ = compactor.plan(landing.list("landing/"))
+    interrupted = next(batch for batch in batches if batch.partitions == (("dt", "2024-01-01"),))
+    compactor.ledger.begin(interrupted)
+    # a new object of the same partition arrives before the rerun
+    landing.put("landing/orders/dt=2024-01-01/0100.json", b'{"order_id": "x", "amount": 1.0}')
+
+    result = Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/").run()
+    assert result.batches == 4
+    assert interrupted.output_key("raw/", 0) in {info.key for info in raw.list("raw/")}
+    assert not list(raw.list("_compaction/ledger/pending/"))
+
+
+def test_files_are_rolled_at_the_target_size(tmp_path):
+    landing = _landing(tmp_path, files_per_partition=40, rows_per_file=200)
+    raw = LocalObjectStore(tmp_path / "raw")
+    result = Compactor(
+        landing,
+        raw,
+        source_prefix="landing/",
+        target_prefix="raw/",
+        target_file_bytes=4096,
+        row_group_bytes=8192,
+        delete_sources=True,
+    ).run()
+
+    assert result.files_written > 2
+    assert _rows(raw, [info.key for info in raw.list("raw/")]) == 2 * 40 * 200 + 2
+    assert [info.key for info in landing.list("landing/")] == ["landing/README.txt"]
+
+
+def test_scheduled_lambda():
+    import aws_cdk as cdk
+    from aws_cdk.assertions import Match, Template
+
+    from commons.constructs import Compaction
+
+    stack = cdk.Stack(cdk.App(), "CompactionStack")
+    landing = cdk.aws_s3.Bucket(stack, "Landing", bucket_name="aws-dlh-landing")
+    raw = cdk.aws_s3.Bucket(stack, "Raw", bucket_name="aws-dlh-raw")
+    Compaction.create_lambda(
+        stack,
+        "compaction",
+        landing,
+        raw,
+        cdk.aws_lambda.Code.from_inline("def handler(event, context): pass"),
+        tags={"project": "dlh"},
+        source_prefix="landing/",
+        target_prefix="raw/",
+        delete_sources=True,
+    )
+
+    template = Template.from_stack(stack)
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": "commons.service.compaction.handler",
+            "ReservedConcurrentExecutions": 1,
+            "Environment": {
+                "Variables": Match.object_like(
+                    {"COMPACTION_SOURCE_PREFIX": "landing/", "COMPACTION_DELETE_SOURCES": "true"}
+                )
+            },
+        },
+    )
+    template.has_resource_properties("AWS::Events::Rule", {"ScheduleExpression": "rate(15 minutes)"})
+
+
+def test_scheduled_glue_job():
+    import aws_cdk as cdk
+    from aws_cdk.assertions import Match, Template
+
+    from commons.constructs import Compaction
+
+    stack = cdk.Stack(cdk.App(), "CompactionStack")
+    landing = cdk.aws_s3.Bucket(stack, "Landing", bucket_name="aws-dlh-landing")
+    raw = cdk.aws_s3.Bucket(stack, "Raw", bucket_name="aws-dlh-raw")
+    Compaction.create_glue_job(
+        stack,
+        "compaction",
+        landing,
+        raw,
+        "s3://aws-dlh-assets/scripts/compaction.py",
+        tags={"project": "dlh"},
+        python_modules="s3://aws-dlh-assets/wheels/commons-0.1.0-py3-none-any.whl",
+    )
+
+    template = Template.from_stack(stack)
+    # commons needs Python 3.11, which only Glue 5.0 jobs run
+    template.has_resource_properties(
+        "AWS::Glue::Job",
+        {
+            "Command": {"Name": "glueetl", "PythonVersion": "3", "ScriptLocation": Match.any_value()},
+            "GlueVersion": "5.0",
+            "DefaultArguments": Match.object_like(
+                {"--additional-python-modules": "s3://aws-dlh-assets/wheels/commons-0.1.0-py3-none-any.whl"}
+            ),
+        },
+    )
+    template.has_resource_properties(
+        "AWS::IAM::Policy",
+        {
+            "PolicyDocument": {
+                "Statement": Match.array_with(
+                    [
+                        Match.object_like(
+                            {
+                                "Action": "s3:GetObject",
+                                "Resource": [
+                                    {"Fn::Join": ["", ["arn:", {"Ref": "AWS::Partition"}, f":s3:::{key}"]]}
+                                    for key in (
+                                        "aws-dlh-assets/scripts/compaction.py",
+                                        "aws-dlh-assets/wheels/commons-0.1.0-py3-none-any.whl",
+                                    )
+                                ],
+                            }
+                        )
+                    ]
+                )
+            }
+        },
+    )
+    with pytest.raises(ValueError, match="S3 URL"):
+        Compaction.create_glue_job(stack, "local", landing, raw, "scripts/compaction.py", tags={})
+
+
+def test_compacts_a_sharded_landing_layout(tmp_path, configloader_instance):
+    storage = configloader_instance.storage
+    source_layout = storage.key_layout("landing_zone", shards=8)
+    landing = LocalObjectStore(tmp_path / "landing")
+    for key in source_layout.build_many("clicks", [f"{index:04d}.json" for index in range(40)], {"dt": "2024-01-01"}):
+        landing.put(key, b'{"click": 1}')
+    raw = LocalObjectStore(tmp_path / "raw")
+
+    result = Compactor(
+        landing, raw, source_layout=source_layout, target_layout=storage.key_layout("first_layer")
+    ).run()
+    assert (result.batches, result.files_read) == (1, 40)
+    assert [info.key.rsplit("/", 1)[0] for info in raw.list("raw/")] == ["raw/clicks/dt=2024-01-01"]
+
+
+def test_corrupt_object_is_quarantined_without_blocking_other_batches(tmp_path):
+    landing = _landing(tmp_path)
+    landing.put("landing/orders/dt=2024-01-01/0099.json", b'{"order_id": "broken", ')
+    raw = LocalObjectStore(tmp_path / "raw")
+    compactor = Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/", delete_sources=True)
+    # a batch interrupted earlier whose objects are since gone must not block the run either
+    batches, _ = compactor.plan(landing.list("landing/orders/dt=2024-01-02/"))
+    compactor.ledger.begin(batches[0])
+    landing.delete(info.key for info in batches[0].objects[:2])
+
+    result = Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/", delete_sources=True).run()
+    assert (result.batches, result.failed, result.quarantined) == (3, 0, 3)
+    assert _rows(raw, [info.key for info in raw.list("raw/")]) == (5 + 3) * 20 + 2
+    assert not list(raw.list("_compaction/ledger/pending/"))
+    # the corrupt object stays in the landing zone, and is retried only once rewritten
+    assert [info.key for info in landing.list("landing/orders/")] == ["landing/orders/dt=2024-01-01/0099.json"]
+    assert Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/").run().batches == 0
+    landing.put("landing/orders/dt=2024-01-01/0099.json", b'{"order_id": "fixed", "amount": 2.0}')
+    result = Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/").run()
+    assert (result.batches, result.files_read, result.quarantined) == (1, 1, 0)
+
+
+def test_failed_batch_is_quarantined_and_its_files_removed(tmp_path, monkeypatch):
+    landing = _landing(tmp_path)
+    raw = LocalObjectStore(tmp_path / "raw")
+    compactor = Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/")
+    put_file = raw.put_file
+
+    def failing_put_file(key, path):
+        if "customers" in key:
+            raise OSError("disk full")
+        put_file(key, path)
+
+    monkeypatch.setattr(raw, "put_file", failing_put_file)
+    result = compactor.run()
+    assert (result.batches, result.failed, result.quarantined) == (2, 1, 1)
+    assert not list(raw.list("raw/customers/"))
+    assert len(list(raw.list("_compaction/ledger/failed/"))) == 1
+
+
+def test_failed_batch_removes_its_files_of_every_shard(tmp_path, configloader_instance, monkeypatch):
+    landing = _landing(tmp_path, files_per_partition=20)
+    raw = LocalObjectStore(tmp_path / "raw")
+    target_layout = configloader_instance.storage.key_layout("first_layer", shards=16)
+    compactor = Compactor(
+        landing,
+        raw,
+        source_prefix="landing/",
+        target_layout=target_layout,
+        target_file_bytes=1,
+        row_group_bytes=1,
+    )
+    put_file = raw.put_file
+    written = []
+
+    def failing_put_file(key, path):
+        if "dt=2024-01-01" in key:
+            if len(written) == 3:
+                raise OSError("disk full")
+            written.append(key)
+        put_file(key, path)
+
+    monkeypatch.setattr(raw, "put_file", failing_put_file)
+    assert compactor.run().failed == 1
+    # the files of the failed batch were spread over several shard prefixes, and none is left behind
+    assert len({key.split("/", 1)[0] for key in written}) > 1
+    assert not [info.key for info in raw.list("") if "dt=2024-01-01" in info.key]
+    assert [info.key for info in raw.list("") if "dt=2024-01-02" in info.key]
+
+
+def test_done_records_are_rolled_up(tmp_path):
+    landing = _landing(tmp_path)
+    raw = LocalObjectStore(tmp_path / "raw")
+    Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/", delete_sources=True).run()
+
+    assert not list(raw.list("_compaction/ledger/done/"))
+    assert len(json.loads(raw.read("_compaction/ledger/snapshot.json"))["compacted"]) == 11
+
+    landing.put("landing/orders/dt=2024-01-03/0000.json", b'{"order_id": "x", "amount": 1.0}')
+    Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/").run()
+    # the deleted sources are no longer listed, so they are not remembered
+    snapshot = json.loads(raw.read("_compaction/ledger/snapshot.json"))
+    assert [fingerprint.split(":")[0] for fingerprint in snapshot["compacted"]] == [
+        "landing/orders/dt=2024-01-03/0000.json"
+    ]
+
+
+class _DeleteObjectsClient:
+    """Answers DeleteObjects with one reply per call: the error code per failed key."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.requests = []
+
+    def delete_objects(self, Bucket, Delete):
+        keys = [item["Key"] for item in Delete["Objects"]]
+        self.requests.append(keys)
+        codes = self.replies.pop(0) if self.replies else {}
+        errors = [{"Key": key, "Code": code, "Message": "failed"} for key, code in codes.items() if key in keys]
+        return {"Errors": errors}
+
+
+def test_s3_delete_retries_throttled_keys_and_raises_on_the_others(monkeypatch):
+    from commons.service import object_store
+    from commons.service.object_store import DeleteError, S3ObjectStore
+
+    monkeypatch.setattr(object_store, "S3_DELETE_RETRY_DELAY_SECONDS", 0)
+    client = _DeleteObjectsClient({"b": "SlowDown"}, {})
+    S3ObjectStore("aws-dlh-landing", client=client).delete(["a", "b"])
+    assert client.requests == [["a", "b"], ["b"]]
+
+    client = _DeleteObjectsClient({"a": "AccessDenied", "b": "SlowDown"}, {"b": "SlowDown"}, {"b": "SlowDown"})
+    with pytest.raises(DeleteError) as raised:
+        S3ObjectStore("aws-dlh-landing", client=client).delete(["a", "b", "c"])
+    assert raised.value.errors == {"a": "AccessDenied: failed", "b": "SlowDown: failed"}
+    assert client.requests == [["a", "b", "c"], ["b"], ["b"]]
+
+
+def test_undeleted_sources_do_not_fail_the_batch(tmp_path, monkeypatch):
+    from commons.service.object_store import DeleteError
+
+    landing = _landing(tmp_path)
+    raw = LocalObjectStore(tmp_path / "raw")
+
+    def denied_delete(keys):
+        raise DeleteError({key: "AccessDenied: denied" for key in keys})
+
+    monkeypatch.setattr(landing, "delete", denied_delete)
+    result = Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/", delete_sources=True).run()
+    assert (result.batches, result.failed, result.undeleted) == (3, 0, 11)
+    assert not list(raw.list("_compaction/ledger/failed/"))
+    assert Compactor(landing, raw, source_prefix="landing/", target_prefix="raw/").run().batches == 0
+
+
+def test_handler_ignores_scheduled_events(tmp_path, monkeypatch):
+    from commons.service.compaction import handler
+
+    _landing(tmp_path)
+    monkeypatch.setenv("COMPACTION_SOURCE", str(tmp_path / "landing"))
+    monkeypatch.setenv("COMPACTION_SOURCE_PREFIX", "landing/")
+    monkeypatch.setenv("COMPACTION_TARGET", str(tmp_path / "raw"))
+    monkeypatch.setenv("COMPACTION_TARGET_PREFIX", "raw/")
+    scheduled = {"source": "aws.events", "detail-type": "Scheduled Event", "detail": {}}
+
+    assert handler(scheduled, None)["batches"] == 3
+    assert {info.key.split("/")[0] for info in LocalObjectStore(tmp_path / "raw").list()} == {"raw", "_compaction"}
+
+
+def test_handler_applies_direct_invoke_overrides(tmp_path, monkeypatch):
+    from commons.service.compaction import handler
+
+    _landing(tmp_path)
+    monkeypatch.setenv("COMPACTION_SOURCE", str(tmp_path / "landing"))
+    monkeypatch.setenv("COMPACTION_SOURCE_PREFIX", "landing/")
+    monkeypatch.setenv("COMPACTION_TARGET", str(tmp_path / "raw"))
+    monkeypatch.setenv("COMPACTION_TARGET_PREFIX", "raw/")
+
+    assert handler({"target_prefix": "backfill/"}, None)["batches"] == 3
+    assert all(info.key.startswith("backfill/") for info in LocalObjectStore(tmp_path / "raw").list("backfill/"))
+    assert not list(LocalObjectStore(tmp_path / "raw").list("raw/"))
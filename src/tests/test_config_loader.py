@@ -1,39 +1,52 @@
 import pytest
+import toml
 
-from commons.utils import ConfigLoader
+from commons.utils import ConfigLoader, load_config
 
 
-@pytest.fixture
-def configloader_instance():
+def test_properties_for_resource_naming(configloader_instance):
+    properties = configloader_instance.properties_for_resource_naming
+    assert properties["company-name"] == "Amazon Web Services"
+
+
+def test_one_instance_per_config(configloader_instance):
     configs = {
-        "account": {
-            "id": "ACCOUNT_ID",
-            "region": "REGION_ID",
-            "environment": "ENVIRONMENT_NAME"
-        },
+        "account": {"id": "ACCOUNT_ID", "region": "REGION_ID", "environment": "ENVIRONMENT_NAME"},
         "data-lake-storage": {
-            "first_layer": "raw",
-            "second_layer": "stage",
-            "third_layer": "analytics",
+            "first_layer": "bronze",
+            "second_layer": "silver",
+            "third_layer": "gold",
             "landing_zone": "landing",
-            "assets": "data-lake-assets",
-        },
-        "company": {
-            "name": "Amazon Web Services",
-            "short_name": "aws"
-        },
-        "project": {
-            "name": "Data Lakehouse",
-            "short_name": "dlh"
-        },
-        "additional-tags": {
-            "tag": "Me"
+            "assets": "assets",
         },
+        "company": {"name": "Other Company", "short_name": "oc"},
+        "project": {"name": "Data Lakehouse", "short_name": "dlh"},
     }
-    cl = ConfigLoader(configs)
-    return cl
+    other = ConfigLoader(configs)
+    assert other is not configloader_instance
+    assert other.storage.first_layer == "bronze"
+    assert ConfigLoader(configs) is other
+    assert ConfigLoader(configs, snapshot_path=None) is other
 
 
-def test_properties_for_resource_naming(configloader_instance):
-    properties = configloader_instance.properties_for_resource_naming
-    assert properties["company-name"] == "Amazon Web Services"
+def test_load_config_reuses_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setenv("SNAPSHOT_ENVIRONMENT", "qa")
+    config_path = tmp_path / "config.toml"
+    config_path.write_text(
+        "[account]\nid='SNAPSHOT_ACCOUNT'\nregion='SNAPSHOT_REGION'\nenvironment='SNAPSHOT_ENVIRONMENT'\n"
+        "[data-lake-storage]\nfirst_layer='raw'\nsecond_layer='stage'\nthird_layer='analytics'\n"
+        "landing_zone='landing'\nassets='assets'\n"
+        "[company]\nname='Snapshot Company'\nshort_name='sc'\n"
+        "[project]\nname='Snapshot Project'\nshort_name='sp'\n"
+    )
+    loaded = load_config(config_path)
+    snapshot_path = tmp_path / "config.snapshot.json"
+    assert snapshot_path.exists()
+    assert load_config(config_path) is loaded
+
+    restored = ConfigLoader.__wrapped__(toml.loads(config_path.read_text()), snapshot_path=snapshot_path)
+    assert restored.tags.default == loaded.tags.default
+    assert restored.properties_for_resource_naming == loaded.properties_for_resource_naming
+
+    monkeypatch.setenv("SNAPSHOT_ENVIRONMENT", "prod")
+    assert load_config(config_path).account.environment == "prod"
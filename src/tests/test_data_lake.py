@@ -0,0 +1,104 @@
+import aws_cdk as cdk
+from aws_cdk.assertions import Match, Template
+
+from commons.constructs import DataLakeBuckets
+from commons.model import StorageProfile
+
+
+def test_layer_buckets_get_their_storage_profiles(configloader_instance):
+    stack = cdk.Stack(cdk.App(), "DataLakeStack")
+    buckets = DataLakeBuckets.create(
+        stack,
+        configloader_instance,
+        profiles={"assets": StorageProfile(kms_encryption=False)},
+        bucket_name=lambda layer_name: f"test-{layer_name}",
+    )
+    assert list(buckets) == ["landing_zone", "first_layer", "second_layer", "third_layer", "assets"]
+
+    template = Template.from_stack(stack)
+    template.resource_count_is("AWS::KMS::Key", 1)
+    template.has_resource_properties(
+        "AWS::S3::Bucket",
+        {
+            "BucketName": "test-landing",
+            "BucketEncryption": {
+                "ServerSideEncryptionConfiguration": [
+                    Match.object_like(
+                        {
+                            "BucketKeyEnabled": True,
+                            "ServerSideEncryptionByDefault": Match.object_like({"SSEAlgorithm": "aws:kms"}),
+                        }
+                    )
+                ]
+            },
+            "LifecycleConfiguration": {
+                "Rules": [
+                    Match.object_like(
+                        {"AbortIncompleteMultipartUpload": {"DaysAfterInitiation": 1}, "ExpirationInDays": 30}
+                    )
+                ]
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::S3::Bucket",
+        {
+            "BucketName": "test-raw",
+            "VersioningConfiguration": {"Status": "Enabled"},
+            # queried and crawled: never archived unless opted in
+            "IntelligentTieringConfigurations": Match.absent(),
+            "LifecycleConfiguration": {
+                "Rules": [
+                    Match.object_like(
+                        {
+                            "NoncurrentVersionExpiration": {"NoncurrentDays": 30},
+                            "Transitions": [{"StorageClass": "INTELLIGENT_TIERING", "TransitionInDays": 0}],
+                        }
+                    )
+                ]
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::S3::Bucket",
+        {
+            "BucketName": "test-data-lake-assets",
+            "BucketEncryption": {
+                "ServerSideEncryptionConfiguration": [{"ServerSideEncryptionByDefault": {"SSEAlgorithm": "AES256"}}]
+            },
+        },
+    )
+
+
+def test_archive_tiers_are_opt_in(configloader_instance):
+    stack = cdk.Stack(cdk.App(), "DataLakeStack")
+    archive = StorageProfile(
+        versioned=True, transitions={"INTELLIGENT_TIERING": 0}, archive_access_days=90, deep_archive_access_days=180
+    )
+    DataLakeBuckets.create(
+        stack, configloader_instance, profiles={"first_layer": archive}, bucket_name=lambda layer_name: layer_name
+    )
+
+    template = Template.from_stack(stack)
+    template.has_resource_properties(
+        "AWS::S3::Bucket",
+        {
+            "BucketName": "raw",
+            "IntelligentTieringConfigurations": [
+                Match.object_like(
+                    {
+                        "Tierings": [
+                            {"AccessTier": "ARCHIVE_ACCESS", "Days": 90},
+                            {"AccessTier": "DEEP_ARCHIVE_ACCESS", "Days": 180},
+                        ]
+                    }
+                )
+            ],
+        },
+    )
+
+
+def test_default_bucket_name(configloader_instance):
+    name = DataLakeBuckets.default_bucket_name(configloader_instance, "Raw Data")
+    assert name.startswith("aws-dlh-")
+    assert name.endswith("-raw-data")
@@ -0,0 +1,139 @@
+import time
+
+import aws_cdk as cdk
+import pytest
+from aws_cdk.assertions import Match, Template
+
+from commons.constructs import S3
+from commons.service.express_drain import ExpressDrain
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+
+def test_directory_bucket_tier(configloader_instance):
+    assert S3.directory_bucket_name("aws-dlh-landing", "use1-az4") == "aws-dlh-landing--use1-az4--x-s3"
+    with pytest.raises(ValueError):
+        S3.directory_bucket_name("aws.dlh.landing", "use1-az4")
+    with pytest.raises(ValueError):
+        S3.directory_bucket_name("aws-dlh-landing", "us-east-1a")
+
+    stack = cdk.Stack(cdk.App(), "ExpressStack")
+    target = cdk.aws_s3.Bucket.from_bucket_name(stack, "Landing", "aws-dlh-landing")
+    bucket = S3.create_directory_bucket(stack, "aws-dlh-landing", "use1-az4", configloader_instance.tags.default)
+    reader = cdk.aws_iam.Role(stack, "Reader", assumed_by=cdk.aws_iam.AccountRootPrincipal())
+    S3.grant_directory_bucket(bucket, reader, read_only=True)
+    S3.create_express_drain(
+        stack,
+        "dlh-express-drain",
+        bucket,
+        target,
+        cdk.aws_lambda.Code.from_inline("pass"),
+        configloader_instance.tags.default,
+        prefix="landing/",
+    )
+
+    template = Template.from_stack(stack)
+    template.has_resource_properties(
+        "AWS::S3Express::DirectoryBucket",
+        {
+            "BucketName": "aws-dlh-landing--use1-az4--x-s3",
+            "DataRedundancy": "SingleAvailabilityZone",
+            "LocationName": "use1-az4",
+        },
+    )
+    template.has_resource_properties(
+        "AWS::IAM::Policy",
+        {
+            "PolicyDocument": {
+                "Statement": [
+                    Match.object_like(
+                        {
+                            "Action": "s3express:CreateSession",
+                            "Condition": {"StringEquals": {"s3express:SessionMode": "ReadOnly"}},
+                        }
+                    )
+                ]
+            }
+        },
+    )
+    # the drain checks each copy with HeadObject, which needs s3:GetObject on the target
+    template.has_resource_properties(
+        "AWS::IAM::Policy",
+        {
+            "PolicyDocument": {
+                "Statement": Match.array_with(
+                    [Match.object_like({"Action": Match.array_with(["s3:GetObject*", "s3:PutObject"])})]
+                )
+            }
+        },
+    )
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": "commons.service.express_drain.handler",
+            "Environment": {"Variables": Match.object_like({"EXPRESS_DRAIN_MAX_AGE_SECONDS": "3600"})},
+            "Tags": Match.array_with([{"Key": "Company", "Value": "Amazon Web Services"}]),
+        },
+    )
+
+
+def test_drain_moves_only_aged_objects():
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        # moto has no directory buckets; the drain only relies on the S3 API they share
+        for bucket in ("aws-dlh-express", "aws-dlh-landing"):
+            client.create_bucket(Bucket=bucket)
+        for index in range(5):
+            client.put_object(Bucket="aws-dlh-express", Key=f"landing/clicks/{index}.json", Body=b"{}" * index)
+        client.put_object(Bucket="aws-dlh-express", Key="scratch/tmp.json", Body=b"{}")
+
+        drain = ExpressDrain("aws-dlh-express", "aws-dlh-landing", prefix="landing/", client=client)
+        assert drain.run().keys == []
+
+        result = drain.run(now=time.time() + 2 * 3600)
+        assert sorted(result.keys) == [f"landing/clicks/{index}.json" for index in range(5)]
+        assert result.bytes == 20
+        moved = client.list_objects_v2(Bucket="aws-dlh-landing")["Contents"]
+        assert len(moved) == 5
+        remaining = client.list_objects_v2(Bucket="aws-dlh-express")["Contents"]
+        assert [item["Key"] for item in remaining] == ["scratch/tmp.json"]
+
+        with pytest.raises(ValueError):
+            ExpressDrain("aws-dlh-express", "aws-dlh-landing", prefix="landing", client=client)
+
+
+def test_drain_keeps_objects_overwritten_during_the_run():
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        for bucket in ("aws-dlh-express", "aws-dlh-landing"):
+            client.create_bucket(Bucket=bucket)
+        for index in range(3):
+            client.put_object(Bucket="aws-dlh-express", Key=f"landing/clicks/{index}.json", Body=b"{}")
+
+        drain = ExpressDrain("aws-dlh-express", "aws-dlh-landing", prefix="landing/", client=client, max_workers=1)
+        aged, move = drain.aged, drain.move
+
+        def aged_then_overwritten(now=None):
+            listed = aged(now)
+            # a writer replaces 0.json after the listing, before its copy
+            client.put_object(Bucket="aws-dlh-express", Key="landing/clicks/0.json", Body=b'{"v": 2}')
+            return listed
+
+        def move_then_overwritten(info):
+            move(info)
+            # and 1.json after its copy, before its delete
+            if info.key.endswith("1.json"):
+                client.put_object(Bucket="aws-dlh-express", Key=info.key, Body=b'{"v": 3}')
+
+        drain.aged, drain.move = aged_then_overwritten, move_then_overwritten
+        result = drain.run(now=time.time() + 2 * 3600)
+
+        assert result.keys == ["landing/clicks/2.json"]
+        assert sorted(result.changed) == ["landing/clicks/0.json", "landing/clicks/1.json"]
+        assert result.errors == {}
+        bodies = {
+            key: client.get_object(Bucket="aws-dlh-express", Key=key)["Body"].read()
+            for key in ("landing/clicks/0.json", "landing/clicks/1.json")
+        }
+        assert bodies == {"landing/clicks/0.json": b'{"v": 2}', "landing/clicks/1.json": b'{"v": 3}'}
@@ -0,0 +1,115 @@
+import aws_cdk as cdk
+import pytest
+from aws_cdk.assertions import Match, Template
+
+from commons.constructs import Glue
+from commons.model import Column, PartitionKey, TableDefinition
+
+ORDERS = TableDefinition(
+    name="orders",
+    layer="first_layer",
+    columns=[Column(name="order_id", type="string"), Column(name="amount", type="double")],
+    partition_keys=[
+        PartitionKey(name="dt", projection="date", range="2020-01-01,NOW", format="yyyy-MM-dd", interval=1,
+                     interval_unit="DAYS"),
+        PartitionKey(name="source", projection="enum", values=["web", "store"]),
+    ],
+)
+
+
+def test_projection_parameters(configloader_instance):
+    assert ORDERS.projection_parameters("bucket", configloader_instance.storage) == {
+        "projection.enabled": "true",
+        "projection.dt.type": "date",
+        "projection.dt.range": "2020-01-01,NOW",
+        "projection.dt.format": "yyyy-MM-dd",
+        "projection.dt.interval": "1",
+        "projection.dt.interval.unit": "DAYS",
+        "projection.source.type": "enum",
+        "projection.source.values": "web,store",
+        "storage.location.template": "s3://bucket/raw/orders/dt=${dt}/source=${source}/",
+    }
+    unpartitioned = ORDERS.model_copy(update={"partition_keys": []})
+    assert unpartitioned.projection_parameters("bucket", configloader_instance.storage) == {}
+
+
+def test_partition_key_requires_projection_settings():
+    with pytest.raises(ValueError):
+        PartitionKey(name="dt", projection="date", range="2020-01-01,NOW")
+
+
+def test_create_table(configloader_instance):
+    stack = cdk.Stack(cdk.App(), "GlueStack")
+    bucket = cdk.aws_s3.Bucket.from_bucket_name(stack, "Raw", "aws-dlh-raw")
+    database = Glue.create_database(stack, "raw")
+    Glue.create_table(stack, database, ORDERS, bucket, configloader_instance.storage)
+
+    template = Template.from_stack(stack)
+    template.has_resource_properties(
+        "AWS::Glue::Table",
+        {
+            "TableInput": Match.object_like(
+                {
+                    "Name": "orders",
+                    "TableType": "EXTERNAL_TABLE",
+                    "Parameters": Match.object_like(
+                        {
+                            "classification": "parquet",
+                            "projection.enabled": "true",
+                            "storage.location.template": "s3://aws-dlh-raw/raw/orders/dt=${dt}/source=${source}/",
+                        }
+                    ),
+                    "PartitionKeys": [{"Name": "dt", "Type": "string"}, {"Name": "source", "Type": "string"}],
+                    "StorageDescriptor": Match.object_like({"Location": "s3://aws-dlh-raw/raw/orders/"}),
+                }
+            )
+        },
+    )
+
+
+def test_first_layer_crawler_in_event_mode(configloader_instance):
+    stack = cdk.Stack(cdk.App(), "CrawlerStack")
+    bucket = cdk.aws_s3.Bucket(stack, "Raw", bucket_name="aws-dlh-raw")
+    Glue.create_layer_crawler(
+        stack,
+        configloader_instance,
+        bucket,
+        crawler_name="raw-crawler",
+        sample_size=10,
+        table_grouping_policy="CombineCompatibleSchemas",
+    )
+
+    template = Template.from_stack(stack)
+    template.resource_count_is("AWS::SQS::Queue", 2)
+    template.resource_count_is("Custom::S3BucketNotifications", 1)
+    template.has_resource_properties(
+        "AWS::Glue::Crawler",
+        {
+            "Name": "raw-crawler",
+            "DatabaseName": "raw",
+            "RecrawlPolicy": {"RecrawlBehavior": "CRAWL_EVENT_MODE"},
+            "SchemaChangePolicy": {"UpdateBehavior": "LOG", "DeleteBehavior": "LOG"},
+            "Configuration": '{"Version": 1.0, "Grouping": {"TableGroupingPolicy": "CombineCompatibleSchemas"}}',
+            "Targets": {
+                "S3Targets": [
+                    Match.object_like(
+                        {"SampleSize": 10, "EventQueueArn": Match.any_value(), "DlqEventQueueArn": Match.any_value()}
+                    )
+                ]
+            },
+        },
+    )
+
+
+def test_crawler_defaults_to_new_folders_only():
+    stack = cdk.Stack(cdk.App(), "CrawlerStack")
+    bucket = cdk.aws_s3.Bucket.from_bucket_name(stack, "Raw", "aws-dlh-raw")
+    Glue.create_crawler(stack, "raw", "raw", bucket, tags={}, path_prefix="raw")
+
+    template = Template.from_stack(stack)
+    template.resource_count_is("AWS::SQS::Queue", 0)
+    template.has_resource_properties(
+        "AWS::Glue::Crawler", {"RecrawlPolicy": {"RecrawlBehavior": "CRAWL_NEW_FOLDERS_ONLY"}}
+    )
+    with pytest.raises(ValueError):
+        Glue.create_crawler(stack, "other", "raw", bucket, tags={}, sample_size=250)
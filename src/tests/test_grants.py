@@ -0,0 +1,39 @@
+import aws_cdk as cdk
+import pytest
+from aws_cdk.assertions import Template
+
+from commons.constructs import S3, GrantPlanner
+
+
+def _policy_statements(stack):
+    policies = Template.from_stack(stack).find_resources("AWS::IAM::Policy")
+    return [
+        statement for policy in policies.values() for statement in policy["Properties"]["PolicyDocument"]["Statement"]
+    ]
+
+
+def test_grants_are_merged_per_principal_and_action_set():
+    stack = cdk.Stack(cdk.App(), "GrantsStack")
+    role = cdk.aws_iam.Role(stack, "Analytics", assumed_by=cdk.aws_iam.ServicePrincipal("athena.amazonaws.com"))
+    buckets = [S3.create_bucket(stack, None, f"bucket-{index}", tags={}) for index in range(4)]
+
+    planner = GrantPlanner()
+    for bucket in buckets[:3]:
+        S3.apply_permissions(bucket=bucket, permissions=[{"action": "read", "principal": role}], planner=planner)
+    S3.add_bucket_permission(bucket=buckets[3], action="read", principal=role, planner=planner)
+    S3.add_bucket_permission(bucket=buckets[3], action="write", principal=role, planner=planner)
+    report = planner.apply()
+
+    statements = _policy_statements(stack)
+    assert len(statements) == 2
+    assert sorted(len(statement["Resource"]) for statement in statements) == [2, 6]
+    assert report["requested_grants"] == 5
+    assert (report["statements_before"], report["statements_after"]) == (4, 2)
+    assert report["policy_bytes_after"] < report["policy_bytes_before"]
+
+
+def test_unsupported_action_is_rejected():
+    stack = cdk.Stack(cdk.App(), "InvalidGrantStack")
+    bucket = S3.create_bucket(stack, None, "bucket", tags={})
+    with pytest.raises(ValueError, match="Unsupported action"):
+        GrantPlanner().add(bucket, "delete", cdk.aws_iam.AccountRootPrincipal())
@@ -0,0 +1,120 @@
+import json
+
+import aws_cdk as cdk
+import pytest
+from aws_cdk.assertions import Template
+
+from commons.constructs import Iceberg
+from commons.model import Column, IcebergTable, PartitionTransform, SortField
+from commons.service.iceberg import IcebergMaintenance, QueryFailedError, QueryRunner
+
+ORDERS = IcebergTable(
+    name="orders",
+    layer="second_layer",
+    columns=[
+        Column(name="order_id", type="string"),
+        Column(name="customer_id", type="bigint"),
+        Column(name="created_at", type="timestamp", comment="order's creation time"),
+    ],
+    partitioning=[
+        PartitionTransform(column="created_at", transform="day"),
+        PartitionTransform(column="customer_id", transform="bucket", width=16),
+    ],
+    sort_order=[SortField(column="customer_id"), SortField(column="created_at", descending=True)],
+    target_file_size_bytes=256 * 1024**2,
+)
+REVENUE = IcebergTable(name="revenue", layer="third_layer", columns=[Column(name="total", type="double")])
+BUCKETS = {"second_layer": "aws-dlh-stage", "third_layer": "aws-dlh-analytics"}
+
+
+class RecordingRunner(QueryRunner):
+    def __init__(self, failing=()):
+        self.statements = []
+        self.failing = failing
+
+    def run(self, statement, database):
+        self.statements.append((database, statement))
+        if any(part in statement for part in self.failing):
+            raise QueryFailedError("ICEBERG_COMMIT_ERROR")
+        return f"query-{len(self.statements)}"
+
+
+def test_statements(configloader_instance):
+    create = ORDERS.create_statement("lake", "aws-dlh-stage", configloader_instance.storage)
+    assert "COMMENT 'order''s creation time'" in create
+    assert "PARTITIONED BY (day(created_at), bucket(16, customer_id))" in create
+    assert "LOCATION 's3://aws-dlh-stage/stage/orders/'" in create
+    assert "'write_target_data_file_size_bytes'='268435456'" in create
+    alter = ORDERS.alter_statement("lake")
+    assert alter.startswith("ALTER TABLE lake.orders SET TBLPROPERTIES (")
+    assert "'write_target_data_file_size_bytes'='268435456'" in alter and "table_type" not in alter
+    assert ORDERS.optimize_statement("lake") == "OPTIMIZE lake.orders REWRITE DATA USING BIN_PACK"
+    assert ORDERS.insert_statement("lake", "SELECT 1").endswith(
+        "ORDER BY customer_id ASC NULLS LAST, created_at DESC NULLS LAST"
+    )
+
+    with pytest.raises(ValueError):
+        PartitionTransform(column="id", transform="bucket")
+    with pytest.raises(ValueError):
+        IcebergTable(**{**ORDERS.model_dump(), "sort_order": [{"column": "missing"}]})
+    with pytest.raises(ValueError):
+        IcebergTable(name="Orders", layer="second_layer", columns=[Column(name="id", type="string")])
+
+
+def test_maintenance_skips_the_rest_of_a_failing_table(configloader_instance):
+    runner = RecordingRunner(failing=("OPTIMIZE lake.orders",))
+    maintenance = IcebergMaintenance(runner, "lake", [ORDERS, REVENUE], BUCKETS, configloader_instance.storage)
+
+    result = maintenance.run()
+    assert [statement.split("\n")[0] for _, statement in runner.statements] == [
+        "CREATE TABLE IF NOT EXISTS lake.orders (",
+        "ALTER TABLE lake.orders SET TBLPROPERTIES (",
+        "OPTIMIZE lake.orders REWRITE DATA USING BIN_PACK",
+        "CREATE TABLE IF NOT EXISTS lake.revenue (",
+        "ALTER TABLE lake.revenue SET TBLPROPERTIES (",
+        "OPTIMIZE lake.revenue REWRITE DATA USING BIN_PACK",
+        "VACUUM lake.revenue",
+    ]
+    assert list(result.errors) == ["orders:optimize"]
+    assert result.skipped == ["orders:vacuum"]
+    assert len(result.query_ids) == 6
+
+    with pytest.raises(ValueError):
+        IcebergMaintenance(runner, "lake", [ORDERS], {}, configloader_instance.storage)
+
+
+def test_create_maintenance(configloader_instance):
+    stack = cdk.Stack(cdk.App(), "IcebergStack")
+    buckets = {layer: cdk.aws_s3.Bucket.from_bucket_name(stack, layer, name) for layer, name in BUCKETS.items()}
+    Iceberg.create_maintenance(
+        stack,
+        "dlh-iceberg-maintenance",
+        "lake",
+        [ORDERS, REVENUE],
+        buckets,
+        configloader_instance.storage,
+        workgroup="dlh-dev-stage",
+        tags=configloader_instance.tags.default,
+    )
+
+    template = Template.from_stack(stack)
+    template.resource_count_is("AWS::StepFunctions::StateMachine", 1)
+    template.has_resource_properties("AWS::Events::Rule", {"ScheduleExpression": "cron(0 3 * * ? *)"})
+    definition = template.find_resources("AWS::StepFunctions::StateMachine")
+    parts = next(iter(definition.values()))["Properties"]["DefinitionString"]["Fn::Join"][1]
+    states = json.loads("".join(part if isinstance(part, str) else "" for part in parts))["States"]
+    tasks = [state_name for state_name, state in states.items() if state["Type"] == "Task"]
+    assert len(tasks) == 8
+    assert any("VACUUM lake.revenue" in states[state_name]["Parameters"]["QueryString"] for state_name in tasks)
+
+    # a failure skips the rest of its table only: orders tasks fall through to the first revenue task
+    suffix = "dlh-iceberg-maintenance"
+    for state_name in tasks:
+        catch = states[state_name]["Catch"][0]
+        if "Orders" in state_name:
+            assert (catch["Next"], catch["ResultPath"]) == (f"IcebergCreateRevenue{suffix}", "$.failures.orders")
+        else:
+            assert (catch["Next"], catch["ResultPath"]) == (f"IcebergMaintenanceCheck{suffix}", "$.failures.revenue")
+    assert states[f"IcebergVacuumRevenue{suffix}"]["Next"] == f"IcebergMaintenanceCheck{suffix}"
+    assert states[f"IcebergMaintenanceCheck{suffix}"]["Choices"][0]["Next"] == f"IcebergMaintenanceFailed{suffix}"
+    template.resource_count_is("Custom::AWS", 1)
@@ -0,0 +1,74 @@
+import io
+import os
+
+import pytest
+
+from commons.model import Storage
+from commons.service.ingestion import ChecksumMismatchError, IngestionClient
+
+boto3 = pytest.importorskip("boto3")
+moto = pytest.importorskip("moto")
+
+MB = 1024**2
+STORAGE = Storage(
+    first_layer="raw", second_layer="stage", third_layer="analytics", landing_zone="landing", assets="assets"
+)
+
+
+@pytest.fixture
+def s3():
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="aws-dlh-landing")
+        yield client
+
+
+def _client(s3, **kwargs):
+    return IngestionClient(
+        "aws-dlh-landing", STORAGE, client=s3, part_size=5 * MB, multipart_threshold=5 * MB, **kwargs
+    )
+
+
+def test_landing_key():
+    client = IngestionClient("aws-dlh-landing", STORAGE, client=object())
+    assert client.landing_key("orders", "0001.json", {"dt": "2024-01-01"}) == "landing/orders/dt=2024-01-01/0001.json"
+    with pytest.raises(ValueError):
+        client.landing_key("orders", "../0001.json")
+    with pytest.raises(ValueError):
+        IngestionClient("aws-dlh-landing", STORAGE.model_copy(update={"landing_zone": ""}), client=object())
+
+
+def test_multipart_file_and_stream_checksums(s3, tmp_path):
+    data = os.urandom(12 * MB)
+    path = tmp_path / "big.bin"
+    path.write_bytes(data)
+    client = _client(s3, max_concurrency=4, max_buffered_parts=2)
+
+    key = client.upload_file(path, "events", {"dt": "2024-01-01"})
+    assert key == "landing/events/dt=2024-01-01/big.bin"
+    assert s3.get_object(Bucket="aws-dlh-landing", Key=key)["Body"].read() == data
+
+    key = client.upload_stream(io.BytesIO(data), "events", "stream.bin")
+    assert s3.head_object(Bucket="aws-dlh-landing", Key=key)["ContentLength"] == len(data)
+    # below the threshold, a stream is uploaded in one request
+    client.upload_stream(io.BytesIO(b"small"), "events", "small.bin")
+
+    with pytest.raises(ChecksumMismatchError):
+        client._verify(key, "not-the-checksum")
+
+
+def test_upload_many_reports_throughput_and_errors(s3, tmp_path):
+    paths = []
+    for index in range(20):
+        path = tmp_path / f"{index:04d}.json"
+        path.write_text('{"event": %d}' % index)
+        paths.append(path)
+    client = _client(s3, max_workers=8)
+
+    result = client.upload_many([*paths, tmp_path / "missing.json"], "clicks")
+    assert len(result.keys) == 20
+    assert list(result.errors) == [str(tmp_path / "missing.json")]
+    assert result.bytes == sum(path.stat().st_size for path in paths)
+    assert result.files_per_second > 0
+    listed = s3.list_objects_v2(Bucket="aws-dlh-landing", Prefix="landing/clicks/")
+    assert listed["KeyCount"] == 20
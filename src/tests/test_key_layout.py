@@ -0,0 +1,45 @@
+import pytest
+
+from commons.model import KeyLayout, ObjectKey
+
+
+def test_build_and_parse_unsharded(configloader_instance):
+    layout = configloader_instance.storage.key_layout("first_layer")
+    key = layout.build("orders", "0001.parquet", {"dt": "2024-01-01", "hour": "03"})
+    assert key == "raw/orders/dt=2024-01-01/hour=03/0001.parquet"
+    assert layout.parse(key) == ObjectKey("raw", "orders", {"dt": "2024-01-01", "hour": "03"}, "0001.parquet")
+    assert layout.prefixes("orders") == ["raw/orders/"]
+
+
+@pytest.mark.parametrize("shard_position", ["leading", "partition"])
+def test_sharded_keys_round_trip(configloader_instance, shard_position):
+    layout = configloader_instance.storage.key_layout("landing_zone", shards=16, shard_position=shard_position)
+    names = [f"{index:05d}.json" for index in range(200)]
+    keys = layout.build_many("clicks", names, {"dt": "2024-01-01"})
+
+    parsed = layout.parse_many(keys)
+    assert [item.file_name for item in parsed] == names
+    assert len({item.shard for item in parsed}) == 16
+    if shard_position == "leading":
+        assert keys[0].split("/")[1] == "landing"
+        assert len(layout.prefixes("clicks")) == 16
+    else:
+        assert keys[0].startswith("landing/clicks/dt=2024-01-01/")
+        assert layout.prefixes("clicks") == ["landing/clicks/"]
+
+
+def test_invalid_keys_and_layouts(configloader_instance):
+    layout = configloader_instance.storage.key_layout("landing_zone", shards=16, partition_keys=["dt"])
+    key = layout.build("clicks", "a.json", {"dt": "2024-01-01"})
+    moved = ("f" if key[0] != "f" else "0") + key[1:]
+
+    with pytest.raises(ValueError):
+        layout.parse(moved)
+    assert layout.parse_many(["landing/README.txt", key], strict=False)[0] is None
+    with pytest.raises(ValueError):
+        layout.build("clicks", "a.json", {"hour": "01"})
+    with pytest.raises(ValueError):
+        layout.build("clicks", "../a.json", {"dt": "2024-01-01"})
+    with pytest.raises(ValueError):
+        KeyLayout(prefix="/")
+    assert configloader_instance.storage.key_layout("landing_zone", shards=16, partition_keys=["dt"]) is layout
@@ -0,0 +1,87 @@
+import aws_cdk as cdk
+import pytest
+from aws_cdk.assertions import Match, Template
+
+from commons.constructs import Glue, LakeFormation
+from commons.model import Column, TableDefinition
+
+
+def _table(stack, database, name, layer, configloader_instance):
+    bucket = cdk.aws_s3.Bucket.from_bucket_name(stack, f"{name}Bucket", f"aws-dlh-{name}")
+    definition = TableDefinition(name=name, layer=layer, columns=[Column(name="id", type="string")])
+    return Glue.create_table(stack, database, definition, bucket, configloader_instance.storage)
+
+
+def test_grants_scale_with_roles_not_tables(configloader_instance):
+    stack = cdk.Stack(cdk.App(), "LakeFormationStack")
+    analyst = cdk.aws_iam.Role(stack, "Analyst", assumed_by=cdk.aws_iam.AccountRootPrincipal())
+    engineer = cdk.aws_iam.Role(stack, "Engineer", assumed_by=cdk.aws_iam.AccountRootPrincipal())
+    lake_formation = LakeFormation(stack, configloader_instance, catalog_id="123456789012")
+
+    database = Glue.create_database(stack, "lake")
+    assert lake_formation.tag_database(database)["company"] == "Amazon Web Services"
+    for index in range(10):
+        layer = ("first_layer", "second_layer", "third_layer")[index % 3]
+        lake_formation.tag_table(database, _table(stack, database, f"t{index}", layer, configloader_instance), layer)
+
+    lake_formation.grant_layers(analyst, ["third_layer"])
+    lake_formation.grant_layers(engineer, ["first_layer", "second_layer", "third_layer"], ["ALL"])
+    lake_formation.grant(analyst, {"project": "Data Lakehouse"}, resource_type="DATABASE")
+    report = lake_formation.apply()
+
+    assert report["grants"] == 3
+    # analyst: 3 analytics tables and the database, engineer: all 10 tables
+    assert report["grants_per_table"] == 14
+    assert report["associations"] == 11
+
+    template = Template.from_stack(stack)
+    template.resource_count_is("AWS::LakeFormation::PrincipalPermissions", 3)
+    template.has_resource_properties(
+        "AWS::LakeFormation::Tag", {"TagKey": "layer", "TagValues": ["analytics", "raw", "stage"]}
+    )
+    template.has_resource_properties(
+        "AWS::LakeFormation::PrincipalPermissions",
+        {
+            "Permissions": ["SELECT", "DESCRIBE"],
+            "Resource": {
+                "LFTagPolicy": {
+                    "CatalogId": "123456789012",
+                    "Expression": [{"TagKey": "layer", "TagValues": ["analytics"]}],
+                    "ResourceType": "TABLE",
+                }
+            },
+        },
+    )
+    template.has_resource(
+        "AWS::LakeFormation::TagAssociation",
+        {
+            "Properties": {
+                "LFTags": [Match.object_like({"TagKey": "layer", "TagValues": ["raw"]})],
+                "Resource": {"Table": Match.object_like({"CatalogId": "123456789012"})},
+            },
+            "DependsOn": Match.any_value(),
+        },
+    )
+
+
+def test_grant_ignores_value_order(configloader_instance):
+    stack = cdk.Stack(cdk.App(), "LakeFormationStack")
+    analyst = cdk.aws_iam.Role(stack, "Analyst", assumed_by=cdk.aws_iam.AccountRootPrincipal())
+    lake_formation = LakeFormation(stack, configloader_instance, catalog_id="123456789012")
+
+    lake_formation.grant(analyst, {"layer": ["raw", "stage"]})
+    lake_formation.grant(analyst, {"layer": ["stage", "raw"]})
+    assert lake_formation.apply()["grants"] == 1
+    Template.from_stack(stack).resource_count_is("AWS::LakeFormation::PrincipalPermissions", 1)
+
+
+def test_invalid_tags_and_grants(configloader_instance):
+    lake_formation = LakeFormation(cdk.Stack(cdk.App(), "Stack"), configloader_instance)
+    with pytest.raises(ValueError):
+        lake_formation.tag_table("lake", "orders", tags={"layer": "raw;drop"})
+    with pytest.raises(ValueError):
+        lake_formation.tag_table("lake", "orders")
+    with pytest.raises(ValueError):
+        lake_formation.grant("arn:aws:iam::123456789012:role/a", {"layer": "raw"}, resource_type="CATALOG")
+    with pytest.raises(ValueError):
+        lake_formation.grant_layers("arn:aws:iam::123456789012:role/a", ["unknown_layer"])
@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+
+def _loaded_modules(statement):
+    probe = f"import sys\n{statement}\nprint(' '.join(sorted(sys.modules)))"
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    completed = subprocess.run([sys.executable, "-c", probe], capture_output=True, check=True, text=True, env=env)
+    return set(completed.stdout.split())
+
+
+def test_commons_packages_do_not_load_aws_cdk():
+    modules = _loaded_modules("import commons.constructs, commons.model, commons.utils")
+    assert "aws_cdk" not in modules
+    assert "commons.constructs.aws.s3" not in modules
+
+
+def test_construct_is_loaded_on_first_access():
+    modules = _loaded_modules("import commons.constructs\ncommons.constructs.S3")
+    assert "commons.constructs.aws.s3" in modules
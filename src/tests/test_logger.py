@@ -0,0 +1,38 @@
+import json
+import logging
+
+from commons.utils import ProcessLogger
+
+
+class _CountingMessage:
+    def __init__(self):
+        self.renders = 0
+
+    def __str__(self):
+        self.renders += 1
+        return "rendered"
+
+
+def test_filtered_messages_are_not_formatted():
+    logger = ProcessLogger.__wrapped__(process_name="test-lazy", log_level=logging.INFO)
+    argument = _CountingMessage()
+    logger.debug("value %s", argument)
+    logger.debug("value {value}", value=argument)
+    assert argument.renders == 0
+
+    logger.info("value {value}", value=argument)
+    assert argument.renders > 0
+
+
+def test_queue_mode_with_json_format(capsys):
+    logger = ProcessLogger.__wrapped__(process_name="test-queue", use_queue=True, json_format=True)
+    logger.info("loaded %s layers", 5)
+    with logger.timing("load"):
+        pass
+    logger.stop()
+
+    records = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+    assert records[0]["message"] == "loaded 5 layers"
+    assert records[0]["logger"] == "test-queue"
+    assert "elapsed_ms" in records[0]
+    assert records[1]["duration_ms"] >= 0
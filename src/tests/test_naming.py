@@ -0,0 +1,57 @@
+import aws_cdk as cdk
+import pytest
+
+from commons.constructs import DataLakeBuckets
+from commons.utils import NamingEngine
+from commons.utils.naming import compile_pattern
+
+PATTERN = "project-short_name#<resource_short_name>#<resource_name>"
+
+
+def test_render_applies_service_rules(configloader_instance):
+    naming = NamingEngine(configloader_instance, pattern=PATTERN)
+    assert naming.render("s3", "Raw Data", service="s3") == "dlh-s3-raw-data"
+    assert naming.render("glue", "raw-data", service="glue") == "dlh_glue_raw_data"
+    assert naming.render("wg", "raw", service="athena_workgroup") == "dlh-wg-raw"
+    assert naming.render_many([("s3", "a"), ("s3", "b")], service="s3") == [
+        "dlh-s3-a",
+        "dlh-s3-b",
+    ]
+
+    with pytest.raises(ValueError, match="length"):
+        naming.render("s3", "x" * 60, service="s3")
+    with pytest.raises(ValueError, match="does not match"):
+        naming.render("glue", "raw$", service="glue")
+    with pytest.raises(ValueError, match="Unknown"):
+        naming.render("s3", "raw", service="dynamodb")
+
+
+def test_patterns_use_naming_properties(configloader_instance):
+    naming = NamingEngine(configloader_instance, pattern="company-short_name#project-short_name#<resource_name>")
+    assert naming.render("", "raw", service="s3") == "aws-dlh-raw"
+    assert compile_pattern("a#<b>").placeholders == ("b",)
+    with pytest.raises(ValueError, match="Missing naming property"):
+        NamingEngine(configloader_instance, pattern="unknown#<resource_name>").render("", "raw")
+    with pytest.raises(ValueError, match="Empty part"):
+        compile_pattern("a##<b>")
+
+
+def test_collisions_fail_before_synthesis(configloader_instance):
+    naming = NamingEngine(configloader_instance, pattern=PATTERN)
+    assert naming.name("s3", "raw", service="s3", owner="StackA/Raw") == "dlh-s3-raw"
+    naming.name("s3", "raw", service="s3", owner="StackA/Raw")
+    # the same name in another service does not collide
+    naming.name("s3", "raw", service="glue", owner="StackB/Raw")
+    with pytest.raises(ValueError, match="collision"):
+        naming.name("s3", "raw", service="s3", owner="StackB/Raw")
+    # claims without an owner only collide with a named owner
+    assert naming.name("s3", "stage", service="s3") == naming.name("s3", "stage", service="s3")
+    with pytest.raises(ValueError, match="collision"):
+        naming.name("s3", "raw", service="s3")
+
+    app = cdk.App()
+    naming = NamingEngine(configloader_instance, pattern=PATTERN)
+    DataLakeBuckets.create(cdk.Stack(app, "A"), configloader_instance, naming=naming)
+    assert naming.claims()["s3"]["dlh-s3-analytics"] == "A/third_layer"
+    with pytest.raises(ValueError, match="collision"):
+        DataLakeBuckets.create(cdk.Stack(app, "B"), configloader_instance, naming=naming)
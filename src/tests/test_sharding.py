@@ -0,0 +1,38 @@
+import aws_cdk as cdk
+import pytest
+from aws_cdk.assertions import Template
+
+from commons.constructs import S3, LayerShards
+from commons.model import Storage
+
+STORAGE = Storage(first_layer="raw", second_layer="stage", third_layer="analytics", landing_zone="landing", assets="")
+
+
+def test_resources_are_sharded_per_layer_with_explicit_references():
+    app = cdk.App()
+    shards = LayerShards(scope=app, id_prefix="DataLake", storage=STORAGE)
+    raw = S3.create_bucket(shards.stack_for("first_layer"), None, "raw-bucket", tags={})
+    S3.create_bucket(shards.stack_for("first_layer"), None, "raw-archive-bucket", tags={})
+    stage = S3.create_bucket(shards.stack_for("second_layer"), None, "stage-bucket", tags={})
+
+    raw_arn = shards.reference("first_layer", "second_layer", "RawBucketArn", raw.bucket_arn)
+    cdk.aws_iam.Role(
+        shards.stack_for("second_layer"), "Reader", assumed_by=cdk.aws_iam.ServicePrincipal("glue.amazonaws.com")
+    ).add_to_policy(cdk.aws_iam.PolicyStatement(actions=["s3:GetObject"], resources=[raw_arn, stage.bucket_arn]))
+
+    report = shards.report()
+    assert report["first_layer"]["stack"] == "DataLake-raw"
+    assert report["first_layer"]["resource_types"] == {"AWS::S3::Bucket": 2, "AWS::S3::BucketPolicy": 2}
+    assert report["second_layer"]["resources"] == 4
+    assert shards.stack_for("first_layer") in shards.stack_for("second_layer").dependencies
+
+    raw_template = Template.from_stack(shards.stack_for("first_layer"))
+    raw_template.has_output("ExportRawBucketArn", {"Export": {"Name": "DataLake-raw-RawBucketArn"}})
+
+
+def test_unconfigured_layer_is_rejected():
+    shards = LayerShards(scope=cdk.App(), id_prefix="DataLake", storage=STORAGE)
+    with pytest.raises(ValueError, match="not configured"):
+        shards.stack_for("assets")
+    with pytest.raises(ValueError, match="Unknown storage layer"):
+        shards.stack_for("bronze")
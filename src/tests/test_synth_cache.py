@@ -0,0 +1,59 @@
+import os
+
+from commons.service.synth_cache import SynthCache, builder_sources
+
+CONFIGS = {"account": {"id": "CACHE_ACCOUNT_ID"}, "company": {"name": "Amazon Web Services"}}
+
+
+def _assembly(path, size):
+    path.mkdir()
+    (path / "Stack.template.json").write_text("x" * size)
+    return path
+
+
+def test_key_changes_with_inputs(tmp_path):
+    source = tmp_path / "app.py"
+    source.write_text("BUCKETS = 1\n")
+    key = SynthCache.key(CONFIGS, {"CACHE_ACCOUNT_ID": "1"}, "app:build", sources=[source])
+
+    assert SynthCache.key(CONFIGS, {"CACHE_ACCOUNT_ID": "1"}, "app:build", sources=[source]) == key
+    assert SynthCache.key(CONFIGS, {"CACHE_ACCOUNT_ID": "2"}, "app:build", sources=[source]) != key
+    source.write_text("BUCKETS = 2\n")
+    assert SynthCache.key(CONFIGS, {"CACHE_ACCOUNT_ID": "1"}, "app:build", sources=[source]) != key
+
+
+def test_restore_and_evict_least_recently_used(tmp_path):
+    cache = SynthCache(tmp_path / "cache", max_bytes=250)
+    cache.put("old", _assembly(tmp_path / "old", 100))
+    os.utime(cache.directory / "old", (0, 0))
+    cache.put("new", _assembly(tmp_path / "new", 100))
+
+    assert cache.restore("new", tmp_path / "out")
+    assert (tmp_path / "out" / "Stack.template.json").read_text() == "x" * 100
+    assert not cache.restore("missing", tmp_path / "out")
+
+    cache.put("newest", _assembly(tmp_path / "newest", 100))
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (1, 1, 1, 2)
+    assert cache.get("old") is None
+
+
+def test_key_changes_with_modules_imported_by_the_builder(tmp_path, monkeypatch):
+    package = tmp_path / "cacheapp"
+    (package / "stacks").mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "build.py").write_text("from cacheapp.stacks import buckets\n\ndef build(app, config): ...\n")
+    (package / "stacks" / "__init__.py").write_text("")
+    (package / "stacks" / "buckets.py").write_text("from .naming import PREFIX\n")
+    (package / "stacks" / "naming.py").write_text("import json\nPREFIX = 'a'\n")
+    (package / "unused.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    sources = {path.name for path in builder_sources("cacheapp.build:build")[1:]}
+    assert sources == {"build.py", "__init__.py", "buckets.py", "naming.py"}
+
+    key = SynthCache.key(CONFIGS, {}, "cacheapp.build:build")
+    (package / "unused.py").write_text("CHANGED = True\n")
+    assert SynthCache.key(CONFIGS, {}, "cacheapp.build:build") == key
+    (package / "stacks" / "naming.py").write_text("import json\nPREFIX = 'b'\n")
+    assert SynthCache.key(CONFIGS, {}, "cacheapp.build:build") != key
@@ -0,0 +1,61 @@
+import aws_cdk as cdk
+import pytest
+
+from commons.service.synthesis import SynthTarget, resolve_builder, synthesize_environments, synthesize_target
+
+CONFIGS = {
+    "account": {"id": "SYNTH_ACCOUNT_ID", "region": "SYNTH_REGION_ID", "environment": "SYNTH_ENVIRONMENT_NAME"},
+    "data-lake-storage": {
+        "first_layer": "raw",
+        "second_layer": "stage",
+        "third_layer": "analytics",
+        "landing_zone": "landing",
+        "assets": "assets",
+    },
+    "company": {"name": "Amazon Web Services", "short_name": "aws"},
+    "project": {"name": "Data Lakehouse", "short_name": "dlh"},
+}
+ENVIRONMENT = {"SYNTH_ACCOUNT_ID": "123456789012", "SYNTH_REGION_ID": "us-east-1", "SYNTH_ENVIRONMENT_NAME": "qa"}
+
+
+def build_stack(app, config):
+    cdk.Stack(app, f"DataLake-{config.account.environment}")
+
+
+def test_synthesize_target_writes_assembly_per_environment(tmp_path):
+    target = SynthTarget(name="qa", configs=CONFIGS, environment=ENVIRONMENT)
+    result = synthesize_target(target, "tests.test_synthesis:build_stack", tmp_path)
+
+    assert result.error is None
+    assert result.stacks == ["DataLake-qa"]
+    assert (tmp_path / "qa" / "DataLake-qa.template.json").exists()
+
+
+def test_synthesize_target_reports_errors(tmp_path):
+    result = synthesize_target(SynthTarget(name="broken", configs={}), "tests.test_synthesis:build_stack", tmp_path)
+    assert result.error.startswith("ValidationError")
+
+
+def test_invalid_inputs():
+    with pytest.raises(ValueError, match="module:function"):
+        resolve_builder("tests.test_synthesis")
+    with pytest.raises(ValueError, match="unique"):
+        synthesize_environments([SynthTarget(name="qa", configs={})] * 2, "tests.test_synthesis:build_stack")
+
+
+def test_synthesize_environments_in_worker_processes(tmp_path):
+    targets = [
+        SynthTarget(name=name, configs=CONFIGS, environment={**ENVIRONMENT, "SYNTH_ENVIRONMENT_NAME": name})
+        for name in ("dev", "prod")
+    ]
+    results = synthesize_environments(targets, "tests.test_synthesis:build_stack", tmp_path, max_workers=2)
+
+    assert [(result.name, result.error, result.cached) for result in results] == [
+        ("dev", None, False),
+        ("prod", None, False),
+    ]
+    assert [result.stacks for result in results] == [["DataLake-dev"], ["DataLake-prod"]]
+    for result in results:
+        assert result.outdir == str(tmp_path / result.name)
+        assert (tmp_path / result.name / f"DataLake-{result.name}.template.json").exists()
+        assert (tmp_path / result.name / "manifest.json").exists()
@@ -0,0 +1,33 @@
+import aws_cdk as cdk
+from aws_cdk.assertions import Template
+
+from commons.constructs import S3, TagEngine
+
+SHARED_TAGS = {"Company": "Amazon Web Services", "Environment": "dev", "Project": "Data Lakehouse"}
+
+
+def _bucket_tags(tag_engine_factory):
+    app = cdk.App()
+    stack = cdk.Stack(app, "TaggingStack")
+    tag_engine = tag_engine_factory(stack)
+    S3.create_bucket(stack, "Raw", "raw-bucket", tags=SHARED_TAGS, tag_engine=tag_engine)
+    S3.create_bucket(stack, "Stage", "stage-bucket", tags={**SHARED_TAGS, "Layer": "stage"}, tag_engine=tag_engine)
+    S3.create_bucket(stack, "Other", "other-bucket", tags={"Company": "Other"}, tag_engine=tag_engine)
+
+    buckets = Template.from_stack(stack).find_resources("AWS::S3::Bucket")
+    return {
+        resource["Properties"]["BucketName"]: {tag["Key"]: tag["Value"] for tag in resource["Properties"]["Tags"]}
+        for resource in buckets.values()
+    }
+
+
+def test_tag_engine_matches_per_key_tagging():
+    assert _bucket_tags(lambda stack: TagEngine(stack, SHARED_TAGS)) == _bucket_tags(lambda stack: None)
+
+
+def test_tag_engine_deduplicates_tag_sets():
+    stack = cdk.Stack(cdk.App(), "DeltaStack")
+    engine = TagEngine(stack, SHARED_TAGS)
+    assert engine.delta(dict(SHARED_TAGS)) == ((), ())
+    assert engine.delta({**SHARED_TAGS, "Layer": "raw"}) is engine.delta({"Layer": "raw", **SHARED_TAGS})
+    assert engine.delta({"Company": "Other"}) == ((("Company", "Other"),), ("Environment", "Project"))